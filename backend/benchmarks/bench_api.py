@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Endpoint benchmarks for the backend API.
+
+Generates a synthetic corpus (see corpus.py), imports the app against it and
+drives every endpoint in ``main.py`` through an in-process ASGI client, so the
+numbers measure the application rather than the network stack.
+
+Usage (from ``backend/``, requires httpx)::
+
+    uv run --with httpx python benchmarks/bench_api.py --courses 50 --slides 200 \\
+        --iterations 200 --concurrency 8 --output results.json
+    uv run --with httpx python benchmarks/bench_api.py --baseline results.json
+
+Results are written as JSON: the corpus spec, then per endpoint the request
+count, errors, throughput (req/s) and p50/p90/p99/max latency in milliseconds.
+With ``--baseline`` the run exits non-zero when any endpoint's p50 regresses
+by more than ``--threshold``.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from corpus import CorpusSpec, build_deck, build_document, generate_corpus
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    # Builds (url, request kwargs) for iteration i; may use state from setup
+    request: Callable[[int, Dict[str, Any]], Any]
+    # Unmeasured per-iteration preparation (e.g. creating a temp file to commit)
+    setup: Optional[Callable[[httpx.AsyncClient, int], Awaitable[Dict[str, Any]]]] = None
+    mutating: bool = False
+    tags: List[str] = field(default_factory=list)
+
+
+def course_zip(course_id: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr(f"{course_id}/config.json", json.dumps({"id": course_id, "title": course_id}))
+        zf.writestr(f"{course_id}/slides/slides.md", "# Imported\n\n---\n\n# Second slide\n")
+        zf.writestr(f"{course_id}/labs/lab-1.md", "# Lab 1\n\nSteps.\n")
+    return buffer.getvalue()
+
+
+def build_cases(spec: CorpusSpec) -> List[Case]:
+    import random
+
+    rng = random.Random(spec.seed)
+    course = "course-0000"
+    deck = build_deck(rng, spec.slides, spec)
+    lab = build_document(rng, "Uploaded lab", 6, spec)
+    asset = rng.randbytes(spec.asset_bytes)
+
+    def get(path: str):
+        return lambda i, state: (path, {})
+
+    async def new_temp_slide(client, i):
+        r = await client.post("/api/slides/temp", json={"originalFilename": f"bench-{i}.md", "content": deck, "courseId": course})
+        return r.json()
+
+    async def new_temp_lab(client, i):
+        r = await client.post("/api/labs/temp", json={"originalFilename": f"lab-{900 + i}.md", "content": lab, "courseId": course})
+        return r.json()
+
+    async def new_course(client, i):
+        r = await client.post("/api/courses", json={"title": f"Bench delete {i}", "description": "tmp"})
+        return r.json()
+
+    async def new_asset(client, i):
+        r = await client.post(f"/api/courses/{course}/assets/upload", files={"file": (f"del-{i}.bin", b"x" * 128)})
+        return r.json()["asset"]
+
+    return [
+        Case("root", "GET", get("/")),
+        Case("list_courses", "GET", get("/api/courses"), tags=["listing"]),
+        Case("get_course", "GET", get(f"/api/courses/{course}")),
+        Case("course_slides", "GET", get(f"/api/courses/{course}/slides"), tags=["render"]),
+        Case("course_slide_file", "GET", get(f"/api/courses/{course}/slides/part-1.md"), tags=["render"]),
+        Case("list_slide_files", "GET", get(f"/api/slides/courses/{course}"), tags=["listing", "render"]),
+        Case("slide_file_content", "GET", get(f"/api/slides/courses/{course}/file/part-1.md"), tags=["render"]),
+        Case("list_blogs", "GET", get("/api/blogs"), tags=["listing"]),
+        Case("blog_post", "GET", get("/api/blogs/post-0000"), tags=["render"]),
+        Case("list_course_labs", "GET", get(f"/api/labs/courses/{course}"), tags=["listing", "render"]),
+        Case("lab_content", "GET", get(f"/api/labs/courses/{course}/chapter/1"), tags=["render"]),
+        Case("list_all_labs", "GET", get("/api/labs/courses"), tags=["listing"]),
+        Case("list_assets", "GET", get(f"/api/courses/{course}/assets"), tags=["listing"]),
+        Case("serve_asset", "GET", get(f"/assets/{course}/images/image-0.png")),
+        Case("download_template", "GET", get("/api/courses/template/download")),
+        Case(
+            "create_course", "POST", mutating=True,
+            request=lambda i, state: ("/api/courses", {"json": {"title": f"Bench course {i}", "description": "bench", "slides_content": deck}}),
+        ),
+        Case(
+            "update_course", "PUT", mutating=True,
+            request=lambda i, state: (f"/api/courses/{course}", {"json": {"description": f"rev {i}"}}),
+        ),
+        Case(
+            "update_slides", "PUT", mutating=True, tags=["render"],
+            request=lambda i, state: ("/api/courses/course-0001/slides", {"json": {"content": deck + f"\n<!-- rev {i} -->\n"}}),
+        ),
+        Case(
+            "import_zip", "POST", mutating=True, tags=["upload"],
+            request=lambda i, state: ("/api/courses/import", {"files": {"file": (f"bench-import-{i}.zip", course_zip(f"bench-import-{i}"), "application/zip")}}),
+        ),
+        Case(
+            "import_markdown", "POST", mutating=True, tags=["upload"],
+            request=lambda i, state: ("/api/courses/import", {"files": {"file": (f"bench-md-{i}.md", deck.encode(), "text/markdown")}}),
+        ),
+        Case(
+            "upload_asset", "POST", mutating=True, tags=["upload"],
+            request=lambda i, state: (f"/api/courses/{course}/assets/upload", {"files": {"file": (f"upload-{i}.png", asset)}}),
+        ),
+        Case(
+            "upload_lab", "POST", mutating=True, tags=["upload", "render"],
+            request=lambda i, state: (f"/api/courses/{course}/labs/upload", {"files": {"file": (f"lab-{100 + i}.md", lab.encode())}}),
+        ),
+        Case(
+            "upload_slides", "POST", mutating=True, tags=["upload", "render"],
+            request=lambda i, state: (f"/api/courses/{course}/slides/upload", {"files": {"file": (f"upload-{i}.md", deck.encode())}}),
+        ),
+        Case(
+            "delete_asset", "DELETE", mutating=True, setup=new_asset,
+            request=lambda i, state: (f"/api/courses/{course}/assets/{state['path']}", {}),
+        ),
+        Case(
+            "delete_course", "DELETE", mutating=True, setup=new_course,
+            request=lambda i, state: (f"/api/courses/{state['id']}", {}),
+        ),
+        Case(
+            "temp_slide_create", "POST", mutating=True,
+            request=lambda i, state: ("/api/slides/temp", {"json": {"originalFilename": "slides.md", "content": deck, "courseId": course}}),
+        ),
+        Case("temp_slide_get", "GET", setup=new_temp_slide, request=lambda i, state: (f"/api/slides/temp/{state['id']}", {})),
+        Case(
+            "temp_slide_update", "PUT", mutating=True, setup=new_temp_slide,
+            request=lambda i, state: (f"/api/slides/temp/{state['id']}", {"json": {"content": deck}}),
+        ),
+        Case(
+            "temp_slide_commit", "POST", mutating=True, setup=new_temp_slide,
+            request=lambda i, state: (f"/api/slides/temp/{state['id']}/commit", {}),
+        ),
+        Case(
+            "temp_slide_delete", "DELETE", mutating=True, setup=new_temp_slide,
+            request=lambda i, state: (f"/api/slides/temp/{state['id']}", {}),
+        ),
+        Case(
+            "temp_lab_create", "POST", mutating=True,
+            request=lambda i, state: ("/api/labs/temp", {"json": {"originalFilename": "lab-1.md", "content": lab, "courseId": course}}),
+        ),
+        Case("temp_lab_get", "GET", setup=new_temp_lab, request=lambda i, state: (f"/api/labs/temp/{state['id']}", {})),
+        Case(
+            "temp_lab_update", "PUT", mutating=True, setup=new_temp_lab,
+            request=lambda i, state: (f"/api/labs/temp/{state['id']}", {"json": {"content": lab}}),
+        ),
+        Case(
+            "temp_lab_commit", "POST", mutating=True, setup=new_temp_lab,
+            request=lambda i, state: (f"/api/labs/temp/{state['id']}/commit", {}),
+        ),
+        Case(
+            "temp_lab_delete", "DELETE", mutating=True, setup=new_temp_lab,
+            request=lambda i, state: (f"/api/labs/temp/{state['id']}", {}),
+        ),
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def run_case(client: httpx.AsyncClient, case: Case, iterations: int, concurrency: int,
+                   cold: bool, reset_cache: Callable[[], None]) -> Dict[str, Any]:
+    # Cold runs must clear the cache before every request, which only makes sense sequentially
+    if cold:
+        concurrency = 1
+    states = []
+    for i in range(iterations):
+        states.append(await case.setup(client, i) if case.setup else {})
+
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        url, kwargs = case.request(i, states[i])
+        async with semaphore:
+            if cold:
+                reset_cache()
+            start = time.perf_counter()
+            response = await client.request(case.method, url, **kwargs)
+            await response.aread()
+            latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "method": case.method,
+        "tags": case.tags,
+        "requests": iterations,
+        "errors": errors,
+        "throughput_rps": round(iterations / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        },
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace, spec: CorpusSpec) -> Dict[str, Any]:
+    from backend.main import app, RENDER_CACHE
+
+    cases = build_cases(spec)
+    if args.only:
+        cases = [c for c in cases if c.name in args.only or set(c.tags) & set(args.only)]
+    if args.read_only:
+        cases = [c for c in cases if not c.mutating]
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for case in cases:
+            # Warm-up requests are not measured; they use indices past the
+            # measured range so mutating cases never collide with them
+            for i in range(args.iterations, args.iterations + args.warmup):
+                state = await case.setup(client, i) if case.setup else {}
+                url, kwargs = case.request(i, state)
+                await client.request(case.method, url, **kwargs)
+            results[case.name] = await run_case(client, case, args.iterations, args.concurrency, args.cold, RENDER_CACHE.clear)
+            latency = results[case.name]["latency_ms"]
+            print(
+                f"{case.name:22s} {results[case.name]['throughput_rps']:10.1f} req/s"
+                f"  p50 {latency['p50']:8.2f} ms  p99 {latency['p99']:8.2f} ms"
+                f"  errors {results[case.name]['errors']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        before, after = previous["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        if before > 0 and after > before * (1 + threshold):
+            regressions.append(f"{name}: p50 {before:.2f} ms -> {after:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--courses", type=int, default=CorpusSpec.courses)
+    parser.add_argument("--slides", type=int, default=CorpusSpec.slides, help="slides per course deck")
+    parser.add_argument("--labs", type=int, default=CorpusSpec.labs, help="labs per course")
+    parser.add_argument("--slide-files", type=int, default=CorpusSpec.slide_files, help="extra slide files per course")
+    parser.add_argument("--blogs", type=int, default=CorpusSpec.blogs)
+    parser.add_argument("--assets", type=int, default=CorpusSpec.assets, help="assets per course")
+    parser.add_argument("--asset-bytes", type=int, default=CorpusSpec.asset_bytes)
+    parser.add_argument("--code-density", type=float, default=CorpusSpec.code_density,
+                        help="fraction of slides and sections with a code block")
+    parser.add_argument("--seed", type=int, default=CorpusSpec.seed)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cold", action="store_true", help="clear the render cache before every request")
+    parser.add_argument("--read-only", action="store_true", help="skip endpoints that modify the corpus")
+    parser.add_argument("--only", nargs="*", help="endpoint names or tags (listing, render, upload) to run")
+    parser.add_argument("--root", type=Path, help="corpus directory (default: a temporary directory)")
+    parser.add_argument("--output", type=Path, help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="previous results to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 regression ratio")
+    args = parser.parse_args()
+    # Resolve user paths before the working directory moves into the corpus
+    for name in ("root", "output", "baseline"):
+        if getattr(args, name):
+            setattr(args, name, getattr(args, name).resolve())
+
+    spec = CorpusSpec(
+        courses=max(2, args.courses), slides=args.slides, labs=max(1, args.labs),
+        slide_files=max(1, args.slide_files), blogs=max(1, args.blogs), assets=max(1, args.assets),
+        asset_bytes=args.asset_bytes, code_density=args.code_density, seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="kc-bench-") as tmp:
+        root = args.root or Path(tmp)
+        generate_corpus(root, spec)
+        # The app resolves its data directories relative to the working directory at import time
+        os.chdir(root)
+        sys.path.insert(0, str(BACKEND_DIR / "src"))
+        endpoints = asyncio.run(run_benchmarks(args, spec))
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": spec.to_dict(),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "cold": args.cold,
+        "endpoints": endpoints,
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(encoded + "\n", encoding="utf-8")
+    else:
+        print(encoded)
+
+    if args.baseline:
+        regressions = compare(endpoints, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Memory footprint of the resident catalogs: compact records vs plain dicts.
+
+Builds ``--items`` course, blog and lab entries shaped like the corpus
+generator's (see corpus.py), each decoded from its own JSON text as the
+listings read them from ``config.json``, and measures with tracemalloc what
+it takes to keep them resident as dicts and as the records in
+``records.py``/``catalog.py``. Records are also checked to convert back to
+exactly the dicts they were built from.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_catalog_memory.py --items 50000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+from corpus import LEVELS, TAGS
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR / "src"))
+
+from backend.catalog import LabEntry  # noqa: E402
+from backend.records import BlogRecord, CourseRecord  # noqa: E402
+
+
+def course_sources(rng: random.Random, count: int) -> List[str]:
+    sources = []
+    for c in range(count):
+        course_id = f"course-{c:06d}"
+        info = {
+            "id": course_id,
+            "title": course_id.replace("-", " ").title(),
+            "description": f"Training course: {course_id}",
+            "slides_count": 0,
+        }
+        info.update({
+            "title": f"Synthetic Course {c}",
+            "description": " ".join(rng.choice(TAGS) for _ in range(20)),
+            "level": rng.choice(LEVELS),
+            "author": f"Author {c % 7}",
+            "tags": rng.sample(TAGS, 3),
+        })
+        info["slides_count"] = rng.randint(5, 80)
+        sources.append(json.dumps(info))
+    return sources
+
+
+def blog_sources(rng: random.Random, count: int) -> List[str]:
+    sources = []
+    for b in range(count):
+        sources.append(json.dumps({
+            "slug": f"post-{b:06d}",
+            "title": f"Synthetic Post {b}",
+            "author": f"Author {b % 5}",
+            "publishDate": f"2024-{(b % 12) + 1:02d}-{(b % 28) + 1:02d}",
+            "tags": rng.sample(TAGS, 2),
+            "draft": False,
+            "excerpt": " ".join(rng.choice(TAGS) for _ in range(15)),
+        }))
+    return sources
+
+
+def lab_sources(count: int) -> List[str]:
+    # Five labs per course, as the corpus generator writes them
+    return [
+        json.dumps({"chapter": n % 5 + 1, "title": f"Lab {n % 5 + 1}: Synthetic exercise", "filename": f"lab-{n % 5 + 1}.md"})
+        for n in range(count)
+    ]
+
+
+def lab_entry(data: dict) -> LabEntry:
+    return LabEntry(data["chapter"], data["title"], data["filename"], {}, 0.0)
+
+
+def measure(sources: List[str], build: Callable[[dict], object]) -> tuple:
+    """(bytes held by the built entries, the entries)"""
+    gc.collect()
+    tracemalloc.start()
+    entries = [build(json.loads(source)) for source in sources]
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, entries
+
+
+def compare(name: str, sources: List[str], build: Callable[[dict], object], to_dict: Callable[[object], dict]) -> dict:
+    dict_bytes, dicts = measure(sources, lambda data: data)
+    record_bytes, records = measure(sources, build)
+    return {
+        "catalog": name,
+        "items": len(sources),
+        "dict_bytes_per_item": round(dict_bytes / len(sources), 1),
+        "record_bytes_per_item": round(record_bytes / len(sources), 1),
+        "saving": round(1 - record_bytes / dict_bytes, 3),
+        "parity": all(to_dict(record) == expected for record, expected in zip(records, dicts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog memory footprint: records vs dicts")
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = [
+        compare("courses", course_sources(rng, args.items), CourseRecord.from_dict, CourseRecord.to_dict),
+        compare("blogs", blog_sources(rng, args.items), BlogRecord.from_dict, BlogRecord.to_dict),
+        compare("labs", lab_sources(args.items), lab_entry,
+                lambda entry: {"chapter": entry.chapter, "title": entry.title, "filename": entry.filename}),
+    ]
+    print(json.dumps(results, indent=2))
+    if not all(result["parity"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Import-time budget for ``backend.main``.
+
+Cold starts pay for importing the app before the first request can be served.
+Each run imports the app in a fresh interpreter (in an empty working
+directory) and splits the time into the framework (FastAPI, Starlette,
+pydantic, which the app cannot avoid) and the app's own import on top of it.
+The run exits non-zero when the median app import exceeds ``--budget-ms`` or
+when a module that should only load on first use (markdown, frontmatter,
+yaml, pygments) was imported eagerly. ``tests/test_import_time.py`` runs the
+same check as part of the test suite.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_import_time.py --runs 7 --budget-ms 175
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFERRED_MODULES = ("markdown", "frontmatter", "yaml", "pygments")
+BUDGET_MS = 175.0
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import fastapi, fastapi.middleware.cors, fastapi.staticfiles, pydantic, aiofiles
+framework = time.perf_counter()
+import backend.main
+app = time.perf_counter()
+print(json.dumps({{
+    "framework_ms": (framework - start) * 1000,
+    "app_ms": (app - framework) * 1000,
+    "eager": [name for name in {deferred!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_once() -> dict:
+    code = PROBE.format(src=str(BACKEND_DIR / "src"), deferred=DEFERRED_MODULES)
+    with tempfile.TemporaryDirectory() as workdir:
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget for backend.main")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="Maximum median import time of the app on top of the framework")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    eager = sorted({name for run in runs for name in run["eager"]})
+    result = {
+        "runs": args.runs,
+        "framework_ms_p50": round(statistics.median(run["framework_ms"] for run in runs), 1),
+        "app_ms_p50": round(statistics.median(run["app_ms"] for run in runs), 1),
+        "app_ms_max": round(max(run["app_ms"] for run in runs), 1),
+        "budget_ms": args.budget_ms,
+        "eager_imports": eager,
+    }
+    result["within_budget"] = result["app_ms_p50"] <= args.budget_ms and not eager
+    print(json.dumps(result, indent=2))
+    if not result["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark for ``parse_slides``.
+
+Times the linear slide scanner in ``main.py`` against a copy of the previous
+regex-split implementation on a synthetic deck (1000 slides by default).
+Markdown rendering is stubbed out in both so only splitting, metadata
+detection and trimming are measured. ``tests/test_parse_slides.py`` checks
+that both produce the same slides, using ``legacy_parse_slides`` below as
+the reference, except on the inputs the old splitter got wrong.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_parse_slides.py --slides 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from corpus import CorpusSpec, build_deck
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def legacy_parse_slides(content, global_metadata=None, render=lambda text: ""):
+    """The regex-split implementation parse_slides replaced, kept for comparison"""
+    slides = []
+    if global_metadata is None:
+        global_metadata = {}
+    parts = re.split(r'\n---\n', content)
+    i = 0
+    first_slide_inherits_global = True
+    while i < len(parts):
+        part = parts[i].strip()
+        if not part:
+            i += 1
+            continue
+        metadata = {}
+        content_part = ""
+
+        def is_yaml_metadata(text):
+            if not text or not ':' in text:
+                return False
+            if text.strip().startswith('#'):
+                return False
+            for line in text.split('\n'):
+                line = line.strip()
+                if line:
+                    if not (line.startswith('#') or line == '' or re.match(r'^[a-zA-Z_][a-zA-Z0-9_-]*\s*:', line)):
+                        return False
+            return True
+
+        if is_yaml_metadata(part):
+            try:
+                metadata = yaml.safe_load(part) or {}
+                if not isinstance(metadata, dict):
+                    metadata = {}
+            except Exception:
+                metadata = {}
+            if i + 1 < len(parts):
+                content_part = parts[i + 1].strip()
+                i += 2
+            else:
+                i += 1
+                continue
+        else:
+            content_part = part
+            if first_slide_inherits_global and len(slides) == 0:
+                metadata = global_metadata.copy()
+            i += 1
+        first_slide_inherits_global = False
+        if not content_part or not content_part.strip():
+            continue
+        content_lines = content_part.split('\n')
+        while content_lines and not content_lines[0].strip():
+            content_lines.pop(0)
+        while content_lines and not content_lines[-1].strip():
+            content_lines.pop()
+        content_part = '\n'.join(content_lines)
+        if not content_part:
+            continue
+        slides.append({
+            "id": f"slide-{len(slides) + 1}",
+            "content": content_part,
+            "html": render(content_part),
+            "metadata": metadata,
+        })
+    return slides
+
+
+def load_parse_slides(stub_render: bool):
+    # main.py creates its data directories relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="kc-parse-"))
+    sys.path.insert(0, str(BACKEND_DIR / "src"))
+    import backend.main as main
+
+    if stub_render:
+        main.convert_markdown = lambda text, profile="slides": ""
+    return main.parse_slides
+
+
+def time_call(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parse_slides benchmark")
+    parser.add_argument("--slides", type=int, default=1000, help="slides per benchmark deck")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--code-density", type=float, default=0.3)
+    args = parser.parse_args()
+
+    parse_slides = load_parse_slides(stub_render=True)
+
+    rng = random.Random(1)
+    deck = build_deck(rng, args.slides, CorpusSpec(code_density=args.code_density)).split("---\n\n", 1)[1]
+    results = {
+        "slides": args.slides,
+        "deck_bytes": len(deck.encode("utf-8")),
+        "legacy": time_call(lambda: legacy_parse_slides(deck), args.repeat),
+        "current": time_call(lambda: parse_slides(deck), args.repeat),
+    }
+    results["speedup"] = round(results["legacy"]["median_ms"] / results["current"]["median_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
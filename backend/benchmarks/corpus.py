@@ -0,0 +1,128 @@
+"""Synthetic course/blog tree generator for the backend benchmarks.
+
+Produces the same on-disk layout the API reads (``courses/<id>/config.json``,
+``slides/``, ``labs/lab-N.md``, ``assets/`` and ``blogs/<slug>/``) at a
+configurable scale, deterministically for a given seed.
+"""
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+TAGS = ["python", "ai", "cloud", "devops", "security", "frontend", "data", "testing"]
+LANGUAGES = ["python", "javascript", "bash", "yaml", "json"]
+
+CODE_SAMPLES = {
+    "python": "def handler(event):\n    items = [x * 2 for x in event['items']]\n    return {'count': len(items), 'items': items}\n",
+    "javascript": "export async function load(id) {\n  const res = await fetch(`/api/courses/${id}`);\n  return res.json();\n}\n",
+    "bash": "#!/bin/bash\nset -euo pipefail\nfor f in labs/*.md; do\n  wc -l \"$f\"\ndone\n",
+    "yaml": "layout: two-column\ntheme: tech\nsteps:\n  - name: build\n    run: make all\n",
+    "json": "{\n  \"id\": \"demo\",\n  \"tags\": [\"a\", \"b\"],\n  \"enabled\": true\n}\n",
+}
+
+
+@dataclass
+class CorpusSpec:
+    courses: int = 20
+    slides: int = 50
+    labs: int = 5
+    slide_files: int = 2
+    blogs: int = 20
+    assets: int = 5
+    asset_bytes: int = 64 * 1024
+    code_density: float = 0.3
+    seed: int = 1
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _paragraph(rng: random.Random, words: int = 40) -> str:
+    vocabulary = "the course covers lab slide deck markdown render cache token model agent prompt tool workflow".split()
+    return " ".join(rng.choice(vocabulary) for _ in range(words)).capitalize() + "."
+
+
+def _code_block(rng: random.Random) -> str:
+    language = rng.choice(LANGUAGES)
+    return f"```{language}\n{CODE_SAMPLES[language]}```"
+
+
+def _slide(rng: random.Random, index: int, spec: CorpusSpec) -> str:
+    parts = [f"# Slide {index}", "", _paragraph(rng), "", "- point one", "- point two", "- point three"]
+    if rng.random() < spec.code_density:
+        parts += ["", _code_block(rng)]
+    body = "\n".join(parts)
+    if index % 5 == 0:
+        # Every fifth slide carries its own per-slide metadata block
+        return f"layout: two-column\ntheme: tech\n---\n\n{body}"
+    return body
+
+
+def build_deck(rng: random.Random, slides: int, spec: CorpusSpec) -> str:
+    frontmatter = "---\ntitle: Synthetic deck\ntheme: minimal\n---\n\n"
+    return frontmatter + "\n\n---\n\n".join(_slide(rng, i + 1, spec) for i in range(slides)) + "\n"
+
+
+def build_document(rng: random.Random, title: str, sections: int, spec: CorpusSpec) -> str:
+    parts = [f"# {title}", ""]
+    for i in range(sections):
+        parts += [f"## Section {i + 1}", "", _paragraph(rng, 80), ""]
+        if rng.random() < spec.code_density:
+            parts += [_code_block(rng), ""]
+    return "\n".join(parts)
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> Path:
+    """Write a synthetic ``courses/`` and ``blogs/`` tree under ``root``"""
+    rng = random.Random(spec.seed)
+    root = Path(root)
+    courses_dir = root / "courses"
+    blogs_dir = root / "blogs"
+    courses_dir.mkdir(parents=True, exist_ok=True)
+    blogs_dir.mkdir(parents=True, exist_ok=True)
+
+    for c in range(spec.courses):
+        course_id = f"course-{c:04d}"
+        course_dir = courses_dir / course_id
+        (course_dir / "slides").mkdir(parents=True, exist_ok=True)
+        (course_dir / "labs").mkdir(exist_ok=True)
+        (course_dir / "assets" / "images").mkdir(parents=True, exist_ok=True)
+
+        config = {
+            "id": course_id,
+            "title": f"Synthetic Course {c}",
+            "description": _paragraph(rng, 20),
+            "level": rng.choice(LEVELS),
+            "author": f"Author {c % 7}",
+            "tags": rng.sample(TAGS, 3),
+        }
+        (course_dir / "config.json").write_text(json.dumps(config, indent=2), encoding="utf-8")
+        (course_dir / "slides" / "slides.md").write_text(build_deck(rng, spec.slides, spec), encoding="utf-8")
+        for s in range(spec.slide_files):
+            deck = build_deck(rng, max(1, spec.slides // 4), spec)
+            (course_dir / "slides" / f"part-{s + 1}.md").write_text(deck, encoding="utf-8")
+        for lab in range(spec.labs):
+            document = build_document(rng, f"Lab {lab + 1}: Synthetic exercise", 6, spec)
+            (course_dir / "labs" / f"lab-{lab + 1}.md").write_text(document, encoding="utf-8")
+        for a in range(spec.assets):
+            (course_dir / "assets" / "images" / f"image-{a}.png").write_bytes(rng.randbytes(spec.asset_bytes))
+
+    for b in range(spec.blogs):
+        slug = f"post-{b:04d}"
+        blog_dir = blogs_dir / slug
+        blog_dir.mkdir(exist_ok=True)
+        config = {
+            "slug": slug,
+            "title": f"Synthetic Post {b}",
+            "author": f"Author {b % 5}",
+            "publishDate": f"2024-{(b % 12) + 1:02d}-{(b % 28) + 1:02d}",
+            "tags": rng.sample(TAGS, 2),
+            "draft": b % 10 == 9,
+        }
+        if b % 2:
+            config["excerpt"] = _paragraph(rng, 15)
+        (blog_dir / "config.json").write_text(json.dumps(config, indent=2), encoding="utf-8")
+        (blog_dir / "content.md").write_text(build_document(rng, config["title"], 8, spec), encoding="utf-8")
+
+    return root
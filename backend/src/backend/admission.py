@@ -0,0 +1,126 @@
+"""Admission control for expensive route classes.
+
+Each ``AdmissionGate`` lets at most ``limit`` requests of its class run at
+once. Up to ``max_queue`` more wait for a slot, for no longer than
+``queue_timeout`` seconds; anything beyond that is rejected straight away, so
+a spike on render-heavy endpoints is shed quickly instead of piling up work
+that slows down every other endpoint on the worker.
+
+``AdmissionMiddleware`` takes the slot before the route runs, so a rejected
+upload is answered before its multipart body is read, and keeps it until the
+response (a streamed one included) has been sent. Background tasks queued by
+the route (pre-rendering after an upload) run after the slot is released.
+"""
+import asyncio
+from typing import Callable, Dict, Mapping, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, gate: str, reason: str):
+        super().__init__(f"{gate}: {reason}")
+        self.gate = gate
+        self.reason = reason
+
+
+class AdmissionGate:
+    REASONS = ("queue_full", "timeout")
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {reason: 0 for reason in self.REASONS}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Same per-loop recreation as FanOut
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(self.name, reason)
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if needed; raises AdmissionRejected"""
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.queued >= self.max_queue:
+                self._reject("queue_full")
+            self.queued += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("timeout")
+            finally:
+                self.queued -= 1
+        else:
+            await semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+
+    def release(self):
+        self.active -= 1
+        self._get_semaphore().release()
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        gates: Mapping[str, AdmissionGate],
+        route_class: Callable[[Scope], Optional[str]],
+        retry_after: int,
+    ):
+        self.app = app
+        self.gates = gates
+        # Admission class of the route a request will be dispatched to, if any
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = self.route_class(scope) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates[name]
+        try:
+            await gate.acquire()
+        except AdmissionRejected as e:
+            # Same body as an HTTPException; the request body is never read
+            response = JSONResponse(
+                {"detail": f"Server busy ({e.reason}), please retry"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                gate.release()
+
+        async def send_then_release(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # The response is out; what the app still runs does not hold the slot
+                release()
+
+        try:
+            await self.app(scope, receive, send_then_release)
+        finally:
+            release()
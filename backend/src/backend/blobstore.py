@@ -0,0 +1,181 @@
+"""Content-addressed storage for course assets.
+
+Each distinct asset is stored once as ``<root>/<sha256[:2]>/<sha256>`` and
+hard-linked into the ``assets/`` trees of the courses that use it, so the
+same image imported into ten courses takes the disk space (and write I/O)
+of one. A blob's link count is its reference count: once only the store's
+own link is left, no course uses it any more and it can be removed. To
+find the blob behind a course-side file the store goes by inode (a hard link
+shares it), from an index built by one stat-only scan of the store, rather
+than hashing the file again.
+
+Linked files share their contents, so assets must be replaced, never edited
+in place (the API only ever creates and deletes them). When the store and
+the courses live on different filesystems hard links are impossible and
+files are copied instead, without deduplication.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.blobs_written = 0
+        self.bytes_deduplicated = 0
+        # (st_dev, st_ino) -> blob path; built on first use
+        self._by_inode: Optional[Dict[Tuple[int, int], Path]] = None
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _index_inodes(self) -> Dict[Tuple[int, int], Path]:
+        index = {}
+        for blob in self.root.glob("??/*"):
+            if blob.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = blob.stat()
+            except FileNotFoundError:
+                continue
+            index[(stat.st_dev, stat.st_ino)] = blob
+        return index
+
+    def _remember(self, blob: Path):
+        if self._by_inode is not None:
+            stat = blob.stat()
+            self._by_inode[(stat.st_dev, stat.st_ino)] = blob
+
+    def find_blob(self, stat: os.stat_result) -> Optional[Path]:
+        """The blob a course-side file with `stat` is a hard link of, if any"""
+        key = (stat.st_dev, stat.st_ino)
+        if self._by_inode is None or key not in self._by_inode:
+            # First use, or a blob written by another worker process
+            self._by_inode = self._index_inodes()
+        return self._by_inode.get(key)
+
+    def _put(self, digest: str, size: int, write, dest: Path) -> Path:
+        """Link the blob for `digest` at `dest`, first writing it with `write(f)` if it is new"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        blob = self.blob_path(digest)
+        try:
+            os.link(blob, dest)
+            self.bytes_deduplicated += size
+            self._remember(blob)
+            return blob
+        except FileNotFoundError:
+            pass  # new content
+        except OSError:
+            # Different filesystem (or no hard link support): fall back to a copy
+            shutil.copyfile(blob, dest)
+            return blob
+
+        blob.parent.mkdir(exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            # Link the course side before publishing the blob, so collect()
+            # never sees it with a single link
+            try:
+                os.link(temp_name, dest)
+            except OSError:
+                shutil.copyfile(temp_name, dest)
+            os.replace(temp_name, blob)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self.blobs_written += 1
+        self._remember(blob)
+        return blob
+
+    def put_bytes(self, data: bytes, dest: Path) -> Path:
+        """Store `data` (once) and link it at `dest`; returns the blob path"""
+        return self._put(hashlib.sha256(data).hexdigest(), len(data), lambda f: f.write(data), dest)
+
+    def put_file(self, source: Path, dest: Path, digest: Optional[str] = None) -> Path:
+        """Store the contents of `source` (once) and link them at `dest`"""
+        def write(f):
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, f, CHUNK_SIZE)
+
+        return self._put(digest or file_digest(source), source.stat().st_size, write, dest)
+
+    def move_file(self, source: Path, dest: Path, digest: Optional[str] = None) -> Path:
+        """Like put_file, but `source` is consumed: it becomes the blob itself
+        when the content is new, avoiding a copy of large staged files"""
+        digest = digest or file_digest(source)
+        size = source.stat().st_size
+        blob = self.blob_path(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, dest)
+            self.bytes_deduplicated += size
+            source.unlink()
+            self._remember(blob)
+            return blob
+        except FileNotFoundError:
+            pass  # new content
+        except OSError:
+            # Different filesystem (or no hard link support): move the upload itself
+            shutil.move(source, dest)
+            return blob
+
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copyfile(source, dest)
+        blob.parent.mkdir(exist_ok=True)
+        try:
+            os.replace(source, blob)
+        except OSError:
+            # Source on another filesystem than the store: keep the course copy only
+            source.unlink()
+            return blob
+        self.blobs_written += 1
+        self._remember(blob)
+        return blob
+
+    def release(self, path: Path):
+        """Delete a course-side asset, dropping its blob if this was the last user"""
+        stat = path.stat()
+        # The store's link and this one: the blob becomes unused
+        blob = self.find_blob(stat) if stat.st_nlink == 2 else None
+        path.unlink()
+        if blob is not None:
+            try:
+                blob_stat = blob.stat()
+            except FileNotFoundError:
+                return
+            if (blob_stat.st_dev, blob_stat.st_ino) == (stat.st_dev, stat.st_ino) and blob_stat.st_nlink == 1:
+                blob.unlink()
+                self._by_inode.pop((stat.st_dev, stat.st_ino), None)
+
+    def collect(self) -> int:
+        """Remove blobs no course links to any more (e.g. after deleting a course)"""
+        removed = 0
+        for blob in self.root.glob("??/*"):
+            if blob.name.startswith(".tmp-"):
+                continue
+            stat = blob.stat()
+            if stat.st_nlink == 1:
+                blob.unlink()
+                if self._by_inode is not None:
+                    self._by_inode.pop((stat.st_dev, stat.st_ino), None)
+                removed += 1
+        return removed
@@ -0,0 +1,211 @@
+"""In-memory catalog of course labs.
+
+The all-labs overview only needs each lab's chapter and title, so the catalog
+reads lab files just up to their first ``# `` heading (plus any frontmatter
+before it) instead of loading whole files. It is built on first use and then
+kept current by the endpoints that write labs or add and remove courses;
+``refresh_changed`` picks up out-of-band edits by comparing modification
+times, re-reading only the lab files that were added or changed.
+"""
+import asyncio
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .concurrency import FanOut
+from .lazy import yaml, yaml_loader
+
+LAB_FILENAME = re.compile(r"lab-(\d+)\.md")
+_HEADING = re.compile(r"#\s+(.+)")
+
+
+class LabEntry:
+    # Slotted, with interned filenames (lab-1.md, lab-2.md, ... repeat in every
+    # course), to stay small when the catalog holds many thousands of labs
+    __slots__ = ("chapter", "title", "filename", "frontmatter", "mtime")
+
+    def __init__(self, chapter: int, title: str, filename: str, frontmatter: Dict[str, Any], mtime: float):
+        self.chapter = chapter
+        self.title = title
+        self.filename = sys.intern(filename)
+        self.frontmatter = frontmatter
+        self.mtime = mtime
+
+    def summary(self) -> Dict[str, Any]:
+        return {"chapter": self.chapter, "title": self.title, "filename": self.filename}
+
+
+def is_course_dir(path: Path) -> bool:
+    """Course directories, excluding hidden ones such as the trash"""
+    return not path.name.startswith(".") and path.is_dir()
+
+
+def read_markdown_head(path: Path) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Return (first "# " heading, frontmatter) reading no further than the heading"""
+    metadata: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        line = f.readline()
+        if line.rstrip("\r\n") == "---":
+            block = []
+            for line in f:
+                if line.rstrip("\r\n") == "---":
+                    try:
+                        loaded = yaml.load("".join(block), Loader=yaml_loader())
+                        metadata = loaded if isinstance(loaded, dict) else {}
+                    except yaml.YAMLError:
+                        pass
+                    break
+                block.append(line)
+            line = f.readline()
+        while line:
+            match = _HEADING.match(line.rstrip("\r\n"))
+            if match:
+                return match.group(1), metadata
+            line = f.readline()
+    return None, metadata
+
+
+def load_lab_entry(path: Path) -> Optional[LabEntry]:
+    match = LAB_FILENAME.search(path.name)
+    if not match:
+        return None
+    chapter = int(match.group(1))
+    title, metadata = read_markdown_head(path)
+    return LabEntry(chapter, title or f"Lab {chapter}", path.name, metadata, path.stat().st_mtime)
+
+
+class LabCatalog:
+    """course name -> lab filename -> LabEntry"""
+
+    def __init__(self, courses_dir: Path, fan_out: FanOut):
+        self.courses_dir = courses_dir
+        self.fan_out = fan_out
+        self._courses: Dict[str, Dict[str, LabEntry]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def _scan_course(self, course_dir: Path) -> Dict[str, LabEntry]:
+        labs: Dict[str, LabEntry] = {}
+        labs_dir = course_dir / "labs"
+        if not labs_dir.exists():
+            return labs
+        for lab_file in labs_dir.glob("lab-*.md"):
+            try:
+                entry = load_lab_entry(lab_file)
+            except Exception as e:
+                print(f"Error processing lab file {lab_file}: {e}")
+                continue
+            if entry is not None:
+                labs[entry.filename] = entry
+        return labs
+
+    def _list_lab_files(self) -> List[Tuple[str, Path]]:
+        lab_files = []
+        for course_dir in self.courses_dir.iterdir():
+            labs_dir = course_dir / "labs"
+            if is_course_dir(course_dir) and labs_dir.exists():
+                lab_files.extend((course_dir.name, lab_file) for lab_file in labs_dir.glob("lab-*.md"))
+        return lab_files
+
+    async def _load_into(self, courses: Dict[str, Dict[str, LabEntry]], lab_files: List[Tuple[str, Path]]):
+        """Read the heads of `lab_files` concurrently into `courses`"""
+        async def load(item: Tuple[str, Path]):
+            course_name, lab_file = item
+            try:
+                entry = await asyncio.to_thread(load_lab_entry, lab_file)
+            except Exception as e:
+                print(f"Error processing lab file {lab_file}: {e}")
+                return None
+            if entry is not None:
+                courses.setdefault(course_name, {})[entry.filename] = entry
+            return None
+
+        await self.fan_out.map(lab_files, load)
+
+    async def _scan_all(self) -> Dict[str, Dict[str, LabEntry]]:
+        # List files in one thread-pool call, then read the heads concurrently
+        lab_files = await asyncio.to_thread(self._list_lab_files)
+        courses: Dict[str, Dict[str, LabEntry]] = {}
+        await self._load_into(courses, lab_files)
+        return courses
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                self._courses = await self._scan_all()
+                self._loaded = True
+
+    def _stat_lab_files(self) -> List[Tuple[str, Path, float]]:
+        stats = []
+        for course_name, lab_file in self._list_lab_files():
+            try:
+                stats.append((course_name, lab_file, lab_file.stat().st_mtime))
+            except OSError:
+                continue  # removed while listing
+        return stats
+
+    async def refresh_changed(self) -> bool:
+        """Load the catalog, or bring it up to date with lab files added,
+        modified or removed behind its back (only those are re-read).
+        Returns whether anything changed.
+        """
+        if not self._loaded:
+            await self.ensure_loaded()
+            return True
+        async with self._lock:
+            stats = await asyncio.to_thread(self._stat_lab_files)
+            seen = set()
+            changed: List[Tuple[str, Path]] = []
+            for course_name, lab_file, mtime in stats:
+                seen.add((course_name, lab_file.name))
+                entry = self._courses.get(course_name, {}).get(lab_file.name)
+                if entry is None or entry.mtime != mtime:
+                    changed.append((course_name, lab_file))
+            removed = [
+                (course_name, filename)
+                for course_name, labs in self._courses.items()
+                for filename in labs
+                if (course_name, filename) not in seen
+            ]
+            for course_name, filename in removed:
+                self.remove_lab(course_name, filename)
+            await self._load_into(self._courses, changed)
+            return bool(changed or removed)
+
+    async def refresh_course(self, course_name: str):
+        """Rescan one course's labs directory (after an import, for example)"""
+        if not self._loaded:
+            return
+        course_dir = self.courses_dir / course_name
+        labs = await asyncio.to_thread(self._scan_course, course_dir)
+        self._courses[course_name] = labs
+
+    async def refresh_lab(self, course_name: str, lab_file: Path):
+        """Re-read the head of a single lab file after it was written"""
+        if not self._loaded or not LAB_FILENAME.search(lab_file.name):
+            return
+        try:
+            entry = await asyncio.to_thread(load_lab_entry, lab_file)
+        except Exception as e:
+            print(f"Error processing lab file {lab_file}: {e}")
+            return
+        if entry is not None:
+            self._courses.setdefault(course_name, {})[entry.filename] = entry
+
+    def remove_lab(self, course_name: str, filename: str):
+        self._courses.get(course_name, {}).pop(filename, None)
+
+    def remove_course(self, course_name: str):
+        self._courses.pop(course_name, None)
+
+    def course_labs(self, course_name: str) -> List[LabEntry]:
+        """One course's labs, sorted by chapter"""
+        return sorted(self._courses.get(course_name, {}).values(), key=lambda entry: entry.chapter)
+
+    def overview(self) -> Dict[str, List[LabEntry]]:
+        """Labs grouped by course and sorted by chapter; courses without labs are
+        omitted. Entries are shared with the catalog: convert with summary()"""
+        return {course_name: self.course_labs(course_name) for course_name, labs in self._courses.items() if labs}
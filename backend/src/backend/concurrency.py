@@ -0,0 +1,172 @@
+"""Concurrency helpers for request handlers."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FanOut:
+    """Run per-entry work for directory-scanning endpoints concurrently.
+
+    A single semaphore, shared by every request and sized to the file I/O
+    thread pool, bounds the number of entries in flight, so a large listing
+    overlaps its reads without queueing more work than the pool can run.
+    Workers must not call ``map`` themselves: nested fan-outs could hold
+    every permit while waiting on each other.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one loop; recreate if the app is
+        # driven from a new loop (e.g. separate test clients)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    async def map(self, items: Iterable[T], worker: Callable[[T], Awaitable[Optional[R]]]) -> List[R]:
+        """Apply ``worker`` to every item, returning results in input order.
+
+        Items whose worker returns None are left out; exceptions propagate
+        as with ``asyncio.gather``.
+        """
+        semaphore = self._get_semaphore()
+
+        async def run(item: T) -> Optional[R]:
+            self.waiting += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            try:
+                return await worker(item)
+            finally:
+                self.in_flight -= 1
+                semaphore.release()
+
+        results = await asyncio.gather(*(run(item) for item in items))
+        return [result for result in results if result is not None]
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls for the same key.
+
+    The first caller for a key starts ``fn()`` as a task; callers arriving
+    while it runs await the same task instead of starting their own, and
+    everyone receives its result or exception. The task is shielded, so a
+    cancelled (e.g. disconnected) caller does not cancel it for the others.
+    Results are not kept once the task finishes; caching is up to ``fn``.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        flight = self._flights.get(key)
+        if flight is not None and flight.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+
+            def done(finished: asyncio.Future):
+                if self._flights.get(key) is finished:
+                    del self._flights[key]
+                # Mark the exception retrieved even if every caller went away
+                if not finished.cancelled():
+                    finished.exception()
+
+            flight.add_done_callback(done)
+        return await asyncio.shield(flight)
+
+
+class StaleWhileRevalidate(Generic[T]):
+    """Serve the last computed value, refreshing it in the background.
+
+    The value is recomputed when it is older than ``max_age`` seconds or was
+    flagged by ``invalidate()``; callers keep getting the previous value
+    while that runs. Only the very first ``get()`` (normally pre-empted by a
+    ``refresh()`` at startup) waits for ``compute``. An invalidation arriving
+    mid-refresh triggers another pass, so a change is never lost to a refresh
+    that had already read the old state.
+    """
+
+    def __init__(self, compute: Callable[[], Awaitable[T]], max_age: float):
+        self.compute = compute
+        self.max_age = max_age
+        self.refreshes = 0
+        self.failures = 0
+        self.stale_served = 0
+        self._value: Optional[T] = None
+        self._has_value = False
+        self._computed_at = 0.0
+        self._generation = 0
+        self._computed_generation = -1
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self._computed_at if self._has_value else 0.0
+
+    def is_stale(self) -> bool:
+        return self._computed_generation != self._generation or self.age > self.max_age
+
+    async def _run(self):
+        while True:
+            generation = self._generation
+            try:
+                value = await self.compute()
+            except Exception as e:
+                self.failures += 1
+                if not self._has_value:
+                    raise
+                print(f"Background refresh failed, serving previous value: {e}")
+                return
+            self._value = value
+            self._has_value = True
+            self._computed_at = time.monotonic()
+            self._computed_generation = generation
+            self.refreshes += 1
+            if self._generation == generation:
+                return
+
+    def refresh(self) -> asyncio.Task:
+        """Start a background refresh unless one is already running"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+            # Failures are reported to whoever awaits get(); don't warn otherwise
+            self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._task
+
+    def invalidate(self):
+        """Flag the value as outdated and refresh it right away when possible"""
+        self._generation += 1
+        try:
+            self.refresh()
+        except RuntimeError:
+            # No running loop; the next get() refreshes instead
+            pass
+
+    async def get(self) -> T:
+        if not self._has_value:
+            await asyncio.shield(self.refresh())
+        elif self.is_stale():
+            self.stale_served += 1
+            self.refresh()
+        return self._value
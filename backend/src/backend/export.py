@@ -0,0 +1,276 @@
+"""Static snapshot of the API's read-only payloads.
+
+Renders the course, blog and lab listings and every course, deck, slide
+file, lab and blog post payload by calling the app's own GET endpoints in
+process, and writes each response body to ``<output>/<url path>/index.json``
+next to pre-compressed ``index.json.br``/``index.json.gz`` variants (for
+e.g. nginx ``gzip_static``/``brotli_static``), so any static file server can
+serve the site's read traffic with the same bytes as the API.
+
+``manifest.json`` maps each URL to its file, strong ETag, sizes and a digest
+of the source files it was rendered from (and of the backend code). A rerun
+only renders URLs whose sources changed, reuses everything else as is and
+removes outputs of URLs that no longer exist.
+
+Usage (from ``backend/``, where the app's ``courses/`` and ``blogs/`` live)::
+
+    PYTHONPATH=src python -m backend.export --output snapshot
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .catalog import LAB_FILENAME, is_course_dir
+from .responses import COMPRESS_MIN_BYTES, SUPPORTED_ENCODINGS, compress
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+INDEX_NAME = "index.json"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def code_digest() -> str:
+    """Digest of the backend sources, so a code change re-renders everything"""
+    digest = hashlib.sha256()
+    for path in sorted(_PACKAGE_DIR.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class SourceHasher:
+    """Per-run memo of source file digests (listings share files with pages)"""
+
+    def __init__(self):
+        self._digests: Dict[Path, str] = {}
+
+    def file(self, path: Path) -> str:
+        if path not in self._digests:
+            try:
+                self._digests[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except FileNotFoundError:
+                self._digests[path] = "missing"
+        return self._digests[path]
+
+    def sources(self, paths: Iterable[Path], salt: str) -> str:
+        digest = hashlib.sha256(salt.encode())
+        for path in sorted(paths):
+            digest.update(f"{path.as_posix()}\0{self.file(path)}\n".encode())
+        return digest.hexdigest()
+
+
+def plan(courses_dir: Path, blogs_dir: Path) -> List[Tuple[str, List[Path]]]:
+    """Every exported URL with the source files its payload is rendered from"""
+    course_dirs = sorted(path for path in courses_dir.iterdir() if is_course_dir(path)) if courses_dir.exists() else []
+    blog_dirs = sorted(path for path in blogs_dir.iterdir() if path.is_dir()) if blogs_dir.exists() else []
+
+    def course_sources(course_dir: Path) -> List[Path]:
+        return [course_dir / "config.json", course_dir / "slides" / "slides.md"]
+
+    def lab_files(course_dir: Path) -> List[Path]:
+        return sorted((course_dir / "labs").glob("*.md"))
+
+    def blog_sources(blog_dir: Path) -> List[Path]:
+        return [blog_dir / "config.json", blog_dir / "content.md"]
+
+    urls: List[Tuple[str, List[Path]]] = [
+        ("/api/courses", [path for course_dir in course_dirs for path in course_sources(course_dir)]),
+        ("/api/labs/courses", [path for course_dir in course_dirs for path in lab_files(course_dir)]),
+        ("/api/blogs", [path for blog_dir in blog_dirs for path in blog_sources(blog_dir)]),
+    ]
+    for course_dir in course_dirs:
+        course = course_dir.name
+        urls.append((f"/api/courses/{course}", course_sources(course_dir)))
+        slide_files = sorted((course_dir / "slides").glob("*.md"))
+        if (course_dir / "slides" / "slides.md").exists():
+            urls.append((f"/api/courses/{course}/slides", [course_dir / "slides" / "slides.md"]))
+        urls.append((f"/api/slides/courses/{course}", slide_files))
+        for slide_file in slide_files:
+            urls.append((f"/api/courses/{course}/slides/{slide_file.name}", [slide_file]))
+            urls.append((f"/api/slides/courses/{course}/file/{slide_file.name}", [slide_file]))
+        labs = lab_files(course_dir)
+        urls.append((f"/api/labs/courses/{course}", labs))
+        for lab_file in labs:
+            match = LAB_FILENAME.fullmatch(lab_file.name)
+            if match:
+                urls.append((f"/api/labs/courses/{course}/chapter/{int(match.group(1))}", [lab_file]))
+    for blog_dir in blog_dirs:
+        urls.append((f"/api/blogs/{blog_dir.name}", blog_sources(blog_dir)))
+    return urls
+
+
+async def fetch(app, url: str) -> Tuple[int, bytes]:
+    """GET `url` from the ASGI app in process; returns (status, body)"""
+    requested = False
+    done = asyncio.Event()
+    status = 500
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"snapshot"), (b"accept", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("snapshot", 80),
+    }
+    await app(scope, receive, send)
+    done.set()
+    return status, b"".join(chunks)
+
+
+def output_path(output: Path, url: str) -> Path:
+    return output.joinpath(*url.strip("/").split("/")) / INDEX_NAME
+
+
+def write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def entry_files(output: Path, entry: Dict[str, Any]) -> List[Path]:
+    index = output / entry["path"]
+    return [index] + [index.with_name(index.name + ENCODING_SUFFIXES[encoding]) for encoding in entry["encodings"]]
+
+
+def load_manifest(output: Path) -> Dict[str, Any]:
+    try:
+        manifest = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def remove_entry(output: Path, entry: Dict[str, Any]):
+    """Delete an entry's files and the directories left empty"""
+    files = entry_files(output, entry)
+    for path in files:
+        path.unlink(missing_ok=True)
+    directory = files[0].parent
+    while directory != output:
+        try:
+            directory.rmdir()
+        except OSError:
+            break  # not empty
+        directory = directory.parent
+
+
+def render_entry(output: Path, url: str, body: bytes, sources: str) -> Dict[str, Any]:
+    index = output_path(output, url)
+    write_atomic(index, body)
+    entry: Dict[str, Any] = {
+        "path": index.relative_to(output).as_posix(),
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "size": len(body),
+        "content_type": "application/json",
+        "encodings": {},
+        "sources": sources,
+    }
+    for encoding in SUPPORTED_ENCODINGS:
+        variant = index.with_name(index.name + ENCODING_SUFFIXES[encoding])
+        if len(body) < COMPRESS_MIN_BYTES:
+            # Same threshold as the API: not worth compressing
+            variant.unlink(missing_ok=True)
+            continue
+        compressed = compress(body, encoding)
+        write_atomic(variant, compressed)
+        entry["encodings"][encoding] = {"size": len(compressed)}
+    return entry
+
+
+async def export(output: Path, full: bool = False) -> Dict[str, Any]:
+    # Imported here: the app resolves its data directories against the cwd
+    from .main import BLOGS_DIR, COURSES_DIR, app
+
+    output.mkdir(parents=True, exist_ok=True)
+    code = code_digest()
+    previous_manifest = load_manifest(output)
+    previous = previous_manifest.get("entries", {})
+    # Outputs are only reused when rendered by the same code
+    reusable = previous if not full and previous_manifest.get("code") == code else {}
+    hasher = SourceHasher()
+    entries: Dict[str, Dict[str, Any]] = {}
+    stats = {"rendered": 0, "reused": 0, "skipped": 0, "removed": 0}
+
+    for url, source_files in plan(COURSES_DIR, BLOGS_DIR):
+        sources = hasher.sources(source_files, url)
+        old = reusable.get(url)
+        if old is not None and old["sources"] == sources and all(path.exists() for path in entry_files(output, old)):
+            entries[url] = old
+            stats["reused"] += 1
+            continue
+
+        status, body = await fetch(app, url)
+        if status != 200:
+            # e.g. a malformed file the API answers with an error; not snapshotted
+            print(f"Skipping {url}: HTTP {status}", file=sys.stderr)
+            stats["skipped"] += 1
+            continue
+        entries[url] = await asyncio.to_thread(render_entry, output, url, body, sources)
+        stats["rendered"] += 1
+
+    # Outputs of URLs that are gone (deleted courses, slide files, posts)
+    for url, old in previous.items():
+        if url not in entries:
+            remove_entry(output, old)
+            stats["removed"] += 1
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "code": code,
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "entries": entries,
+    }
+    write_atomic(output / MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+    return {"output": str(output), "urls": len(entries), **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the API's read-only payloads as static files")
+    parser.add_argument("--output", type=Path, default=Path("snapshot"))
+    parser.add_argument("--full", action="store_true", help="Re-render everything, ignoring the previous manifest")
+    args = parser.parse_args()
+
+    result = asyncio.run(export(args.output, full=args.full))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
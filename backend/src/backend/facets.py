@@ -0,0 +1,154 @@
+"""Faceted filtering over the course catalog.
+
+``FacetIndex`` keeps postings lists from each facet value (a tag, a level,
+an author) to the ids of the courses that have it, so a filtered listing
+intersects the postings of the selected values, starting from the smallest,
+and only touches the matching courses. Facet counts are computed over the
+matches too; for level and author, over the courses matching every *other*
+filter, so choosing a level still shows how many courses each other level has.
+
+The index is rebuilt from every listing scan and updated in place by the
+endpoints that create, update, import or delete courses in between.
+"""
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .records import CompactRecord
+
+
+class FacetIndex:
+    def __init__(self, facets: Dict[str, str], match_all: Iterable[str] = ()):
+        # Facet name (query parameter) -> record field. Several selected values
+        # match courses having any of them, or all of them for `match_all` facets
+        self.facets = facets
+        self.match_all = frozenset(match_all)
+        self._records: Dict[str, CompactRecord] = {}
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[Any, Set[str]]] = {facet: {} for facet in facets}
+        self._next_position = 0
+        # Bumped by every update, so an off-loop rebuild can tell it raced one
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _values(self, record: CompactRecord, facet: str) -> Tuple:
+        value = record.get(self.facets[facet])
+        if value is None:
+            return ()
+        if isinstance(value, list):
+            return tuple(item for item in value if isinstance(item, str))
+        return (value,) if isinstance(value, str) else ()
+
+    def rebuild(self, records: Iterable[CompactRecord]):
+        """Replace the index with `records`, keeping their order for results"""
+        self._version += 1
+        self._records = {}
+        self._positions = {}
+        self._postings = {facet: {} for facet in self.facets}
+        self._next_position = 0
+        for record in records:
+            self.add(record)
+
+    async def rebuild_off_loop(self, records: List[CompactRecord], version: Optional[int] = None) -> bool:
+        """`rebuild`, with the new index built in a worker thread and swapped in
+        at once, so lookups never see it half built. If the index was updated
+        since `version` (by default, since the call), `records` may predate
+        that write: the rebuilt index is dropped (returns False) and the
+        writer's next listing scan rebuilds it instead
+        """
+        if version is None:
+            version = self._version
+        fresh = FacetIndex(self.facets, self.match_all)
+        await asyncio.to_thread(fresh.rebuild, records)
+        if self._version != version:
+            return False
+        self._records, self._positions = fresh._records, fresh._positions
+        self._postings, self._next_position = fresh._postings, fresh._next_position
+        return True
+
+    def add(self, record: CompactRecord):
+        """Index a new course, or re-index a changed one in place"""
+        self._version += 1
+        course_id = record.get("id")
+        if course_id in self._records:
+            self._unpost(course_id)
+        else:
+            self._positions[course_id] = self._next_position
+            self._next_position += 1
+        self._records[course_id] = record
+        for facet in self.facets:
+            for value in self._values(record, facet):
+                self._postings[facet].setdefault(value, set()).add(course_id)
+
+    def remove(self, course_id: str):
+        self._version += 1
+        if course_id in self._records:
+            self._unpost(course_id)
+            del self._records[course_id]
+            del self._positions[course_id]
+
+    def _unpost(self, course_id: str):
+        record = self._records[course_id]
+        for facet in self.facets:
+            postings = self._postings[facet]
+            for value in self._values(record, facet):
+                ids = postings.get(value)
+                if ids is not None:
+                    ids.discard(course_id)
+                    if not ids:
+                        del postings[value]
+
+    def _match(self, filters: Dict[str, List[str]], skip: Optional[str] = None) -> Optional[Set[str]]:
+        """Ids matching every filter but `skip`; None means no filter applied (all)"""
+        constraints: List[Set[str]] = []
+        for facet, values in filters.items():
+            if facet == skip or not values:
+                continue
+            postings = self._postings[facet]
+            if facet in self.match_all:
+                constraints.extend(postings.get(value, set()) for value in values)
+            else:
+                constraints.append(set().union(*(postings.get(value, set()) for value in values)))
+        if not constraints:
+            return None
+        constraints.sort(key=len)
+        result = set(constraints[0])
+        for ids in constraints[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def _counts(self, facet: str, ids: Optional[Set[str]]) -> Dict[str, int]:
+        if ids is None:
+            counts = {value: len(postings) for value, postings in self._postings[facet].items()}
+        else:
+            counts: Dict[str, int] = {}
+            for course_id in ids:
+                for value in self._values(self._records[course_id], facet):
+                    counts[value] = counts.get(value, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def search(self, filters: Dict[str, List[str]]) -> Tuple[List[CompactRecord], Dict[str, Dict[str, int]]]:
+        """(matching records in listing order, per-facet value counts)"""
+        ids = self._match(filters)
+        if ids is None:
+            # Insertion order is listing order (re-indexing keeps a course's slot)
+            records = list(self._records.values())
+        else:
+            records = [self._records[course_id] for course_id in sorted(ids, key=self._positions.__getitem__)]
+        facets = {}
+        for facet in self.facets:
+            # Counts for an any-of facet ignore its own selection, so the
+            # alternatives stay visible; all-of facets narrow the current matches
+            if filters.get(facet) and facet not in self.match_all:
+                facet_ids = self._match(filters, skip=facet)
+            else:
+                facet_ids = ids
+            facets[facet] = self._counts(facet, facet_ids)
+        return records, facets
@@ -0,0 +1,45 @@
+"""Deferred imports for modules only needed once content is rendered.
+
+``markdown``, ``frontmatter`` and ``yaml`` (and Pygments, which codehilite
+pulls in) cost tens of milliseconds to import, paid by every cold start even
+when the first request is a listing served from memory. ``LazyModule`` stands
+in for such a module and imports it on first attribute access, so call sites
+keep reading ``markdown.Markdown(...)``.
+"""
+import importlib
+import sys
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._name in sys.modules
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}{'' if self.loaded else ' (not loaded)'}>"
+
+
+frontmatter = LazyModule("frontmatter")
+markdown = LazyModule("markdown")
+yaml = LazyModule("yaml")
+
+
+@lru_cache(maxsize=None)
+def yaml_loader():
+    """libyaml's loader when PyYAML was built with it; same results, much faster"""
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
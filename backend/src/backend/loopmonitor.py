@@ -0,0 +1,134 @@
+"""Event-loop lag monitoring and stall reports.
+
+A task on the event loop wakes up every ``interval`` seconds and records how
+late it woke up (the loop's lag) in the ``event_loop_lag_seconds`` histogram.
+A watchdog thread checks that task's heartbeat: when the loop has not come
+round for longer than ``threshold``, something is blocking it right now, so
+the watchdog grabs the loop thread's current stack and the request it is
+serving (method, path, route and path parameters, read from the ASGI scope
+of the frames on that stack). Once the loop is back, the stall is logged
+with its full duration and counted in ``event_loop_stall_seconds`` by route.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import Any, Deque, Dict, Optional
+
+from .metrics import METRICS
+
+STACK_LIMIT = 40
+RECENT_STALLS = 20
+
+METRICS.describe_histogram("event_loop_lag_seconds", "How late the event loop ran a task scheduled to wake up")
+METRICS.describe_histogram("event_loop_stall_seconds", "Event loop stalls over the threshold, by the route that caused them")
+
+
+def _request_from_stack(frame: Optional[FrameType]) -> Dict[str, Any]:
+    """The request being served by the innermost frames, from their ASGI scope"""
+    fallback: Dict[str, Any] = {}
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            request = {"method": scope.get("method"), "path": scope.get("path")}
+            route = scope.get("route")
+            if route is not None:
+                request["route"] = getattr(route, "path", str(route))
+                request["path_params"] = dict(scope.get("path_params") or {})
+                return request
+            fallback = fallback or request
+        frame = frame.f_back
+    return fallback
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_STALLS)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_tick = time.monotonic()
+        # Stack and request captured by the watchdog during the current stall
+        self._capture: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        """Start monitoring the running loop (and the watchdog thread, once)"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._task = loop.create_task(self._tick())
+        if self._watchdog is None:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+        self._watchdog = None
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_tick = time.monotonic()
+            METRICS.observe("event_loop_lag_seconds", lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._report(lag)
+            else:
+                self._capture = None
+
+    def _watch(self):
+        poll = min(self.interval, self.threshold / 2)
+        while not self._stopped.wait(poll):
+            blocked_for = time.monotonic() - self._last_tick - self.interval
+            if blocked_for < self.threshold or self._capture is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            # The loop is still blocked: whatever it is running is the culprit
+            self._capture = {
+                "stack": "".join(traceback.format_stack(frame, limit=STACK_LIMIT)),
+                "request": _request_from_stack(frame),
+            }
+
+    def _report(self, lag: float):
+        capture, self._capture = self._capture, None
+        if capture is None:
+            # Shorter than a watchdog poll; the culprit is already gone
+            capture = {"stack": None, "request": {}}
+        request = capture["request"]
+        if capture["stack"] is None:
+            route = "unknown"
+        else:
+            route = request.get("route", "background")
+        self.stalls += 1
+        METRICS.observe("event_loop_stall_seconds", lag, route=route)
+        report = {"time": time.time(), "duration_ms": round(lag * 1000, 1), **capture}
+        self.recent.append(report)
+
+        where = " ".join(str(request[key]) for key in ("method", "path") if request.get(key)) or "outside a request"
+        lines = [f"Event loop blocked for {lag * 1000:.0f} ms ({where})"]
+        if request.get("route"):
+            lines.append(f"  route: {request['route']} params: {request.get('path_params', {})}")
+        if capture["stack"]:
+            lines.append("  stack while blocked:")
+            lines.append(capture["stack"].rstrip())
+        print("\n".join(lines))
@@ -1,31 +1,42 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request, Depends, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.routing import Match
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import os
 import json
 import aiofiles
-import frontmatter
-import markdown
 import uuid
 import re
 import zipfile
 import tempfile
 import shutil
+import asyncio
+from contextvars import ContextVar
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import Callable, Iterator, List, Dict, Any, Optional
 from pathlib import Path
 
-app = FastAPI(title="Training System API", version="1.0.0")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+from .admission import AdmissionGate, AdmissionMiddleware, AdmissionRejected
+from .blobstore import BlobStore
+from .catalog import LabCatalog, LabEntry, is_course_dir, read_markdown_head
+from .concurrency import FanOut, SingleFlight, StaleWhileRevalidate
+from .facets import FacetIndex
+from .lazy import frontmatter, markdown, yaml, yaml_loader
+from .loopmonitor import LoopMonitor
+from .metrics import METRICS, stage, start_request, finish_request
+from .profiling import ProfileCapture, ProfilingExecutor, profile_name
+from .records import BlogRecord, CourseRecord
+from .suggest import PrefixIndex
+from .render_cache import RenderCache, SharedRenderStore
+from .trash import CourseTrash
+from .uploads import UploadError, UploadSessionGone, UploadSessions
+from .warmup import Warmup
+from .responses import SUPPORTED_ENCODINGS, FastJSONResponse, JSONCompressionMiddleware, PreSerializedJSONResponse, compress, negotiate_encoding, serialize
+
+app = FastAPI(title="Training System API", version="1.0.0", default_response_class=FastJSONResponse)
 
 COURSES_DIR = Path("courses")
 COURSES_DIR.mkdir(exist_ok=True)
@@ -39,15 +50,241 @@ TEMP_SLIDES_DIR.mkdir(exist_ok=True)
 TEMP_LABS_DIR = Path("temp_labs")
 TEMP_LABS_DIR.mkdir(exist_ok=True)
 
-# Mount static assets directories for courses
+# Resumable asset uploads: staging files and session state
+TEMP_UPLOADS_DIR = Path("temp_uploads")
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(5 * 1024 ** 3)))
+UPLOAD_SESSION_TTL = float(os.environ.get("UPLOAD_SESSION_TTL", str(24 * 3600)))
+UPLOAD_SESSIONS = UploadSessions(TEMP_UPLOADS_DIR, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES, UPLOAD_SESSION_TTL)
+
+# Render cache: an in-process LRU, optionally backed by a SQLite file shared by
+# all workers on the host (set RENDER_CACHE_DB to enable it)
+RENDER_CACHE_MAX_MB = int(os.environ.get("RENDER_CACHE_MAX_MB", "64"))
+RENDER_CACHE_DB = os.environ.get("RENDER_CACHE_DB")
+RENDER_CACHE_DB_MAX_MB = int(os.environ.get("RENDER_CACHE_DB_MAX_MB", "256"))
+
+RENDER_CACHE = RenderCache(
+    max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024,
+    shared=SharedRenderStore(Path(RENDER_CACHE_DB), max_bytes=RENDER_CACHE_DB_MAX_MB * 1024 * 1024) if RENDER_CACHE_DB else None,
+)
+
+# Optional content-addressed asset store: set ASSET_BLOB_STORE to a directory on
+# the same filesystem as courses/ (e.g. "blobs") to store each distinct asset
+# once and hard-link it into every course that uses it
+ASSET_BLOB_STORE = os.environ.get("ASSET_BLOB_STORE")
+BLOB_STORE = BlobStore(Path(ASSET_BLOB_STORE)) if ASSET_BLOB_STORE else None
+
+# Deleted courses are renamed into courses/.trash at once and their files
+# removed in a worker thread (then unused blobs are collected)
+COURSE_TRASH = CourseTrash(COURSES_DIR / ".trash", on_reclaimed=BLOB_STORE.collect if BLOB_STORE is not None else None)
+
+# Thread pool used by aiofiles and other blocking file work (installed as the
+# event loop's default executor on startup); jobs of a profiled request are profiled too
+IO_THREADS = int(os.environ.get("IO_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
+IO_EXECUTOR = ProfilingExecutor(max_workers=IO_THREADS, thread_name_prefix="io")
+# Directory-scanning endpoints read their entries concurrently, bounded by the pool size
+FAN_OUT = FanOut(limit=IO_THREADS)
+
+# Concurrent cache-cold requests for the same file version and profile share
+# one read and render instead of each doing their own
+RENDER_FLIGHTS = SingleFlight()
+
+# Admission control: per route class, at most LIMIT requests run at once and
+# QUEUE more wait up to ADMISSION_QUEUE_TIMEOUT seconds; the rest get a 503
+# with Retry-After. Cheap endpoints (root, assets, metrics) are not gated.
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "2"))
+ADMISSION_DEFAULTS = {
+    "render": (IO_THREADS, 4 * IO_THREADS),   # deck, lab, blog post and list rendering
+    "listing": (IO_THREADS, 4 * IO_THREADS),  # course, blog and lab overviews
+    "upload": (4, 16),                        # imports and file uploads
+}
+ADMISSION_GATES = {
+    name: AdmissionGate(
+        name,
+        limit=int(os.environ.get(f"ADMISSION_{name.upper()}_LIMIT", str(limit))),
+        max_queue=int(os.environ.get(f"ADMISSION_{name.upper()}_QUEUE", str(queue))),
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    )
+    for name, (limit, queue) in ADMISSION_DEFAULTS.items()
+}
+
+def admit(route_class: str):
+    """Route dependency declaring the route's admission class. The slot itself
+    is taken by AdmissionMiddleware, before the request body is read, and held
+    until the response has been sent.
+    """
+    if route_class not in ADMISSION_GATES:
+        raise KeyError(route_class)
+    
+    async def dependency():
+        return None
+    
+    dependency.admission_class = route_class
+    return Depends(dependency)
+
+def route_admission_class(scope) -> Optional[str]:
+    """Admission class declared with admit() on the route `scope` is dispatched to"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            for dependency in getattr(route, "dependencies", ()):
+                route_class = getattr(dependency.dependency, "admission_class", None)
+                if route_class is not None:
+                    return route_class
+            return None
+    return None
+
+# Middleware added later wraps the earlier ones: admission runs inside CORS (so
+# 503s carry CORS headers) and inside compression
+app.add_middleware(
+    AdmissionMiddleware,
+    gates=ADMISSION_GATES,
+    route_class=route_admission_class,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# JSON responses that are not served from the render cache are compressed on
+# the fly; cached ones arrive already encoded, and streams, files and media
+# (assets, lab assets) are passed through untouched
+app.add_middleware(JSONCompressionMiddleware)
+
+
+# Chapter/title index of every course's labs, read from file heads only
+LAB_CATALOG = LabCatalog(COURSES_DIR, FAN_OUT)
+
+# Counters for write-through pre-rendering (see prerender)
+PRERENDER_STATS = {"jobs": 0, "failures": 0, "unchanged_writes": 0}
+
+# The course, blog and lab overviews are served from memory and rebuilt in the
+# background once older than LISTING_MAX_AGE seconds or after a change
+LISTING_MAX_AGE = float(os.environ.get("LISTING_MAX_AGE", "5"))
+COURSE_LISTING = StaleWhileRevalidate(lambda: scan_courses(), LISTING_MAX_AGE)
+BLOG_LISTING = StaleWhileRevalidate(lambda: scan_blogs(), LISTING_MAX_AGE)
+LAB_LISTING = StaleWhileRevalidate(lambda: scan_labs(), LISTING_MAX_AGE)
+LISTINGS = {"courses": COURSE_LISTING, "blogs": BLOG_LISTING, "labs": LAB_LISTING}
+
+# Postings from tag/level/author values to course ids for filtered listings;
+# rebuilt with each course listing scan and updated by the course write endpoints
+COURSE_FACETS = FacetIndex({"tag": "tags", "level": "level", "author": "author"}, match_all=["tag"])
+
+# Word-prefix index of course, lab and blog titles for /api/suggest; synced by
+# the listing scans and updated by the endpoints that write courses and labs
+SUGGESTIONS = PrefixIndex()
+SUGGEST_MAX_LIMIT = int(os.environ.get("SUGGEST_MAX_LIMIT", "20"))
+
+# Warm-up that runs in the background once the app is serving (progress at
+# /api/ready): listings, asset mounts, the markdown stack, then the decks of
+# the first WARMUP_DECKS courses pre-rendered into the render cache
+WARMUP_DECKS = int(os.environ.get("WARMUP_DECKS", "32"))
+WARMUP = Warmup()
+
+# Event-loop lag histogram, plus a report with the blocking stack and request
+# whenever the loop stalls for longer than LOOP_STALL_THRESHOLD seconds (0 disables)
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL", "0.05"))
+LOOP_STALL_THRESHOLD = float(os.environ.get("LOOP_STALL_THRESHOLD", "0.1"))
+LOOP_MONITOR = LoopMonitor(LOOP_MONITOR_INTERVAL, LOOP_STALL_THRESHOLD) if LOOP_STALL_THRESHOLD > 0 else None
+
+# Per-request profiling, triggered with an "X-Profile: 1" header or "?profile=1"
+# ("inline" instead of "1" returns the report as the response body)
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILES_DIR = Path(os.environ.get("PROFILES_DIR", "profiles"))
+PROFILE_MODES = ("1", "true", "inline")
+_profile_lock = asyncio.Lock()
+
+# Markdown extension sets used across endpoints, by render profile name
+MARKDOWN_PROFILES = {
+    "slides": {"extensions": ['codehilite', 'fenced_code', 'tables']},
+    "document": {"extensions": ['codehilite', 'fenced_code', 'tables', 'toc']},
+    "blog": {
+        "extensions": [
+            'codehilite',
+            'fenced_code',
+            'tables',
+            'toc',
+            'nl2br',        # Convert newlines to <br>
+            'sane_lists',   # Better list handling
+            'smarty',       # Smart quotes and dashes
+        ],
+        "extension_configs": {
+            'codehilite': {
+                'css_class': 'highlight',
+                'use_pygments': True,
+                'noclasses': False,
+                'linenos': False
+            },
+            'toc': {
+                'permalink': True,
+                'permalink_class': 'header-link',
+                'permalink_title': '链接到此章节'
+            }
+        },
+    },
+}
+
+async def warm_listings(progress):
+    # Build the listings now so no request pays for the first directory scan
+    await asyncio.gather(*(listing.refresh() for listing in LISTINGS.values()))
+
+async def warm_asset_mounts(progress):
+    # Mount each course's assets directory as static files
+    def find_assets_dirs():
+        return [
+            course_dir / "assets" for course_dir in COURSES_DIR.iterdir()
+            if is_course_dir(course_dir) and (course_dir / "assets").exists()
+        ]
+    
+    for assets_dir in await asyncio.to_thread(find_assets_dirs):
+        course_name = assets_dir.parent.name
+        app.mount(f"/assets/{course_name}", StaticFiles(directory=assets_dir), name=f"assets-{course_name}")
+
+async def warm_markdown(progress):
+    # Import markdown, its extensions and Pygments' lexer registry off the
+    # request path (rendered directly, bypassing the render cache)
+    def load():
+        for profile in MARKDOWN_PROFILES.values():
+            markdown.Markdown(**profile).convert("# Warm-up\n\n```python\nprint(1)\n```\n")
+        split_document("---\ntitle: warm-up\n---\n")
+    
+    await asyncio.to_thread(load)
+
+async def warm_decks(progress):
+    courses = (await COURSE_LISTING.get())[:WARMUP_DECKS]
+    for done, course in enumerate(courses):
+        progress(done, len(courses))
+        slides_file = COURSES_DIR / course.get("id") / "slides" / "slides.md"
+        try:
+            content = await read_text_file(slides_file)
+            await asyncio.to_thread(prerender_json, "deck", content, lambda: render_deck(content))
+        except (OSError, UnicodeDecodeError, ValueError):
+            continue
+    progress(len(courses), len(courses))
+
+WARMUP.step("listings", warm_listings)
+WARMUP.step("asset_mounts", warm_asset_mounts)
+WARMUP.step("markdown", warm_markdown)
+WARMUP.step("render_cache", warm_decks)
+
 @app.on_event("startup")
 async def startup_event():
-    # Mount each course's assets directory as static files
-    for course_dir in COURSES_DIR.iterdir():
-        if course_dir.is_dir():
-            assets_dir = course_dir / "assets"
-            if assets_dir.exists():
-                app.mount(f"/assets/{course_dir.name}", StaticFiles(directory=assets_dir), name=f"assets-{course_dir.name}")
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(IO_EXECUTOR)
+    
+    if LOOP_MONITOR is not None:
+        LOOP_MONITOR.start()
+    
+    # Everything else only makes requests faster: do it once we are serving
+    WARMUP.start()
+    # Finish deletions interrupted by a restart
+    loop.run_in_executor(None, COURSE_TRASH.reclaim)
 
 # Route to serve course assets
 @app.get("/assets/{course_name}/{path:path}")
@@ -112,57 +349,211 @@ class LabContent(BaseModel):
     content: str
     html: str
 
+class UploadSessionCreateRequest(BaseModel):
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+    chunk_size: Optional[int] = None
+
+class UploadFinalizeRequest(BaseModel):
+    sha256: Optional[str] = None
+
+class BatchItem(BaseModel):
+    resource: str
+    course: str
+    options: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """Time each request by stage, report it in Server-Timing and aggregate per route"""
+    recorder, token = start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        finish_request(token)
+    
+    total = recorder.elapsed()
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    METRICS.observe("request_duration_seconds", total, route=route_path, method=request.method)
+    for stage_name, seconds in recorder.totals.items():
+        METRICS.observe("request_stage_duration_seconds", seconds, route=route_path, stage=stage_name)
+    
+    response.headers["Server-Timing"] = recorder.server_timing(total)
+    return response
+
+@app.middleware("http")
+async def capture_request_profile(request: Request, call_next):
+    """Run a single request under cProfile/tracemalloc when asked to and enabled"""
+    mode = (request.headers.get("X-Profile") or request.query_params.get("profile") or "").lower()
+    # Only one capture at a time: cProfile cannot be nested
+    if not PROFILING_ENABLED or mode not in PROFILE_MODES or _profile_lock.locked():
+        return await call_next(request)
+    
+    async with _profile_lock:
+        capture = ProfileCapture()
+        with capture:
+            response = await call_next(request)
+    
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else request.url.path
+    title = f"{request.method} {request.url.path} -> {response.status_code}"
+    if mode == "inline":
+        return PlainTextResponse(capture.report(title), headers={"X-Profile-Status": str(response.status_code)})
+    
+    report_path = capture.save(PROFILES_DIR, profile_name(route_path, request.scope.get("path_params", {})), title)
+    response.headers["X-Profile-Report"] = str(report_path)
+    return response
+
+def _render_cache_stats(field: str):
+    return lambda: RENDER_CACHE.stats()[field]
+
+METRICS.gauge("render_cache_entries", "Entries in the in-process render cache", _render_cache_stats("entries"))
+METRICS.gauge("render_cache_bytes", "Approximate payload bytes in the in-process render cache", _render_cache_stats("bytes"))
+METRICS.gauge("render_cache_hits_total", "In-process render cache hits", _render_cache_stats("hits"), kind="counter")
+METRICS.gauge("render_cache_shared_hits_total", "Shared render cache hits", _render_cache_stats("shared_hits"), kind="counter")
+METRICS.gauge("render_cache_misses_total", "Render cache misses", _render_cache_stats("misses"), kind="counter")
+METRICS.gauge("render_cache_shared_bytes", "Bytes held in the shared render cache",
+              lambda: RENDER_CACHE.shared.stats()["bytes"] if RENDER_CACHE.shared is not None else 0)
+METRICS.gauge("io_executor_max_workers", "Size of the file I/O thread pool", lambda: IO_EXECUTOR.max_workers)
+METRICS.gauge("io_executor_active", "Work items running on a file I/O thread", lambda: IO_EXECUTOR.active)
+METRICS.gauge("io_executor_queued", "Work items waiting for a file I/O thread", lambda: IO_EXECUTOR.queued)
+METRICS.gauge("fan_out_in_flight", "Listing entries being read concurrently", lambda: FAN_OUT.in_flight)
+METRICS.gauge("fan_out_waiting", "Listing entries waiting for a fan-out slot", lambda: FAN_OUT.waiting)
+METRICS.gauge("suggest_entries", "Titles in the suggestion index", lambda: len(SUGGESTIONS))
+METRICS.gauge("suggest_terms", "Search terms in the suggestion index", lambda: SUGGESTIONS.term_count)
+METRICS.gauge("render_flights_in_flight", "Renders currently running on behalf of waiting requests", lambda: RENDER_FLIGHTS.in_flight)
+def _admission_stats(field: str):
+    return lambda: {(("class", name),): getattr(gate, field) for name, gate in ADMISSION_GATES.items()}
+
+METRICS.gauge("admission_limit", "Concurrent requests allowed per route class", _admission_stats("limit"))
+METRICS.gauge("admission_active", "Requests running per route class", _admission_stats("active"))
+METRICS.gauge("admission_queued", "Requests waiting for a slot per route class", _admission_stats("queued"))
+METRICS.gauge("admission_admitted_total", "Requests admitted per route class", _admission_stats("admitted"), kind="counter")
+METRICS.gauge("admission_rejected_total", "Requests rejected with 503 per route class and reason",
+              lambda: {(("class", name), ("reason", reason)): count
+                       for name, gate in ADMISSION_GATES.items() for reason, count in gate.rejected.items()},
+              kind="counter")
+def _listing_stats(field: str):
+    return lambda: {(("listing", name),): getattr(listing, field) for name, listing in LISTINGS.items()}
+
+METRICS.gauge("listing_age_seconds", "Age of the cached listing", _listing_stats("age"))
+METRICS.gauge("listing_refreshes_total", "Background listing rebuilds", _listing_stats("refreshes"), kind="counter")
+METRICS.gauge("listing_refresh_failures_total", "Failed listing rebuilds", _listing_stats("failures"), kind="counter")
+METRICS.gauge("listing_stale_served_total", "Listing requests answered while a rebuild was due", _listing_stats("stale_served"), kind="counter")
+METRICS.gauge("prerender_jobs_total", "Background pre-renders completed after writes", lambda: PRERENDER_STATS["jobs"], kind="counter")
+METRICS.gauge("prerender_failures_total", "Background pre-renders that failed", lambda: PRERENDER_STATS["failures"], kind="counter")
+METRICS.gauge("unchanged_writes_total", "Writes skipped because the content was unchanged", lambda: PRERENDER_STATS["unchanged_writes"], kind="counter")
+if BLOB_STORE is not None:
+    METRICS.gauge("blob_store_blobs_written_total", "Distinct assets written to the blob store", lambda: BLOB_STORE.blobs_written, kind="counter")
+    METRICS.gauge("blob_store_bytes_deduplicated_total", "Asset bytes linked from existing blobs instead of written",
+                  lambda: BLOB_STORE.bytes_deduplicated, kind="counter")
+METRICS.gauge("render_coalesced_total", "Requests that awaited an identical in-flight render", lambda: RENDER_FLIGHTS.coalesced, kind="counter")
+METRICS.gauge("course_trash_entries", "Deleted course directories not yet reclaimed", lambda: len(COURSE_TRASH.entries()))
+METRICS.gauge("course_trash_bytes_reclaimed_total", "Bytes freed by reclaiming deleted courses",
+              lambda: COURSE_TRASH.bytes_reclaimed, kind="counter")
+METRICS.gauge("course_trash_failures_total", "Paths that could not be removed while reclaiming",
+              lambda: COURSE_TRASH.failed, kind="counter")
+if LOOP_MONITOR is not None:
+    METRICS.gauge("event_loop_stalls_total", "Event loop stalls over LOOP_STALL_THRESHOLD", lambda: LOOP_MONITOR.stalls, kind="counter")
+    METRICS.gauge("event_loop_max_lag_seconds", "Largest event loop lag seen", lambda: LOOP_MONITOR.max_lag)
+METRICS.gauge("warmup_ready", "1 once the background warm-up has finished", lambda: int(WARMUP.ready))
+
 @app.get("/")
 def read_root():
     return {"message": "Training System API"}
 
-@app.get("/api/courses")
-async def get_courses():
-    courses = []
-    for course_dir in COURSES_DIR.iterdir():
-        if course_dir.is_dir():
-            course_info = await get_course_info(course_dir.name)
-            courses.append(course_info)
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics: per-route latency and stage histograms, cache and executor gauges"""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/trash")
+async def get_trash_status():
+    """Deleted courses still being reclaimed, reclaim progress and recent failures"""
+    return await asyncio.to_thread(COURSE_TRASH.status)
+
+@app.get("/api/ready")
+async def readiness(strict: bool = False):
+    """Warm-up progress; requests are served throughout, just colder until ready.
+    
+    With ?strict=1 the status is 503 until warm-up has finished, for probes
+    that should hold traffic back until then.
+    """
+    status = WARMUP.status()
+    if strict and not status["ready"]:
+        return FastJSONResponse(status, status_code=503)
+    return status
+
+@app.get("/api/courses", dependencies=[admit("listing")])
+async def get_courses(
+    tag: Optional[List[str]] = Query(None),
+    level: Optional[List[str]] = Query(None),
+    author: Optional[List[str]] = Query(None),
+    facets: bool = False,
+):
+    """All courses, or with any filter (or `facets=true`) the matching courses
+    and per-facet value counts. Repeated `tag`s must all match; repeated
+    `level`s or `author`s match any of them.
+    """
+    courses = await COURSE_LISTING.get()
+    if not (tag or level or author or facets):
+        return [course.to_dict() for course in courses]
+    
+    matches, counts = COURSE_FACETS.search({"tag": tag, "level": level, "author": author})
+    return {
+        "courses": [course.to_dict() for course in matches],
+        "total": len(matches),
+        "facets": counts
+    }
+
+async def scan_courses() -> List[CourseRecord]:
+    async def load_course(course_dir: Path) -> CourseRecord:
+        return CourseRecord.from_dict(await get_course_info(course_dir.name))
+    
+    # Listing, parsing and indexing all happen in the thread pool; the loop
+    # only swaps the finished indexes in, unless a write indexed a course
+    # since the scan started (it also queued the next scan)
+    facets_version = COURSE_FACETS.version
+    course_dirs = await asyncio.to_thread(list_course_dirs)
+    courses = await FAN_OUT.map(course_dirs, load_course)
+    await COURSE_FACETS.rebuild_off_loop(courses, facets_version)
+    await SUGGESTIONS.sync_off_loop("course:", (course_suggestion(course) for course in courses))
     return courses
 
+def list_course_dirs() -> List[Path]:
+    return [course_dir for course_dir in COURSES_DIR.iterdir() if is_course_dir(course_dir)]
+
 @app.get("/api/courses/{course_id}")
 async def get_course(course_id: str):
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     return await get_course_info(course_id)
 
-@app.get("/api/courses/{course_id}/slides")
-async def get_course_slides(course_id: str):
+@app.get("/api/courses/{course_id}/slides", dependencies=[admit("render")])
+async def get_course_slides(course_id: str, request: Request, stream: bool = False):
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     slides_file = course_path / "slides" / "slides.md"
     if not slides_file.exists():
         raise HTTPException(status_code=404, detail="Slides not found")
     
-    async with aiofiles.open(slides_file, 'r', encoding='utf-8') as f:
-        content = await f.read()
-    
-    post = frontmatter.loads(content)
-    md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables'])
-    html_content = md.convert(post.content)
-    
-    slides = parse_slides(post.content, global_metadata=post.metadata)
-    
-    return {
-        "metadata": post.metadata,
-        "slides": slides,
-        "html": html_content
-    }
+    if stream or wants_ndjson(request):
+        return await stream_deck_response(slides_file)
+    return await cached_json_response(request, "deck", [slides_file], render_deck)
 
-@app.get("/api/courses/{course_id}/slides/{filename}")
-async def get_specific_slide_file_presentation(course_id: str, filename: str):
+@app.get("/api/courses/{course_id}/slides/{filename}", dependencies=[admit("render")])
+async def get_specific_slide_file_presentation(course_id: str, filename: str, request: Request, stream: bool = False):
     """Get specific slide file content formatted for presentation"""
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     slide_file = course_path / "slides" / filename
@@ -170,22 +561,10 @@ async def get_specific_slide_file_presentation(course_id: str, filename: str):
         raise HTTPException(status_code=404, detail="Slide file not found")
     
     try:
-        async with aiofiles.open(slide_file, 'r', encoding='utf-8') as f:
-            content = await f.read()
-        
-        # Parse frontmatter and content
-        post = frontmatter.loads(content)
-        md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables'])
-        html_content = md.convert(post.content)
-        
         # Parse slides from the specific file
-        slides = parse_slides(post.content, global_metadata=post.metadata)
-        
-        return {
-            "metadata": post.metadata,
-            "slides": slides,
-            "html": html_content
-        }
+        if stream or wants_ndjson(request):
+            return await stream_deck_response(slide_file)
+        return await cached_json_response(request, "deck", [slide_file], render_deck)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading slide file: {str(e)}")
@@ -256,21 +635,21 @@ End of the presentation.
     slides_file = slides_dir / "slides.md"
     async with aiofiles.open(slides_file, 'w', encoding='utf-8') as f:
         await f.write(slides_content)
+    COURSE_LISTING.invalidate()
     
-    return await get_course_info(course_id)
+    return await index_course(course_id)
 
 @app.put("/api/courses/{course_id}")
 async def update_course(course_id: str, course_update: CourseUpdate):
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     config_file = course_path / "config.json"
     
     # Read existing config
     if config_file.exists():
-        async with aiofiles.open(config_file, 'r', encoding='utf-8') as f:
-            config = json.loads(await f.read())
+        config = json.loads(await read_text_file(config_file))
     else:
         config = {"id": course_id}
     
@@ -289,25 +668,27 @@ async def update_course(course_id: str, course_update: CourseUpdate):
     # Save updated config
     async with aiofiles.open(config_file, 'w', encoding='utf-8') as f:
         await f.write(json.dumps(config, indent=2, ensure_ascii=False))
+    COURSE_LISTING.invalidate()
     
-    return await get_course_info(course_id)
+    return await index_course(course_id)
 
 @app.put("/api/courses/{course_id}/slides")
-async def update_course_slides(course_id: str, slides_update: SlidesUpdate):
+async def update_course_slides(course_id: str, slides_update: SlidesUpdate, background_tasks: BackgroundTasks):
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     slides_file = course_path / "slides" / "slides.md"
     
     # Save updated slides content
-    async with aiofiles.open(slides_file, 'w', encoding='utf-8') as f:
-        await f.write(slides_update.content)
+    if await write_text_if_changed(slides_file, slides_update.content):
+        COURSE_LISTING.invalidate()
+        background_tasks.add_task(prerender, "deck", slides_update.content)
     
-    # Return updated slides
-    return await get_course_slides_internal(course_id)
+    # Return updated slides, rendered from what was just written and off the event loop
+    return await asyncio.to_thread(render_deck, slides_update.content, False)
 
-@app.post("/api/courses/import")
+@app.post("/api/courses/import", dependencies=[admit("upload")])
 async def import_course(file: UploadFile = File(...)):
     # Validate file type
     if not (file.filename.endswith('.zip') or file.filename.endswith('.md')):
@@ -325,15 +706,17 @@ async def import_course_from_zip(file: UploadFile):
         temp_path = Path(temp_dir)
         zip_path = temp_path / file.filename
         
-        # Save uploaded ZIP file
+        # Save and extract the uploaded ZIP file in the thread pool
         content = await file.read()
-        with open(zip_path, 'wb') as f:
-            f.write(content)
         
-        # Extract ZIP file
-        try:
+        def extract():
+            with open(zip_path, 'wb') as f:
+                f.write(content)
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
                 zip_ref.extractall(temp_path)
+        
+        try:
+            await asyncio.to_thread(extract)
         except zipfile.BadZipFile:
             raise HTTPException(status_code=400, detail="Invalid ZIP file")
         
@@ -354,8 +737,7 @@ async def import_course_from_zip(file: UploadFile):
         # Read config.json
         config_file = course_dir / "config.json"
         try:
-            async with aiofiles.open(config_file, 'r', encoding='utf-8') as f:
-                config = json.loads(await f.read())
+            config = json.loads(await read_text_file(config_file))
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid config.json: {str(e)}")
         
@@ -367,8 +749,9 @@ async def import_course_from_zip(file: UploadFile):
         if target_path.exists():
             raise HTTPException(status_code=400, detail=f"Course with ID '{course_id}' already exists")
         
-        # Copy course directory to courses folder
-        shutil.copytree(course_dir, target_path)
+        # Copy course directory to courses folder (assets are hashed into the
+        # blob store on the way, so this runs in the thread pool)
+        await asyncio.to_thread(shutil.copytree, course_dir, target_path, copy_function=course_copy_function(target_path))
         
         # Ensure config has correct ID
         config["id"] = course_id
@@ -380,9 +763,13 @@ async def import_course_from_zip(file: UploadFile):
         (target_path / "slides").mkdir(exist_ok=True)
         (target_path / "labs").mkdir(exist_ok=True)
         (target_path / "assets").mkdir(exist_ok=True)
+        await LAB_CATALOG.refresh_course(course_id)
+        index_labs(course_id)
+        COURSE_LISTING.invalidate()
+        LAB_LISTING.invalidate()
         
         # Return course info
-        return await get_course_info(course_id)
+        return await index_course(course_id)
 
 async def import_course_from_markdown_file(file: UploadFile):
     # Read markdown content
@@ -408,14 +795,24 @@ async def import_course_from_markdown_file(file: UploadFile):
     return await create_course(course_data)
 
 @app.delete("/api/courses/{course_id}")
-async def delete_course(course_id: str):
+async def delete_course(course_id: str, background_tasks: BackgroundTasks):
     course_path = COURSES_DIR / course_id
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Remove course directory and all its contents
-    import shutil
-    shutil.rmtree(course_path)
+    # Move the course out of sight at once; its files are removed in the background
+    try:
+        COURSE_TRASH.bury(course_path)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete course: {str(e)}")
+    background_tasks.add_task(COURSE_TRASH.reclaim)
+    LAB_CATALOG.remove_course(course_id)
+    COURSE_FACETS.remove(course_id)
+    SUGGESTIONS.remove(f"course:{course_id}")
+    SUGGESTIONS.remove_prefix(f"lab:{course_id}/")
+    COURSE_LISTING.invalidate()
+    LAB_LISTING.invalidate()
+    await UPLOAD_SESSIONS.discard_course(course_id)
     
     return {"message": f"Course {course_id} deleted successfully"}
 
@@ -439,56 +836,46 @@ async def download_course_template():
     )
 
 # Slides endpoints
-@app.get("/api/slides/courses/{course_name}")
-async def get_course_slides_files(course_name: str):
-    """Get all slides files for a specific course"""
+@app.get("/api/slides/courses/{course_name}", dependencies=[admit("render")])
+async def get_course_slides_files(course_name: str, fields: Optional[str] = None, view: Optional[str] = None):
+    """Get all slides files for a specific course
+    
+    `fields` (comma-separated) or `view=summary` limit what is returned; files are
+    only rendered when `html` is requested.
+    """
+    selected = parse_fields(fields, view, SLIDE_FILE_FIELDS, SLIDE_FILE_SUMMARY_FIELDS)
+    
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     slides_dir = course_path / "slides"
     if not slides_dir.exists():
         return {"course_name": course_name, "slides": []}
     
-    slides = []
-    for slide_file in slides_dir.glob("*.md"):
+    async def load_slide_file(slide_file: Path) -> Optional[Dict[str, Any]]:
         try:
-            async with aiofiles.open(slide_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            document = await load_markdown_fields(slide_file, selected)
+            title = document.pop("title") or slide_file.stem.replace('-', ' ').title()
             
-            # Parse frontmatter and content
-            post = frontmatter.loads(content)
-            md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables', 'toc'])
-            html_content = md.convert(post.content)
-            
-            # Extract title from content (first # heading)
-            title_match = re.search(r'^#\s+(.+)$', post.content, re.MULTILINE)
-            title = title_match.group(1) if title_match else slide_file.stem.replace('-', ' ').title()
-            
-            slide_info = {
-                "filename": slide_file.name,
-                "title": title,
-                "content": post.content,
-                "html": html_content,
-                "metadata": post.metadata,
-            }
-            
-            slides.append(slide_info)
+            return {"filename": slide_file.name, "title": title, **document}
             
         except Exception as e:
             print(f"Error processing slide file {slide_file}: {e}")
-            continue
+            return None
+    
+    slides = await FAN_OUT.map(slides_dir.glob("*.md"), load_slide_file)
     
     # Sort by filename
     slides.sort(key=lambda x: x['filename'])
     
-    return {"course_name": course_name, "slides": slides}
+    return {"course_name": course_name, "slides": [project(slide, selected) for slide in slides]}
 
-@app.get("/api/slides/courses/{course_name}/file/{filename}")
+@app.get("/api/slides/courses/{course_name}/file/{filename}", dependencies=[admit("render")])
 async def get_slide_file_content(course_name: str, filename: str):
     """Get specific slide file content"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     slide_file = course_path / "slides" / filename
@@ -496,78 +883,98 @@ async def get_slide_file_content(course_name: str, filename: str):
         raise HTTPException(status_code=404, detail="Slide file not found")
     
     try:
-        async with aiofiles.open(slide_file, 'r', encoding='utf-8') as f:
-            content = await f.read()
+        content = await read_text_file(slide_file)
         
         # Parse frontmatter and content
-        post = frontmatter.loads(content)
-        md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables', 'toc'])
-        html_content = md.convert(post.content)
+        document = render_document(content, "document")
         
         # Extract title from content (first # heading)
-        title_match = re.search(r'^#\s+(.+)$', post.content, re.MULTILINE)
+        title_match = re.search(r'^#\s+(.+)$', document["content"], re.MULTILINE)
         title = title_match.group(1) if title_match else slide_file.stem.replace('-', ' ').title()
         
         return {
             "filename": filename,
             "title": title,
             "content": content,  # Return raw content including frontmatter
-            "html": html_content,
-            "metadata": post.metadata
+            "html": document["html"],
+            "metadata": document["metadata"]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading slide file: {str(e)}")
 
+# Type-ahead suggestions
+@app.get("/api/suggest")
+async def suggest(
+    q: str = "",
+    limit: int = Query(8, ge=1, le=SUGGEST_MAX_LIMIT),
+    kind: Optional[List[str]] = Query(None, alias="type"),
+):
+    """Course, lab and blog titles with a word starting with `q`, best first.
+    Repeat `type` (course, lab, blog) to restrict the kinds returned.
+    """
+    # Only the very first call waits for the scans that fill the index
+    await COURSE_LISTING.get()
+    await BLOG_LISTING.get()
+    await LAB_LISTING.get()
+    return {"query": q, "suggestions": SUGGESTIONS.suggest(q, limit, kind)}
+
 # Blogs endpoints
-@app.get("/api/blogs")
+@app.get("/api/blogs", dependencies=[admit("listing")])
 async def get_all_blogs():
     """Get all blog posts"""
-    blogs = []
-    
+    return {"blogs": [blog.to_dict() for blog in await BLOG_LISTING.get()]}
+
+async def scan_blogs() -> List[BlogRecord]:
     if not BLOGS_DIR.exists():
-        return {"blogs": blogs}
+        return []
     
-    for blog_dir in BLOGS_DIR.iterdir():
-        if blog_dir.is_dir():
-            config_file = blog_dir / "config.json"
-            content_file = blog_dir / "content.md"
+    async def load_blog(blog_dir: Path) -> Optional[BlogRecord]:
+        config_file = blog_dir / "config.json"
+        content_file = blog_dir / "content.md"
+        
+        if not (config_file.exists() and content_file.exists()):
+            return None
+        
+        try:
+            # Read config
+            config_content = await read_text_file(config_file)
+            config = json.loads(config_content)
+            
+            # Skip draft posts
+            if config.get('draft', False):
+                return None
+            
+            # Read content for excerpt if not provided
+            if not config.get('excerpt'):
+                content = await read_text_file(content_file)
+                # Extract first paragraph as excerpt
+                lines = content.split('\n')
+                for line in lines:
+                    if line.strip() and not line.startswith('#'):
+                        config['excerpt'] = line.strip()[:200] + '...'
+                        break
             
-            if config_file.exists() and content_file.exists():
-                try:
-                    # Read config
-                    async with aiofiles.open(config_file, 'r', encoding='utf-8') as f:
-                        config_content = await f.read()
-                    config = json.loads(config_content)
-                    
-                    # Skip draft posts
-                    if config.get('draft', False):
-                        continue
-                    
-                    # Read content for excerpt if not provided
-                    if not config.get('excerpt'):
-                        async with aiofiles.open(content_file, 'r', encoding='utf-8') as f:
-                            content = await f.read()
-                        # Extract first paragraph as excerpt
-                        lines = content.split('\n')
-                        for line in lines:
-                            if line.strip() and not line.startswith('#'):
-                                config['excerpt'] = line.strip()[:200] + '...'
-                                break
-                    
-                    blogs.append(config)
-                    
-                except Exception as e:
-                    print(f"Error reading blog {blog_dir.name}: {e}")
-                    continue
+            return BlogRecord.from_dict(config)
+            
+        except Exception as e:
+            print(f"Error reading blog {blog_dir.name}: {e}")
+            return None
+    
+    blog_dirs = [blog_dir for blog_dir in BLOGS_DIR.iterdir() if blog_dir.is_dir()]
+    blogs = await FAN_OUT.map(blog_dirs, load_blog)
     
     # Sort by publish date (newest first)
     blogs.sort(key=lambda x: x.get('publishDate', ''), reverse=True)
+    SUGGESTIONS.sync("blog:", (
+        (f"blog:{blog.get('slug')}", "blog", blog.get('title'), {"slug": blog.get('slug')})
+        for blog in blogs if blog.get('slug')
+    ))
     
-    return {"blogs": blogs}
+    return blogs
 
-@app.get("/api/blogs/{slug}")
-async def get_blog_post(slug: str):
+@app.get("/api/blogs/{slug}", dependencies=[admit("render")])
+async def get_blog_post(slug: str, request: Request):
     """Get specific blog post content"""
     blog_dir = BLOGS_DIR / slug
     if not blog_dir.exists():
@@ -581,51 +988,24 @@ async def get_blog_post(slug: str):
     
     try:
         # Read config
-        async with aiofiles.open(config_file, 'r', encoding='utf-8') as f:
-            config_content = await f.read()
+        config_content = await read_text_file(config_file)
         config = json.loads(config_content)
         
         # Check if draft
         if config.get('draft', False):
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        # Read content
-        async with aiofiles.open(content_file, 'r', encoding='utf-8') as f:
-            content = await f.read()
-        
-        # Parse frontmatter and content
-        post = frontmatter.loads(content)
-        
-        # Configure markdown with enhanced extensions for better blog rendering
-        md = markdown.Markdown(extensions=[
-            'codehilite',
-            'fenced_code', 
-            'tables',
-            'toc',
-            'nl2br',        # Convert newlines to <br>
-            'sane_lists',   # Better list handling
-            'smarty',       # Smart quotes and dashes
-        ], extension_configs={
-            'codehilite': {
-                'css_class': 'highlight',
-                'use_pygments': True,
-                'noclasses': False,
-                'linenos': False
-            },
-            'toc': {
-                'permalink': True,
-                'permalink_class': 'header-link',
-                'permalink_title': '链接到此章节'
+        def build(config_content: str, content: str):
+            # Parse frontmatter and render with the blog profile
+            document = render_document(content, "blog")
+            return {
+                "config": json.loads(config_content),
+                "content": content,
+                "html": document["html"],
+                "metadata": document["metadata"]
             }
-        })
-        html_content = md.convert(post.content)
         
-        return {
-            "config": config,
-            "content": content,
-            "html": html_content,
-            "metadata": post.metadata
-        }
+        return await cached_json_response(request, "blog", [config_file, content_file], build)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading blog post: {str(e)}")
@@ -644,67 +1024,60 @@ async def get_blog_asset(slug: str, filename: str):
     return FileResponse(asset_file)
 
 # Labs endpoints
-@app.get("/api/labs/courses/{course_name}")
-async def get_course_labs(course_name: str):
-    """Get all lab files for a specific course"""
-    labs = []
+@app.get("/api/labs/courses/{course_name}", dependencies=[admit("render")])
+async def get_course_labs(course_name: str, fields: Optional[str] = None, view: Optional[str] = None):
+    """Get all lab files for a specific course
+    
+    `fields` (comma-separated) or `view=summary` limit what is returned; labs are
+    only rendered when `html` is requested.
+    """
+    selected = parse_fields(fields, view, LAB_FIELDS, LAB_SUMMARY_FIELDS)
     
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     labs_dir = course_path / "labs"
     if not labs_dir.exists():
         return {"course_name": course_name, "labs": []}
     
-    # Look for lab files in the labs directory
-    for lab_file in labs_dir.glob("lab-*.md"):
+    async def load_lab(lab_file: Path) -> Optional[Dict[str, Any]]:
         try:
             # Extract lab number from filename (lab-1.md -> 1)
             chapter_match = re.search(r"lab-(\d+)\.md", lab_file.name)
             if not chapter_match:
-                continue
+                return None
                 
             chapter = int(chapter_match.group(1))
             
-            async with aiofiles.open(lab_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-            
-            # Parse frontmatter and content
-            post = frontmatter.loads(content)
-            md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables', 'toc'])
-            html_content = md.convert(post.content)
-            
-            # Extract title from content (first # heading)
-            title_match = re.search(r'^#\s+(.+)$', post.content, re.MULTILINE)
-            title = title_match.group(1) if title_match else f"Lab {chapter}"
+            document = await load_markdown_fields(lab_file, selected)
+            title = document.pop("title") or f"Lab {chapter}"
             
-            lab_info = {
+            return {
                 "course_name": course_name,
                 "chapter": chapter,
                 "title": title,
-                "content": post.content,
-                "html": html_content,
-                "metadata": post.metadata,
+                **document,
                 "filename": lab_file.name
             }
             
-            labs.append(lab_info)
-            
         except Exception as e:
             print(f"Error processing lab file {lab_file}: {e}")
-            continue
+            return None
+    
+    # Look for lab files in the labs directory
+    labs = await FAN_OUT.map(labs_dir.glob("lab-*.md"), load_lab)
     
     # Sort by chapter number
     labs.sort(key=lambda x: x['chapter'])
     
-    return {"course_name": course_name, "labs": labs}
+    return {"course_name": course_name, "labs": [project(lab, selected) for lab in labs]}
 
-@app.get("/api/labs/courses/{course_name}/chapter/{chapter_no}")
+@app.get("/api/labs/courses/{course_name}/chapter/{chapter_no}", dependencies=[admit("render")])
 async def get_lab_content(course_name: str, chapter_no: int):
     """Get specific lab content by course name and chapter number"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     lab_file = course_path / "labs" / f"lab-{chapter_no}.md"
@@ -712,85 +1085,48 @@ async def get_lab_content(course_name: str, chapter_no: int):
         raise HTTPException(status_code=404, detail="Lab not found")
     
     try:
-        async with aiofiles.open(lab_file, 'r', encoding='utf-8') as f:
-            content = await f.read()
+        content = await read_text_file(lab_file)
         
         # Parse frontmatter and content
-        post = frontmatter.loads(content)
-        md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables', 'toc'])
-        html_content = md.convert(post.content)
+        document = render_document(content, "document")
         
         # Extract title from content (first # heading)
-        title_match = re.search(r'^#\s+(.+)$', post.content, re.MULTILINE)
+        title_match = re.search(r'^#\s+(.+)$', document["content"], re.MULTILINE)
         title = title_match.group(1) if title_match else f"Lab {chapter_no}"
         
         return {
             "course_name": course_name,
             "chapter": chapter_no,
             "title": title,
-            "content": post.content,
-            "html": html_content,
-            "metadata": post.metadata
+            "content": document["content"],
+            "html": document["html"],
+            "metadata": document["metadata"]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading lab content: {str(e)}")
 
-@app.get("/api/labs/courses")
+@app.get("/api/labs/courses", dependencies=[admit("listing")])
 async def get_all_course_labs():
     """Get all available labs grouped by course"""
-    courses_labs = {}
-    
-    # Iterate through all course directories
-    for course_dir in COURSES_DIR.iterdir():
-        if course_dir.is_dir():
-            course_name = course_dir.name
-            labs_dir = course_dir / "labs"
-            
-            if not labs_dir.exists():
-                continue
-                
-            course_labs = []
-            
-            # Look for lab files in the labs directory
-            for lab_file in labs_dir.glob("lab-*.md"):
-                try:
-                    # Extract lab number from filename (lab-1.md -> 1)
-                    chapter_match = re.search(r"lab-(\d+)\.md", lab_file.name)
-                    if not chapter_match:
-                        continue
-                        
-                    chapter = int(chapter_match.group(1))
-                    
-                    async with aiofiles.open(lab_file, 'r', encoding='utf-8') as f:
-                        content = await f.read()
-                    
-                    # Extract title from content
-                    title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-                    title = title_match.group(1) if title_match else f"Lab {chapter}"
-                    
-                    course_labs.append({
-                        "chapter": chapter,
-                        "title": title,
-                        "filename": lab_file.name
-                    })
-                    
-                except Exception as e:
-                    print(f"Error processing lab file {lab_file}: {e}")
-                    continue
-            
-            # Sort labs within each course by chapter number
-            if course_labs:
-                course_labs.sort(key=lambda x: x['chapter'])
-                courses_labs[course_name] = course_labs
-    
-    return courses_labs
+    overview = await LAB_LISTING.get()
+    return {course_name: [lab.summary() for lab in labs] for course_name, labs in overview.items()}
+
+async def scan_labs() -> Dict[str, List[LabEntry]]:
+    # Loaded once, then kept current by the lab write paths; out-of-band edits
+    # are found by modification time and only those files are re-read
+    await LAB_CATALOG.refresh_changed()
+    overview = LAB_CATALOG.overview()
+    SUGGESTIONS.sync("lab:", (
+        lab_suggestion(course_name, lab) for course_name, labs in overview.items() for lab in labs
+    ))
+    return overview
 
 @app.get("/api/courses/{course_name}/assets")
 async def get_course_assets(course_name: str):
     """Get all assets for a specific course"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     assets_dir = course_path / "assets"
@@ -800,107 +1136,129 @@ async def get_course_assets(course_name: str):
     assets = []
     for file_path in assets_dir.rglob("*"):
         if file_path.is_file():
-            # Calculate relative path from assets directory
-            relative_path = file_path.relative_to(assets_dir)
-            file_size = file_path.stat().st_size
-            file_extension = file_path.suffix.lower()
-            
-            # Determine if file is previewable
-            previewable_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.mp4', '.mov', '.avi', '.webm'}
-            can_preview = file_extension in previewable_extensions
-            
-            # Determine file type
-            image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
-            video_extensions = {'.mp4', '.mov', '.avi', '.webm'}
-            
-            if file_extension in image_extensions:
-                file_type = "image"
-            elif file_extension in video_extensions:
-                file_type = "video"
-            else:
-                file_type = "document"
-            
-            assets.append({
-                "name": file_path.name,
-                "path": str(relative_path),
-                "size": file_size,
-                "type": file_type,
-                "can_preview": can_preview,
-                "url": f"/assets/{course_name}/{relative_path}"
-            })
+            assets.append(describe_asset(course_name, assets_dir, file_path))
     
     # Sort assets by type, then by name
     assets.sort(key=lambda x: (x["type"], x["name"].lower()))
     
     return {"course_name": course_name, "assets": assets}
 
-@app.post("/api/courses/{course_name}/assets/upload")
+@app.post("/api/courses/{course_name}/assets/upload", dependencies=[admit("upload")])
 async def upload_course_asset(course_name: str, file: UploadFile = File(...)):
     """Upload an asset to a course"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     assets_dir = course_path / "assets"
     assets_dir.mkdir(exist_ok=True)
     
-    # Sanitize filename
-    safe_filename = re.sub(r'[^a-zA-Z0-9\-_\.]', '_', file.filename or 'unnamed_file')
-    file_path = assets_dir / safe_filename
-    
-    # Check if file already exists and add number suffix if needed
-    counter = 1
-    original_stem = file_path.stem
-    original_suffix = file_path.suffix
-    while file_path.exists():
-        file_path = assets_dir / f"{original_stem}_{counter}{original_suffix}"
-        counter += 1
+    file_path = unique_asset_path(assets_dir, file.filename)
     
     # Save the file
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Return file info
-        file_size = file_path.stat().st_size
-        file_extension = file_path.suffix.lower()
-        
-        previewable_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.mp4', '.mov', '.avi', '.webm'}
-        can_preview = file_extension in previewable_extensions
-        
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
-        video_extensions = {'.mp4', '.mov', '.avi', '.webm'}
-        
-        if file_extension in image_extensions:
-            file_type = "image"
-        elif file_extension in video_extensions:
-            file_type = "video"
+        content = await file.read()
+        if BLOB_STORE is not None:
+            await asyncio.to_thread(BLOB_STORE.put_bytes, content, file_path)
         else:
-            file_type = "document"
-        
-        relative_path = file_path.relative_to(assets_dir)
+            async with aiofiles.open(file_path, 'wb') as f:
+                await f.write(content)
         
+        # Return file info
         return {
             "message": "File uploaded successfully",
-            "asset": {
-                "name": file_path.name,
-                "path": str(relative_path),
-                "size": file_size,
-                "type": file_type,
-                "can_preview": can_preview,
-                "url": f"/assets/{course_name}/{relative_path}"
-            }
+            "asset": describe_asset(course_name, assets_dir, file_path)
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
+# Resumable asset uploads
+async def get_upload_session(course_name: str, upload_id: str):
+    session = await UPLOAD_SESSIONS.get(upload_id)
+    if session is None or session.course_name != course_name:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+@app.post("/api/courses/{course_name}/assets/uploads")
+async def create_asset_upload(course_name: str, request: UploadSessionCreateRequest):
+    """Start a resumable upload; the file is then sent as numbered chunks"""
+    if not is_course_dir(COURSES_DIR / course_name):
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    try:
+        session = await UPLOAD_SESSIONS.create(course_name, request.filename, request.size, request.sha256, request.chunk_size)
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.status()
+
+@app.get("/api/courses/{course_name}/assets/uploads/{upload_id}")
+async def get_asset_upload(course_name: str, upload_id: str):
+    """Which chunks of an upload have been received (to resume after a failure)"""
+    return (await get_upload_session(course_name, upload_id)).status()
+
+@app.put("/api/courses/{course_name}/assets/uploads/{upload_id}/chunks/{index}", dependencies=[admit("upload")])
+async def put_asset_upload_chunk(course_name: str, upload_id: str, index: int, request: Request, offset: Optional[int] = None):
+    """Store one chunk (the raw request body); re-sending a chunk overwrites it"""
+    session = await get_upload_session(course_name, upload_id)
+    if offset is not None and offset != index * session.chunk_size:
+        raise HTTPException(status_code=400, detail=f"Chunk {index} starts at offset {index * session.chunk_size}")
+    
+    try:
+        await UPLOAD_SESSIONS.write_chunk(session, index, request.stream())
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadSessionGone:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return {"upload_id": upload_id, "index": index, "received": len(session.received), "total_chunks": session.total_chunks}
+
+@app.post("/api/courses/{course_name}/assets/uploads/{upload_id}/finalize", dependencies=[admit("upload")])
+async def finalize_asset_upload(course_name: str, upload_id: str, request: UploadFinalizeRequest):
+    """Verify a completed upload's SHA-256 and move it into the course assets"""
+    await get_upload_session(course_name, upload_id)
+    
+    async with UPLOAD_SESSIONS.lock(upload_id):
+        session = await get_upload_session(course_name, upload_id)
+        if not is_course_dir(COURSES_DIR / course_name):
+            raise HTTPException(status_code=404, detail="Course not found")
+        missing = session.missing()
+        if missing:
+            raise HTTPException(status_code=409, detail=f"Upload incomplete, missing chunks: {missing[:20]}")
+        expected = (request.sha256 or session.sha256 or "").lower()
+        if not expected:
+            raise HTTPException(status_code=400, detail="sha256 is required to finalize an upload")
+        
+        staging_path = UPLOAD_SESSIONS.staging_path(session)
+        digest = await asyncio.to_thread(UPLOAD_SESSIONS.digest, session)
+        if digest != expected:
+            raise HTTPException(status_code=422, detail=f"SHA-256 mismatch: received content hashes to {digest}")
+        
+        assets_dir = COURSES_DIR / course_name / "assets"
+        assets_dir.mkdir(exist_ok=True)
+        file_path = unique_asset_path(assets_dir, session.filename)
+        if BLOB_STORE is not None:
+            await asyncio.to_thread(BLOB_STORE.move_file, staging_path, file_path, digest)
+        else:
+            # A rename, or a copy when TEMP_UPLOADS_DIR is on another filesystem
+            await asyncio.to_thread(shutil.move, staging_path, file_path)
+        await UPLOAD_SESSIONS.discard(session)
+    
+    return {
+        "message": "File uploaded successfully",
+        "asset": describe_asset(course_name, assets_dir, file_path)
+    }
+
+@app.delete("/api/courses/{course_name}/assets/uploads/{upload_id}")
+async def abort_asset_upload(course_name: str, upload_id: str):
+    """Abandon an upload and delete what was received"""
+    await UPLOAD_SESSIONS.discard(await get_upload_session(course_name, upload_id))
+    return {"message": "Upload aborted"}
+
 @app.delete("/api/courses/{course_name}/assets/{path:path}")
 async def delete_course_asset(course_name: str, path: str):
     """Delete an asset from a course"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     assets_dir = course_path / "assets"
@@ -916,11 +1274,69 @@ async def delete_course_asset(course_name: str, path: str):
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        file_path.unlink()
+        if BLOB_STORE is not None:
+            await asyncio.to_thread(BLOB_STORE.release, file_path)
+        else:
+            file_path.unlink()
         return {"message": "Asset deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete asset: {str(e)}")
 
+# Batch reads: resource name -> (handler, accepted options, admission class of
+# the single endpoint)
+BATCH_MAX_REQUESTS = 20
+BATCH_RESOURCES = {
+    "course": (lambda course, options: get_course(course), set(), None),
+    "slide_files": (lambda course, options: get_course_slides_files(course, **options), {"fields", "view"}, "render"),
+    "labs": (lambda course, options: get_course_labs(course, **options), {"fields", "view"}, "render"),
+    "assets": (lambda course, options: get_course_assets(course), set(), None),
+}
+
+@app.post("/api/batch")
+async def batch_read(batch: BatchRequest):
+    """Fetch several course resources in one round trip
+    
+    Requests run concurrently and share file reads. Each entry of "responses"
+    matches the request at the same index and carries either "body" or, on
+    failure, "detail", next to the status the single endpoint would return.
+    Every request is admitted like its single endpoint, so a batch cannot
+    run more renders than the render gate allows; one that is shed gets 503.
+    """
+    if len(batch.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+    
+    async def run(item: BatchItem) -> Dict[str, Any]:
+        if item.resource not in BATCH_RESOURCES:
+            return {"status": 400, "detail": f"Unknown resource: {item.resource}"}
+        handler, accepted, route_class = BATCH_RESOURCES[item.resource]
+        unknown = sorted(set(item.options) - accepted)
+        if unknown:
+            return {"status": 400, "detail": f"Unknown options: {', '.join(unknown)}"}
+        # Accept "fields" as a list as well as the query-string form
+        options = {key: ",".join(value) if isinstance(value, list) else value for key, value in item.options.items()}
+        gate = ADMISSION_GATES[route_class] if route_class is not None else None
+        if gate is not None:
+            try:
+                await gate.acquire()
+            except AdmissionRejected as e:
+                return {"status": 503, "detail": f"Server busy ({e.reason}), please retry"}
+        try:
+            return {"status": 200, "body": await handler(item.course, options)}
+        except HTTPException as e:
+            return {"status": e.status_code, "detail": e.detail}
+        except Exception as e:
+            return {"status": 500, "detail": str(e)}
+        finally:
+            if gate is not None:
+                gate.release()
+    
+    token = _read_memo.set({})
+    try:
+        responses = await asyncio.gather(*(run(item) for item in batch.requests))
+    finally:
+        _read_memo.reset(token)
+    return {"responses": responses}
+
 # Temporary slide file operations for editing
 @app.post("/api/slides/temp")
 async def create_temp_slide_file(request: TempSlideCreateRequest):
@@ -965,16 +1381,14 @@ async def get_temp_slide_file(temp_id: str):
         raise HTTPException(status_code=404, detail="Temporary slide file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Read content
     temp_file_path = TEMP_SLIDES_DIR / metadata["tempFilename"]
     if not temp_file_path.exists():
         raise HTTPException(status_code=404, detail="Temporary slide file content not found")
     
-    async with aiofiles.open(temp_file_path, 'r', encoding='utf-8') as f:
-        content = await f.read()
+    content = await read_text_file(temp_file_path)
     
     return {
         "id": temp_id,
@@ -994,8 +1408,7 @@ async def update_temp_slide_file(temp_id: str, request: TempSlideUpdateRequest):
         raise HTTPException(status_code=404, detail="Temporary slide file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Update content
     temp_file_path = TEMP_SLIDES_DIR / metadata["tempFilename"]
@@ -1025,8 +1438,7 @@ async def delete_temp_slide_file(temp_id: str):
         raise HTTPException(status_code=404, detail="Temporary slide file not found")
     
     # Read metadata to get temp filename
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Delete temp file
     temp_file_path = TEMP_SLIDES_DIR / metadata["tempFilename"]
@@ -1039,27 +1451,25 @@ async def delete_temp_slide_file(temp_id: str):
     return {"message": "Temporary slide file deleted successfully"}
 
 @app.post("/api/slides/temp/{temp_id}/commit")
-async def commit_temp_slide_file(temp_id: str):
+async def commit_temp_slide_file(temp_id: str, background_tasks: BackgroundTasks):
     """Commit temporary slide file changes to original file"""
     metadata_file = TEMP_SLIDES_DIR / f"{temp_id}.json"
     if not metadata_file.exists():
         raise HTTPException(status_code=404, detail="Temporary slide file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Read temp file content
     temp_file_path = TEMP_SLIDES_DIR / metadata["tempFilename"]
     if not temp_file_path.exists():
         raise HTTPException(status_code=404, detail="Temporary slide file content not found")
     
-    async with aiofiles.open(temp_file_path, 'r', encoding='utf-8') as f:
-        content = await f.read()
+    content = await read_text_file(temp_file_path)
     
     # Write to original file
     course_path = COURSES_DIR / metadata["courseId"]
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     original_file_path = course_path / "slides" / metadata["originalFilename"]
@@ -1067,8 +1477,10 @@ async def commit_temp_slide_file(temp_id: str):
     # Ensure slides directory exists
     (course_path / "slides").mkdir(exist_ok=True)
     
-    async with aiofiles.open(original_file_path, 'w', encoding='utf-8') as f:
-        await f.write(content)
+    if await write_text_if_changed(original_file_path, content):
+        if original_file_path.name == "slides.md":
+            COURSE_LISTING.invalidate()
+        background_tasks.add_task(prerender, "deck", content)
     
     # Clean up temp files
     temp_file_path.unlink()
@@ -1117,16 +1529,14 @@ async def get_temp_lab_file(temp_id: str):
         raise HTTPException(status_code=404, detail="Temporary lab file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Read content
     temp_file_path = TEMP_LABS_DIR / metadata["tempFilename"]
     if not temp_file_path.exists():
         raise HTTPException(status_code=404, detail="Temporary lab file content not found")
     
-    async with aiofiles.open(temp_file_path, 'r', encoding='utf-8') as f:
-        content = await f.read()
+    content = await read_text_file(temp_file_path)
     
     return {
         "id": temp_id,
@@ -1145,8 +1555,7 @@ async def update_temp_lab_file(temp_id: str, request: TempLabUpdateRequest):
         raise HTTPException(status_code=404, detail="Temporary lab file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Update content
     temp_file_path = TEMP_LABS_DIR / metadata["tempFilename"]
@@ -1163,8 +1572,7 @@ async def delete_temp_lab_file(temp_id: str):
         raise HTTPException(status_code=404, detail="Temporary lab file not found")
     
     # Read metadata to get temp filename
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Delete temp file and metadata
     temp_file_path = TEMP_LABS_DIR / metadata["tempFilename"]
@@ -1175,27 +1583,25 @@ async def delete_temp_lab_file(temp_id: str):
     return {"message": "Temporary lab file deleted successfully"}
 
 @app.post("/api/labs/temp/{temp_id}/commit")
-async def commit_temp_lab_file(temp_id: str):
+async def commit_temp_lab_file(temp_id: str, background_tasks: BackgroundTasks):
     """Commit temporary lab file changes to original file"""
     metadata_file = TEMP_LABS_DIR / f"{temp_id}.json"
     if not metadata_file.exists():
         raise HTTPException(status_code=404, detail="Temporary lab file not found")
     
     # Read metadata
-    async with aiofiles.open(metadata_file, 'r', encoding='utf-8') as f:
-        metadata = json.loads(await f.read())
+    metadata = json.loads(await read_text_file(metadata_file))
     
     # Read temp file content
     temp_file_path = TEMP_LABS_DIR / metadata["tempFilename"]
     if not temp_file_path.exists():
         raise HTTPException(status_code=404, detail="Temporary lab file content not found")
     
-    async with aiofiles.open(temp_file_path, 'r', encoding='utf-8') as f:
-        content = await f.read()
+    content = await read_text_file(temp_file_path)
     
     # Write to original file
     course_path = COURSES_DIR / metadata["courseId"]
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     original_file_path = course_path / "labs" / metadata["originalFilename"]
@@ -1203,8 +1609,11 @@ async def commit_temp_lab_file(temp_id: str):
     # Ensure labs directory exists
     (course_path / "labs").mkdir(exist_ok=True)
     
-    async with aiofiles.open(original_file_path, 'w', encoding='utf-8') as f:
-        await f.write(content)
+    if await write_text_if_changed(original_file_path, content):
+        await LAB_CATALOG.refresh_lab(metadata["courseId"], original_file_path)
+        index_labs(metadata["courseId"])
+        LAB_LISTING.invalidate()
+        background_tasks.add_task(prerender, "lab", content)
     
     # Clean up temp files
     temp_file_path.unlink()
@@ -1212,11 +1621,11 @@ async def commit_temp_lab_file(temp_id: str):
     
     return {"message": "Changes committed successfully"}
 
-@app.post("/api/courses/{course_name}/labs/upload")
-async def upload_course_lab(course_name: str, file: UploadFile = File(...)):
+@app.post("/api/courses/{course_name}/labs/upload", dependencies=[admit("upload")])
+async def upload_course_lab(course_name: str, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """Upload a lab file to a course"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     # Validate file extension
@@ -1243,24 +1652,25 @@ async def upload_course_lab(course_name: str, file: UploadFile = File(...)):
         async with aiofiles.open(file_path, 'wb') as f:
             content = await file.read()
             await f.write(content)
+        await LAB_CATALOG.refresh_lab(course_name, file_path)
+        index_labs(course_name)
+        LAB_LISTING.invalidate()
         
         # Parse the markdown file to get lab info
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            md_content = await f.read()
+        md_content = await read_text_file(file_path)
         
-        post = frontmatter.loads(md_content)
-        md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables'])
-        html_content = md.convert(post.content)
+        document = await asyncio.to_thread(render_document, md_content, "slides")
+        background_tasks.add_task(prerender, "lab", md_content)
         
         # Extract chapter number from filename or metadata
-        chapter = post.metadata.get('chapter', 1)
+        chapter = document["metadata"].get('chapter', 1)
         if isinstance(chapter, str):
             try:
                 chapter = int(chapter)
             except ValueError:
                 chapter = 1
         
-        title = post.metadata.get('title', file_path.stem)
+        title = document["metadata"].get('title', file_path.stem)
         
         return {
             "message": "Lab file uploaded successfully",
@@ -1268,8 +1678,8 @@ async def upload_course_lab(course_name: str, file: UploadFile = File(...)):
                 "filename": file_path.name,
                 "chapter": chapter,
                 "title": title,
-                "content": post.content,
-                "html": html_content,
+                "content": document["content"],
+                "html": document["html"],
                 "course_name": course_name
             }
         }
@@ -1277,13 +1687,16 @@ async def upload_course_lab(course_name: str, file: UploadFile = File(...)):
         # Clean up file if there was an error
         if file_path.exists():
             file_path.unlink()
+        LAB_CATALOG.remove_lab(course_name, file_path.name)
+        index_labs(course_name)
+        LAB_LISTING.invalidate()
         raise HTTPException(status_code=500, detail=f"Failed to upload lab file: {str(e)}")
 
-@app.post("/api/courses/{course_name}/slides/upload")
-async def upload_course_slides(course_name: str, file: UploadFile = File(...)):
+@app.post("/api/courses/{course_name}/slides/upload", dependencies=[admit("upload")])
+async def upload_course_slides(course_name: str, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """Upload a markdown slide file to a course"""
     course_path = COURSES_DIR / course_name
-    if not course_path.exists():
+    if not is_course_dir(course_path):
         raise HTTPException(status_code=404, detail="Course not found")
     
     # Validate file extension
@@ -1311,24 +1724,25 @@ async def upload_course_slides(course_name: str, file: UploadFile = File(...)):
             content = await file.read()
             await f.write(content)
         
+        if file_path.name == "slides.md":
+            COURSE_LISTING.invalidate()
+        
         # Parse the markdown file to get slide info
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            md_content = await f.read()
+        md_content = await read_text_file(file_path)
         
-        post = frontmatter.loads(md_content)
-        md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables'])
-        html_content = md.convert(post.content)
+        document = await asyncio.to_thread(render_document, md_content, "slides")
+        background_tasks.add_task(prerender, "deck", md_content)
         
-        title = post.metadata.get('title', file_path.stem)
+        title = document["metadata"].get('title', file_path.stem)
         
         return {
             "message": "Slide file uploaded successfully",
             "slide_file": {
                 "filename": file_path.name,
                 "title": title,
-                "content": post.content,
-                "html": html_content,
-                "metadata": post.metadata
+                "content": document["content"],
+                "html": document["html"],
+                "metadata": document["metadata"]
             }
         }
     except Exception as e:
@@ -1338,6 +1752,62 @@ async def upload_course_slides(course_name: str, file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Failed to upload slide file: {str(e)}")
 
 # Helper functions
+def unique_asset_path(assets_dir: Path, filename: Optional[str]) -> Path:
+    """Sanitized path for a new asset, with a number suffix if the name is taken"""
+    safe_filename = re.sub(r'[^a-zA-Z0-9\-_\.]', '_', filename or 'unnamed_file')
+    file_path = assets_dir / safe_filename
+    
+    counter = 1
+    original_stem = file_path.stem
+    original_suffix = file_path.suffix
+    while file_path.exists():
+        file_path = assets_dir / f"{original_stem}_{counter}{original_suffix}"
+        counter += 1
+    return file_path
+
+def describe_asset(course_name: str, assets_dir: Path, file_path: Path) -> Dict[str, Any]:
+    # Calculate relative path from assets directory
+    relative_path = file_path.relative_to(assets_dir)
+    file_size = file_path.stat().st_size
+    file_extension = file_path.suffix.lower()
+    
+    # Determine if file is previewable
+    previewable_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.mp4', '.mov', '.avi', '.webm'}
+    can_preview = file_extension in previewable_extensions
+    
+    # Determine file type
+    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
+    video_extensions = {'.mp4', '.mov', '.avi', '.webm'}
+    
+    if file_extension in image_extensions:
+        file_type = "image"
+    elif file_extension in video_extensions:
+        file_type = "video"
+    else:
+        file_type = "document"
+    
+    return {
+        "name": file_path.name,
+        "path": str(relative_path),
+        "size": file_size,
+        "type": file_type,
+        "can_preview": can_preview,
+        "url": f"/assets/{course_name}/{relative_path}"
+    }
+
+def course_copy_function(course_path: Path) -> Callable[[str, str], Any]:
+    """shutil.copytree copy_function that puts a course's assets in the blob store
+    (markdown and config files are edited in place, so they are always copied)"""
+    assets_dir = course_path / "assets"
+    
+    def copy(src: str, dst: str):
+        if BLOB_STORE is not None and Path(dst).is_relative_to(assets_dir):
+            BLOB_STORE.put_file(Path(src), Path(dst))
+            return dst
+        return shutil.copy2(src, dst)
+    
+    return copy
+
 def generate_course_id(title: str) -> str:
     # Convert title to URL-friendly ID
     course_id = re.sub(r'[^a-zA-Z0-9\s\-]', '', title)
@@ -1350,29 +1820,6 @@ def generate_course_id(title: str) -> str:
     
     return course_id
 
-async def get_course_slides_internal(course_id: str):
-    """Internal function to get course slides without HTTP exception handling"""
-    course_path = COURSES_DIR / course_id
-    slides_file = course_path / "slides" / "slides.md"
-    
-    if not slides_file.exists():
-        return {"metadata": {}, "slides": [], "html": ""}
-    
-    async with aiofiles.open(slides_file, 'r', encoding='utf-8') as f:
-        content = await f.read()
-    
-    post = frontmatter.loads(content)
-    md = markdown.Markdown(extensions=['codehilite', 'fenced_code', 'tables'])
-    html_content = md.convert(post.content)
-    
-    slides = parse_slides(post.content)
-    
-    return {
-        "metadata": post.metadata,
-        "slides": slides,
-        "html": html_content
-    }
-
 async def get_course_info(course_id: str) -> Dict[str, Any]:
     course_path = COURSES_DIR / course_id
     config_file = course_path / "config.json"
@@ -1385,77 +1832,358 @@ async def get_course_info(course_id: str) -> Dict[str, Any]:
     }
     
     if config_file.exists():
-        async with aiofiles.open(config_file, 'r', encoding='utf-8') as f:
-            import json
-            config = json.loads(await f.read())
-            info.update(config)
+        config = json.loads(await read_text_file(config_file))
+        info.update(config)
     
     slides_file = course_path / "slides" / "slides.md"
     if slides_file.exists():
-        async with aiofiles.open(slides_file, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            slides = parse_slides(content)
-            info["slides_count"] = len(slides)
+        content = await read_text_file(slides_file)
+        info["slides_count"] = await count_slides(content)
     
     return info
 
-def parse_slides(content: str, global_metadata: dict = None) -> List[Dict[str, str]]:
-    slides = []
-    import re
-    import yaml
+async def index_course(course_id: str) -> Dict[str, Any]:
+    """Course info after a write, indexed for filtered listings right away"""
+    info = await get_course_info(course_id)
+    record = CourseRecord.from_dict(info)
+    COURSE_FACETS.add(record)
+    SUGGESTIONS.set(*course_suggestion(record))
+    return info
+
+def course_suggestion(course: CourseRecord):
+    course_id = course.get("id")
+    return f"course:{course_id}", "course", course.get("title"), {"id": course_id}
+
+def lab_suggestion(course_name: str, lab: LabEntry):
+    return f"lab:{course_name}/{lab.filename}", "lab", lab.title, {"course": course_name, "chapter": lab.chapter}
+
+def index_labs(course_name: str):
+    """Bring a course's lab titles in the suggestion index up to date with the lab catalog"""
+    SUGGESTIONS.sync(f"lab:{course_name}/", (lab_suggestion(course_name, lab) for lab in LAB_CATALOG.course_labs(course_name)))
+
+# Set by batch_read so its sub-requests share one read per file
+_read_memo: ContextVar[Optional[Dict[Path, asyncio.Future]]] = ContextVar("read_memo", default=None)
+
+async def read_text_file(path: Path) -> str:
+    memo = _read_memo.get()
+    if memo is None:
+        return await _read_text_file(path)
+    if path not in memo:
+        memo[path] = asyncio.ensure_future(_read_text_file(path))
+    return await memo[path]
+
+async def _read_text_file(path: Path) -> str:
+    with stage("read"):
+        async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+            return await f.read()
+
+async def write_text_if_changed(path: Path, content: str) -> bool:
+    """Write `content` to `path` unless the file already holds exactly that.
+    
+    Returns whether it wrote; callers skip invalidation and pre-rendering
+    otherwise, since every cache entry for the file is keyed by its content.
+    """
+    if path.exists() and await read_text_file(path) == content:
+        PRERENDER_STATS["unchanged_writes"] += 1
+        return False
+    async with aiofiles.open(path, 'w', encoding='utf-8') as f:
+        await f.write(content)
+    return True
+
+# Fields of the list endpoints, in response order, and their summary views
+LAB_FIELDS = ("course_name", "chapter", "title", "content", "html", "metadata", "filename")
+LAB_SUMMARY_FIELDS = ("course_name", "chapter", "title", "filename")
+SLIDE_FILE_FIELDS = ("filename", "title", "content", "html", "metadata")
+SLIDE_FILE_SUMMARY_FIELDS = ("filename", "title")
+# Fields that need the whole file rather than its head
+_BODY_FIELDS = {"content", "html", "metadata"}
+
+def parse_fields(fields: Optional[str], view: Optional[str], allowed: tuple, summary: tuple) -> tuple:
+    """Resolve the `fields`/`view` query parameters to the fields to return"""
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = sorted(requested - set(allowed))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return tuple(field for field in allowed if field in requested)
+    if view == "summary":
+        return summary
+    if view not in (None, "full"):
+        raise HTTPException(status_code=400, detail="view must be 'summary' or 'full'")
+    return allowed
+
+def project(record: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    return {field: record[field] for field in fields}
+
+async def load_markdown_fields(path: Path, fields: tuple) -> Dict[str, Any]:
+    """Load only what the requested fields need from a markdown file.
+    
+    Always returns "title" (first "# " heading, or None) and adds "content",
+    "metadata" and "html" as needed. Title-only requests read just the file
+    head, and nothing is rendered unless "html" is requested.
+    """
+    if not _BODY_FIELDS.intersection(fields):
+        with stage("read"):
+            title, _ = await asyncio.to_thread(read_markdown_head, path)
+        return {"title": title}
+    
+    content = await read_text_file(path)
+    if "html" in fields:
+        document = render_document(content, "document")
+    else:
+        document = split_document(content)
+    
+    # Extract title from content (first # heading)
+    title_match = re.search(r'^#\s+(.+)$', document["content"], re.MULTILINE)
+    return {
+        "title": title_match.group(1) if title_match else None,
+        "content": document["content"],
+        "html": document.get("html"),
+        "metadata": document["metadata"]
+    }
+
+def render_markdown(text: str, profile: str = "slides") -> str:
+    """Render markdown to HTML with the named extension profile, through the render cache"""
+    return RENDER_CACHE.get_or_render(f"html:{profile}", text, lambda: convert_markdown(text, profile))
+
+def convert_markdown(text: str, profile: str = "slides") -> str:
+    """Render markdown to HTML without caching it on its own; for fragments
+    (slides, a deck's full HTML) that are cached as part of their document"""
+    with stage("markdown"):
+        md = markdown.Markdown(**MARKDOWN_PROFILES[profile])
+        return md.convert(text)
+
+def split_document(content: str) -> Dict[str, Any]:
+    """Split frontmatter off a markdown document without rendering it"""
+    def render():
+        with stage("frontmatter"):
+            post = frontmatter.loads(content)
+        return {"metadata": post.metadata, "content": post.content}
+    
+    return RENDER_CACHE.get_or_render("frontmatter", content, render)
+
+def render_document(content: str, profile: str = "document") -> Dict[str, Any]:
+    """Split frontmatter off a markdown document and render its body"""
+    def render():
+        document = split_document(content)
+        return {
+            "metadata": document["metadata"],
+            "content": document["content"],
+            "html": render_markdown(document["content"], profile)
+        }
+    
+    return RENDER_CACHE.get_or_render(f"document:{profile}", content, render)
+
+def render_deck(content: str, inherit_global: bool = True) -> Dict[str, Any]:
+    """Parse a slide deck into its metadata, individual slides and full HTML.
+    
+    With inherit_global the first slide picks up the deck frontmatter when it
+    has no metadata block of its own.
+    """
+    def render():
+        with stage("frontmatter"):
+            post = frontmatter.loads(content)
+        global_metadata = post.metadata if inherit_global else None
+        with stage("parse_slides"):
+            slides = parse_slides(post.content, global_metadata=global_metadata)
+        return {
+            "metadata": post.metadata,
+            "slides": slides,
+            "html": convert_markdown(post.content, "slides")
+        }
+    
+    profile = "deck" if inherit_global else "deck-bare"
+    return RENDER_CACHE.get_or_render(profile, content, render)
+
+def file_identity(path: Path) -> tuple:
+    stat = path.stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+async def render_off_loop(profile: str, source: str, render: Callable[[], Any]) -> Any:
+    """RENDER_CACHE.get_or_render, with misses rendered in the I/O thread pool"""
+    value = RENDER_CACHE.get_local(profile, source)
+    if value is None:
+        value = await asyncio.to_thread(RENDER_CACHE.get_or_render, profile, source, render)
+    return value
+
+async def cached_json_response(request: Request, profile: str, files: List[Path], build: Callable[..., Any]) -> PreSerializedJSONResponse:
+    """Response for a payload that depends only on the contents of `files`.
+    
+    `build` receives the file contents in order. The encoded body and each
+    compressed variant are kept in the render cache, so repeat requests for
+    unchanged content do no encoding or compression, and concurrent requests
+    for the same file versions share a single read and render.
+    """
+    identity = (profile,) + tuple(file_identity(path) for path in files)
+    
+    async def load():
+        contents = [await read_text_file(path) for path in files]
+        source = "\0".join(contents)
+        body = await render_off_loop(f"{profile}-json", source, lambda: serialize(build(*contents)))
+        return source, body
+    
+    source, body = await RENDER_FLIGHTS.do(identity, load)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(body))
+    if encoding is None:
+        # JSONCompressionMiddleware adds Vary to identity responses it could have compressed
+        return PreSerializedJSONResponse(body)
+    compressed = await RENDER_FLIGHTS.do(
+        identity + (encoding,),
+        lambda: render_off_loop(f"{profile}-json:{encoding}", source, lambda: compress(body, encoding))
+    )
+    return PreSerializedJSONResponse(compressed, headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+
+def wants_ndjson(request: Request) -> bool:
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+async def stream_deck_response(path: Path) -> StreamingResponse:
+    """A deck as NDJSON: a {"type": "deck"} line with the frontmatter, then one
+    {"type": "slide"} line per slide, each sent as soon as it is rendered.
+    
+    The full-deck "html" is left out, so only one rendered slide is held at a
+    time; a deck already in the render cache is streamed from there. The body
+    goes out uncompressed (JSONCompressionMiddleware passes streams through),
+    and AdmissionMiddleware holds the route's slot until the last line is sent.
+    """
+    content = await read_text_file(path)
+    
+    def line(kind: str, **fields) -> bytes:
+        return serialize({"type": kind, **fields}) + b"\n"
+    
+    async def lines():
+        cached = RENDER_CACHE.get_local("deck", content)
+        if cached is not None:
+            yield line("deck", metadata=cached["metadata"])
+            for slide in cached["slides"]:
+                yield line("slide", slide=slide)
+            return
+        
+        def split():
+            with stage("frontmatter"):
+                return frontmatter.loads(content)
+        
+        post = await asyncio.to_thread(split)
+        yield line("deck", metadata=post.metadata)
+        slides = iter_slides(post.content, global_metadata=post.metadata)
+        while True:
+            slide = await asyncio.to_thread(next, slides, None)
+            if slide is None:
+                break
+            yield line("slide", slide=slide)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def prerender_json(profile: str, source: str, build: Callable[[], Any]):
+    """Fill the cache entries cached_json_response() looks up for `source`"""
+    body = RENDER_CACHE.get_or_render(f"{profile}-json", source, lambda: serialize(build()))
+    for encoding in SUPPORTED_ENCODINGS:
+        RENDER_CACHE.get_or_render(f"{profile}-json:{encoding}", source, lambda: compress(body, encoding))
+
+def prerender(kind: str, content: str):
+    """Background job after a write: render new markdown the way its viewers
+    will request it, so the first view after publishing is a cache hit"""
+    try:
+        if kind == "deck":
+            # Presentation view of the file, then its slide file views
+            prerender_json("deck", content, lambda: render_deck(content))
+            render_document(content, "document")
+        elif kind == "lab":
+            render_document(content, "document")
+        PRERENDER_STATS["jobs"] += 1
+    except Exception as e:
+        PRERENDER_STATS["failures"] += 1
+        print(f"Pre-render of {kind} failed: {e}")
+
+async def count_slides(content: str) -> int:
+    """Number of slides in a deck, without frontmatter handling (as listed in
+    course info); uncached decks are parsed in the thread pool
+    """
+    def render():
+        with stage("parse_slides"):
+            return len(parse_slides(content, render_html=False))
+    
+    return await render_off_loop("slide-count", content, render)
+
+# A slide separator is a line consisting of exactly "---" (CRLF tolerated),
+# including at the very start or end of the content
+_SLIDE_SEPARATOR = re.compile(r'^---\r?$', re.MULTILINE)
+# A line that rules out a per-slide metadata block: anything other than blank,
+# a "# comment" or a "key:" line
+_NON_METADATA_LINE = re.compile(r'^[^\S\n]*(?!#|[a-zA-Z_][a-zA-Z0-9_-]*[^\S\n]*:)\S', re.MULTILINE)
+_LEADING_WHITESPACE = re.compile(r'\s*')
+
+@lru_cache(maxsize=1024)
+def _load_slide_metadata(text: str) -> Dict[str, Any]:
+    # Decks repeat the same few layout/theme blocks, so parses are memoized;
+    # callers get a copy since the result ends up in mutable slide dicts
+    try:
+        metadata = yaml.load(text, Loader=yaml_loader()) or {}
+    except Exception:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+def _scan_slide_parts(content: str) -> List[tuple]:
+    """Split slide content into parts without copying it.
+    
+    Returns one (start, end, is_metadata) tuple per part between separators,
+    with start/end trimmed of surrounding whitespace (start == end for blank
+    parts). A part is metadata when it contains a colon, does not start with
+    "#", and every non-blank line is a "key:" line or a comment.
+    """
+    parts = []
+    start = 0
+    for separator in _SLIDE_SEPARATOR.finditer(content):
+        parts.append(_trim_slide_part(content, start, separator.start()))
+        start = separator.end()
+    parts.append(_trim_slide_part(content, start, len(content)))
+    return parts
+
+def _trim_slide_part(content: str, start: int, end: int) -> tuple:
+    # Metadata detection runs on the untrimmed part so that the "^" anchors of
+    # the line pattern fall on real line starts
+    is_metadata = (
+        content.find(':', start, end) != -1
+        and _NON_METADATA_LINE.search(content, start, end) is None
+    )
+    start = _LEADING_WHITESPACE.match(content, start, end).end()
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    if is_metadata and content[start] == '#':
+        is_metadata = False
+    return start, end, is_metadata
+
+def parse_slides(content: str, global_metadata: dict = None, render_html: bool = True) -> List[Dict[str, str]]:
+    return list(iter_slides(content, global_metadata, render_html))
+
+def iter_slides(content: str, global_metadata: dict = None, render_html: bool = True) -> Iterator[Dict[str, str]]:
+    """Parse slides one at a time (see parse_slides)"""
+    count = 0
     
     if global_metadata is None:
         global_metadata = {}
     
-    # Split on --- that appear on their own line
-    parts = re.split(r'\n---\n', content)
+    parts = _scan_slide_parts(content)
     
     i = 0
     # Check if first part is content without metadata - it should inherit global metadata
     first_slide_inherits_global = True
     
     while i < len(parts):
-        part = parts[i].strip()
+        start, end, is_metadata = parts[i]
         
-        if not part:
+        if start == end:
             i += 1
             continue
         
         metadata = {}
-        content_part = ""
         
-        # Check if this part looks like YAML frontmatter
-        def is_yaml_metadata(text):
-            if not text or not ':' in text:
-                return False
-            
-            # If it starts with #, it's content
-            if text.strip().startswith('#'):
-                return False
-                
-            lines = text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line:
-                    # Must be either a comment, empty, or key: value format
-                    if not (line.startswith('#') or 
-                           line == '' or
-                           re.match(r'^[a-zA-Z_][a-zA-Z0-9_-]*\s*:', line)):
-                        return False
-            return True
-        
-        if is_yaml_metadata(part):
+        if is_metadata:
             # This is metadata, next part should be content
-            try:
-                metadata = yaml.safe_load(part) or {}
-                if not isinstance(metadata, dict):
-                    metadata = {}
-            except:
-                metadata = {}
+            metadata = dict(_load_slide_metadata(content[start:end]))
             
             # Get the content from the next part
             if i + 1 < len(parts):
-                content_part = parts[i + 1].strip()
+                start, end, _ = parts[i + 1]
                 i += 2  # Skip both metadata and content parts
             else:
                 # Metadata without content, skip
@@ -1463,10 +2191,8 @@ def parse_slides(content: str, global_metadata: dict = None) -> List[Dict[str, s
                 continue
         else:
             # This is content without metadata
-            content_part = part
-            
             # If this is the first slide and it doesn't have metadata, inherit global metadata
-            if first_slide_inherits_global and len(slides) == 0:
+            if first_slide_inherits_global and count == 0:
                 metadata = global_metadata.copy()
             
             i += 1
@@ -1475,29 +2201,17 @@ def parse_slides(content: str, global_metadata: dict = None) -> List[Dict[str, s
         first_slide_inherits_global = False
         
         # Skip empty content
-        if not content_part or not content_part.strip():
+        if start == end:
             continue
         
-        # Clean up content by removing leading/trailing whitespace and empty lines
-        content_lines = content_part.split('\n')
-        while content_lines and not content_lines[0].strip():
-            content_lines.pop(0)
-        while content_lines and not content_lines[-1].strip():
-            content_lines.pop()
-        content_part = '\n'.join(content_lines)
-        
-        if not content_part:
-            continue
-        
-        slide = {
-            "id": f"slide-{len(slides) + 1}",
+        content_part = content[start:end]
+        count += 1
+        yield {
+            "id": f"slide-{count}",
             "content": content_part,
-            "html": markdown.markdown(content_part, extensions=['codehilite', 'fenced_code', 'tables']),
+            "html": convert_markdown(content_part, "slides") if render_html else None,
             "metadata": metadata
         }
-        slides.append(slide)
-    
-    return slides
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,175 @@
+"""Request stage timing and Prometheus metrics.
+
+Code on the request path wraps its expensive steps in ``stage("name")``.
+Durations are recorded per request as exclusive time (a nested stage is not
+counted again in its parent), returned to the client in a ``Server-Timing``
+header and aggregated into per-route histograms that ``METRICS.render()``
+exposes in the Prometheus text format alongside any registered gauges.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GaugeValue = Union[float, Dict[Tuple[Tuple[str, str], ...], float]]
+
+
+class StageRecorder:
+    """Exclusive per-stage durations for a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.totals.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_current_recorder: ContextVar[Optional[StageRecorder]] = ContextVar("stage_recorder", default=None)
+# Open stages of the current task. Each frame holds the time spent in nested
+# stages; a tuple in a context variable keeps concurrent tasks of the same
+# request from seeing each other's frames.
+_open_stages: ContextVar[Tuple[List[float], ...]] = ContextVar("open_stages", default=())
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a step of the current request; a no-op outside of one"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield
+        return
+    parents = _open_stages.get()
+    frame = [0.0]
+    token = _open_stages.set(parents + (frame,))
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _open_stages.reset(token)
+        recorder.add(name, elapsed - frame[0])
+        if parents:
+            parents[-1][0] += elapsed
+
+
+def start_request() -> Tuple[StageRecorder, object]:
+    recorder = StageRecorder()
+    return recorder, _current_recorder.set(recorder)
+
+
+def finish_request(token):
+    _current_recorder.reset(token)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Histograms keyed by label sets plus callback gauges"""
+
+    def __init__(self, prefix: str = "kc"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._gauges: List[Tuple[str, str, str, Callable[[], GaugeValue]]] = []
+
+    def describe_histogram(self, name: str, help_text: str):
+        self._help[name] = help_text
+        self._histograms.setdefault(name, {})
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], GaugeValue], kind: str = "gauge"):
+        """Register a value read at scrape time; the callback may return a
+        number or a mapping of label tuples to numbers"""
+        self._gauges.append((name, help_text, kind, callback))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                full_name = f"{self.prefix}_{name}"
+                help_text = self._help.get(name, name)
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{full_name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{full_name}_bucket{_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{full_name}_sum{_labels(key)} {_number(histogram.total)}")
+                    lines.append(f"{full_name}_count{_labels(key)} {histogram.count}")
+
+        for name, help_text, kind, callback in self._gauges:
+            full_name = f"{self.prefix}_{name}"
+            try:
+                value = callback()
+            except Exception:
+                continue
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            if isinstance(value, dict):
+                for key, item in sorted(value.items()):
+                    lines.append(f"{full_name}{_labels(key)} {_number(item)}")
+            else:
+                lines.append(f"{full_name} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+METRICS.describe_histogram("request_duration_seconds", "Time spent handling requests, by route")
+METRICS.describe_histogram("request_stage_duration_seconds", "Exclusive time spent in each request stage, by route")
@@ -0,0 +1,171 @@
+"""Opt-in profiling of individual requests.
+
+``ProfileCapture`` runs a block under cProfile and tracemalloc and produces a
+text report (top functions by cumulative time, top allocation sites and peak
+traced memory) plus the raw pstats data for tools like snakeviz.
+
+cProfile hooks the whole event loop thread, so work from other requests that
+runs concurrently is included; capture on a quiet worker for clean numbers.
+Work the request hands to the thread pool (rendering, file reads) runs on
+other threads, which the loop's profiler does not see: ``ProfilingExecutor``
+runs each job submitted on behalf of the profiled request under a profiler
+of its own, and the report merges them with the loop thread's.
+"""
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# The capture of the request being handled, seen by its tasks and (through
+# ProfilingExecutor.submit, called from them) by its thread-pool jobs
+_active_capture: ContextVar[Optional["ProfileCapture"]] = ContextVar("active_capture", default=None)
+
+
+class ProfileCapture:
+    def __init__(self, top: int = 40):
+        self.top = top
+        self.profiler = cProfile.Profile()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self.duration = 0.0
+        # Profilers of finished thread-pool jobs run for this request
+        self.thread_profilers: List[cProfile.Profile] = []
+        self._thread_lock = threading.Lock()
+        self._started_tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._token = _active_capture.set(self)
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.disable()
+        _active_capture.reset(self._token)
+        self.duration = time.perf_counter() - self._started
+        self.snapshot = tracemalloc.take_snapshot()
+        _, self.peak_bytes = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def profile_job(self, fn: Callable) -> Callable:
+        """`fn`, run under its own profiler in whichever thread executes it"""
+        def run(*args, **kwargs):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ profiles every thread from one process-wide hook,
+                # so the loop thread's profiler already covers this job
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.disable()
+                # Only finished jobs are merged (a running profiler cannot be read)
+                with self._thread_lock:
+                    self.thread_profilers.append(profiler)
+        return run
+
+    def stats(self, stream=None) -> pstats.Stats:
+        """Loop thread and thread-pool job profiles, merged"""
+        stats = pstats.Stats(self.profiler, stream=stream)
+        with self._thread_lock:
+            profilers = list(self.thread_profilers)
+        for profiler in profilers:
+            stats.add(profiler)
+        return stats
+
+    def report(self, title: str) -> str:
+        out = io.StringIO()
+        out.write(f"Profile: {title}\n")
+        out.write(f"Wall time: {self.duration * 1000:.2f} ms\n")
+        out.write(f"Thread-pool jobs profiled: {len(self.thread_profilers)}\n")
+        out.write(f"Peak traced memory: {self.peak_bytes / 1024:.1f} KiB\n\n")
+
+        stats = self.stats(stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+
+        if self.snapshot is not None:
+            snapshot = self.snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            out.write(f"Top {self.top} allocation sites:\n")
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                out.write(f"  {stat}\n")
+        return out.getvalue()
+
+    def save(self, directory: Path, name: str, title: str) -> Path:
+        """Write ``<name>.prof`` (pstats) and ``<name>.txt`` (report); returns the report path"""
+        directory.mkdir(parents=True, exist_ok=True)
+        self.stats().dump_stats(str(directory / f"{name}.prof"))
+        report_path = directory / f"{name}.txt"
+        report_path.write_text(self.report(title), encoding="utf-8")
+        return report_path
+
+
+class ProfilingExecutor(ThreadPoolExecutor):
+    """Thread pool that profiles the jobs submitted by a profiled request.
+
+    It also counts the jobs waiting for a thread (``queued``) and running
+    (``active``), for metrics that would otherwise have to read the pool's
+    private state.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, *args, **kwargs):
+        super().__init__(max_workers, *args, **kwargs)
+        self.max_workers = self._max_workers
+        self.queued = 0
+        self.active = 0
+        self._counts_lock = threading.Lock()
+
+    def _count(self, queued: int, active: int):
+        with self._counts_lock:
+            self.queued += queued
+            self.active += active
+
+    def submit(self, fn, /, *args, **kwargs):
+        capture = _active_capture.get()
+        if capture is not None:
+            fn = capture.profile_job(fn)
+
+        def job(*args, **kwargs):
+            self._count(-1, 1)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._count(0, -1)
+
+        self._count(1, 0)
+        try:
+            future = super().submit(job, *args, **kwargs)
+        except BaseException:
+            self._count(-1, 0)
+            raise
+        # A job cancelled before it started never runs to take itself off the queue
+        future.add_done_callback(lambda done: done.cancelled() and self._count(-1, 0))
+        return future
+
+
+def profile_name(route: str, path_params: Dict[str, str]) -> str:
+    """File-system friendly name from the route template and its parameters,
+    e.g. ``20240910-120000-123-api-courses-slides-google-family-veo.md``"""
+    now = time.time()
+    parts = [time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"]
+    parts += [segment for segment in route.split("/") if segment and not segment.startswith("{")]
+    parts += [str(value) for value in path_params.values()]
+    name = "-".join(parts)
+    return re.sub(r"[^a-zA-Z0-9\-_\.]", "_", name)[:200]
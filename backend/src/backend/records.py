@@ -0,0 +1,85 @@
+"""Compact records for the resident course and blog catalogs.
+
+A listing entry read from ``config.json`` is a dict with the same dozen keys
+repeated for every course. ``CompactRecord`` subclasses keep the common keys
+in ``__slots__`` and only fall back to a dict for keys outside that set, so
+a 50k-entry catalog does not pay for 50k hash tables. Values with few
+distinct strings (levels, authors, tags, ...) are interned so equal values
+share one object, and the key order of each source dict is kept as a shared
+tuple so ``to_dict()`` reproduces the original JSON exactly.
+"""
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+# Key-order tuples shared between records; most entries use one of a handful
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _shared_keys(data: Dict[str, Any]) -> Tuple[str, ...]:
+    keys = tuple(sys.intern(key) for key in data)
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+def _intern(value: Any) -> Any:
+    """Interned string, or a tuple of interned strings for a list of strings"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(sys.intern(item) for item in value)
+    return value
+
+
+class CompactRecord:
+    # Keys stored in slots (subclasses also list them in __slots__)
+    FIELDS: Tuple[str, ...] = ()
+    # Fields whose values repeat across records and are worth interning
+    INTERNED = frozenset()
+
+    __slots__ = ("_keys", "_extra")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactRecord":
+        record = cls.__new__(cls)
+        record._keys = _shared_keys(data)
+        extra = None
+        for key, value in data.items():
+            if key in cls.FIELDS:
+                setattr(record, key, _intern(value) if key in cls.INTERNED else value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        record._extra = extra
+        return record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key, default)
+            return list(value) if key in self.INTERNED and type(value) is tuple else value
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        extra: Optional[Dict[str, Any]] = self._extra
+        for key in self._keys:
+            if key in self.FIELDS:
+                value = getattr(self, key)
+                result[key] = list(value) if key in self.INTERNED and type(value) is tuple else value
+            else:
+                result[key] = extra[key]
+        return result
+
+
+class CourseRecord(CompactRecord):
+    FIELDS = ("id", "title", "description", "slides_count", "level", "duration", "author", "tags")
+    INTERNED = frozenset({"level", "duration", "author", "tags"})
+    __slots__ = FIELDS
+
+
+class BlogRecord(CompactRecord):
+    FIELDS = (
+        "slug", "title", "description", "author", "publishDate", "lastModified", "tags",
+        "category", "featured", "draft", "readingTime", "coverImage", "excerpt",
+    )
+    INTERNED = frozenset({"author", "publishDate", "lastModified", "tags", "category", "readingTime"})
+    __slots__ = FIELDS
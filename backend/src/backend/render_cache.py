@@ -0,0 +1,263 @@
+"""Render cache for markdown payloads.
+
+Rendered output (HTML, parsed decks, frontmatter) is keyed by the render
+profile that produced it and the SHA-256 of the source text, so an entry is
+valid for as long as the source bytes are unchanged and never needs explicit
+invalidation.
+
+Two levels are used:
+
+- an in-process LRU holding the Python objects themselves, bounded by the
+  approximate size of the text and bytes they hold, and
+- an optional SQLite file shared by every worker process on the host, which
+  stores JSON-encoded payloads and survives restarts. It is bounded by total
+  payload size and evicts the least recently used entries first; triggers
+  keep that total in a one-row table, so inserts never sum the whole store.
+  Payloads that are already bytes (pre-serialized responses) are stored as-is.
+
+Only whole documents are cached: a deck entry carries its slides' HTML, so
+rendering a large deck adds one entry rather than one per slide.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bump whenever the shape of cached payloads or the rendering pipeline changes,
+# so entries written by older code in the shared store are ignored.
+RENDER_CACHE_VERSION = "1"
+
+# Marks shared-store values holding raw bytes; JSON text never starts with NUL
+_RAW_PREFIX = b"\x00"
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def payload_size(value: Any) -> int:
+    """Approximate bytes held by a cached payload (its text and bytes dominate)"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return 8
+
+
+def _json_default(value: Any) -> Any:
+    # YAML frontmatter may contain dates; encode them the way FastAPI would
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SharedRenderStore:
+    """SQLite-backed second-level cache shared between worker processes"""
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS render_cache (
+                key TEXT PRIMARY KEY,
+                profile TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS render_cache_accessed ON render_cache (accessed)")
+        # Running total of `size`, shared by every process using the file
+        self._conn.executescript(
+            """
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS render_cache_total (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO render_cache_total (id, bytes)
+                SELECT 0, COALESCE(SUM(size), 0) FROM render_cache;
+            CREATE TRIGGER IF NOT EXISTS render_cache_insert AFTER INSERT ON render_cache
+                BEGIN UPDATE render_cache_total SET bytes = bytes + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS render_cache_update AFTER UPDATE OF size ON render_cache
+                BEGIN UPDATE render_cache_total SET bytes = bytes + NEW.size - OLD.size; END;
+            CREATE TRIGGER IF NOT EXISTS render_cache_delete AFTER DELETE ON render_cache
+                BEGIN UPDATE render_cache_total SET bytes = bytes - OLD.size; END;
+            COMMIT;
+            """
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value FROM render_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE render_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.OperationalError:
+                # Another worker holds the write lock; treat as a miss
+                return None
+        return row[0]
+
+    def set(self, key: str, profile: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                # An upsert, not INSERT OR REPLACE: replaced rows would skip the delete trigger
+                self._conn.execute(
+                    """
+                    INSERT INTO render_cache (key, profile, value, size, accessed) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        profile = excluded.profile, value = excluded.value,
+                        size = excluded.size, accessed = excluded.accessed
+                    """,
+                    (key, profile, value, len(value), time.time()),
+                )
+                self._evict()
+            except sqlite3.OperationalError:
+                pass
+
+    def _evict(self):
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the budget so we don't evict on every insert
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM render_cache ORDER BY accessed"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM render_cache WHERE key = ?", victims)
+
+    def _total(self) -> int:
+        return self._conn.execute("SELECT bytes FROM render_cache_total").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM render_cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM render_cache").fetchone()[0]
+            size = self._total()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+class RenderCache:
+    """Two-level cache of rendered payloads keyed by (profile, source hash)"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, shared: Optional[SharedRenderStore] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        # key -> (payload, its payload_size)
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(profile: str, source: str) -> str:
+        return f"{RENDER_CACHE_VERSION}:{profile}:{source_hash(source)}"
+
+    def get_local(self, profile: str, source: str) -> Optional[Any]:
+        """Look up the in-process level only (cheap enough for the event loop)"""
+        key = self.make_key(profile, source)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        return None
+
+    def get(self, profile: str, source: str) -> Optional[Any]:
+        key = self.make_key(profile, source)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+        if self.shared is not None:
+            data = self.shared.get(key)
+            if data is not None:
+                data = bytes(data)
+                value = data[1:] if data.startswith(_RAW_PREFIX) else json.loads(data)
+                self._store_local(key, value)
+                self.shared_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, profile: str, source: str, value: Any):
+        key = self.make_key(profile, source)
+        self._store_local(key, value)
+        if self.shared is not None:
+            if isinstance(value, bytes):
+                self.shared.set(key, profile, _RAW_PREFIX + value)
+                return
+            try:
+                data = json.dumps(value, ensure_ascii=False, default=_json_default).encode("utf-8")
+            except (TypeError, ValueError):
+                return
+            self.shared.set(key, profile, data)
+
+    def get_or_render(self, profile: str, source: str, render: Callable[[], Any]) -> Any:
+        value = self.get(profile, source)
+        if value is None:
+            value = render()
+            self.set(profile, source, value)
+        return value
+
+    def _store_local(self, key: str, value: Any):
+        size = payload_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
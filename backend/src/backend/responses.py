@@ -0,0 +1,177 @@
+"""JSON response classes.
+
+``FastJSONResponse`` is the app's default response class: it encodes with
+orjson (a project dependency) and falls back to the stdlib encoder, with the
+same compact output Starlette produces, in environments without it.
+
+``PreSerializedJSONResponse`` sends bytes that were encoded ahead of time
+(typically kept in the render cache next to the payload they came from), so
+repeat requests for an unchanged document skip encoding entirely. The same
+goes for compression: ``negotiate_encoding`` picks brotli (when the package
+is installed) or gzip from ``Accept-Encoding`` and ``compress`` produces the
+variant once for the cache to keep.
+
+``JSONCompressionMiddleware`` compresses the other JSON responses on the fly.
+It only touches complete ``application/json`` bodies, so streamed responses
+(NDJSON decks), files and media are passed through as they are produced.
+"""
+import asyncio
+import gzip
+import json
+from typing import Any, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import stage
+
+try:
+    import orjson
+except ImportError:  # installed with the project; tolerate its absence
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+# Bodies smaller than this are sent uncompressed; framing overhead dominates
+COMPRESS_MIN_BYTES = 1024
+# Preferred first when the client accepts both with the same weight
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Responses JSONCompressionMiddleware may compress
+COMPRESSIBLE_TYPES = frozenset({"application/json"})
+# On-the-fly compression of bodies this large runs in the thread pool
+COMPRESS_OFF_LOOP_BYTES = 64 * 1024
+
+
+def dumps(content: Any) -> bytes:
+    """Encode already JSON-compatible content as compact UTF-8 JSON"""
+    if orjson is not None:
+        # YAML frontmatter can produce non-string keys (e.g. `1: intro`)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def serialize(content: Any) -> bytes:
+    """Encode arbitrary endpoint output (dates, models, ...) the way FastAPI would"""
+    with stage("serialize"):
+        return dumps(jsonable_encoder(content))
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response whose serialization is reported as its own request stage"""
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return dumps(content)
+
+
+class PreSerializedJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, body: bytes, status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(content=body, status_code=status_code, headers=headers)
+
+
+def negotiate_encoding(accept_encoding: str, size: int) -> Optional[str]:
+    """Content coding to use for a body of ``size`` bytes, or None for identity"""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    # Variants are computed once per cached payload, so favour ratio over speed
+    with stage("compress"):
+        if encoding == "br":
+            return brotli.compress(body, quality=11)
+        return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def compress_dynamic(body: bytes, encoding: str) -> bytes:
+    # Once per response: cheaper settings than the cached variants
+    with stage("compress"):
+        if encoding == "br":
+            return brotli.compress(body, quality=5)
+        return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class JSONCompressionMiddleware:
+    """Compress complete, not yet encoded JSON responses per ``Accept-Encoding``.
+
+    The response start is held back until the first body message: a body sent
+    in one message is compressed (in the thread pool when large), one sent in
+    several (a stream) goes out untouched and unbuffered. Other content types,
+    files (which advertise ``Accept-Ranges``), partial (206) responses and
+    bodies that already have a Content-Encoding are never held.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip()
+                # Files (FileResponse, StaticFiles) advertise byte ranges; never re-encode them
+                passthrough = "content-encoding" in headers or "accept-ranges" in headers
+                if message["status"] == 200 and media_type in COMPRESSIBLE_TYPES and not passthrough:
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                held, start = start, None
+                body = message.get("body", b"")
+                if not message.get("more_body", False):
+                    held = {**held, "headers": list(held["headers"])}
+                    headers = MutableHeaders(raw=held["headers"])
+                    if len(body) >= COMPRESS_MIN_BYTES:
+                        headers.add_vary_header("Accept-Encoding")
+                    encoding = negotiate_encoding(accept_encoding, len(body))
+                    if encoding is not None:
+                        if len(body) >= COMPRESS_OFF_LOOP_BYTES:
+                            body = await asyncio.to_thread(compress_dynamic, body, encoding)
+                        else:
+                            body = compress_dynamic(body, encoding)
+                        headers["Content-Encoding"] = encoding
+                        headers["Content-Length"] = str(len(body))
+                        message = {"type": "http.response.body", "body": body, "more_body": False}
+                await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
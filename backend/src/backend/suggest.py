@@ -0,0 +1,201 @@
+"""Type-ahead suggestions over course, lab and blog titles.
+
+``PrefixIndex`` keeps a sorted list of search terms per kind (course, lab,
+blog), so a lookup is a binary search for the typed prefix followed by a
+short scan of the neighbouring terms, in the lists of the requested kinds
+only: a kind-filtered lookup never wades through terms of other kinds.
+Each title contributes one term per word it contains (the title from that
+word on, normalized), so typing any word of a title finds it, and typing
+several words finds titles containing that phrase.
+Terms end with ``\\0`` and the id of their entry, which keeps them unique and
+lets inserts and removals find their slot with the same binary search.
+Single entries are inserted in place; a sync that changes many titles (a
+full rescan) sorts the new terms once and merges them in a single pass.
+
+The index is kept current by the code paths that rescan or write courses,
+labs and blogs, with ``sync`` replacing every entry under an id prefix
+("course:", "lab:<course>/", ...) and only touching titles that changed.
+``sync_off_loop`` does the same work in a worker thread, on a copy of the
+index that replaces it when done.
+"""
+import asyncio
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Terms start at one of the first MAX_WORDS words and are cut at MAX_TERM_LENGTH
+MAX_WORDS = 16
+MAX_TERM_LENGTH = 64
+# Matching terms looked at per kind and lookup before ranking them
+MAX_SCAN = 256
+# Term changes in one sync above which the list is rebuilt in one pass
+BULK_THRESHOLD = 64
+
+# Ideographs and kana are words of their own (CJK titles have no spaces)
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_WORD = re.compile(f"[{_CJK}]|[^\\W{_CJK}]+")
+
+
+def normalize(text: str) -> List[str]:
+    """Case- and accent-insensitive words of `text`"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _WORD.findall(stripped)
+
+
+class PrefixIndex:
+    def __init__(self):
+        # kind -> its sorted terms
+        self._terms: Dict[str, List[str]] = {}
+        # id -> (kind, title, its first term, extra fields returned with the suggestion)
+        self._entries: Dict[str, Tuple[str, str, str, Dict[str, Any]]] = {}
+        # Bumped by every update, so an off-loop sync can tell it raced one
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def term_count(self) -> int:
+        return sum(len(terms) for terms in self._terms.values())
+
+    @staticmethod
+    def _terms_for(entry_id: str, title: str) -> List[str]:
+        words = normalize(title)
+        return [" ".join(words[start:])[:MAX_TERM_LENGTH] + "\0" + entry_id for start in range(min(len(words), MAX_WORDS))]
+
+    def set(self, entry_id: str, kind: str, title: Optional[str], fields: Optional[Dict[str, Any]] = None):
+        """Add or replace an entry; a missing title removes it"""
+        self._version += 1
+        fields = fields or {}
+        if not title:
+            self.remove(entry_id)
+            return
+        old = self._entries.get(entry_id)
+        if old is not None and old[:2] == (kind, title):
+            self._entries[entry_id] = (kind, title, old[2], fields)
+            return
+        if old is not None:
+            self._unindex(entry_id, old[0], old[1])
+        terms = self._terms_for(entry_id, title)
+        if not terms:
+            # Nothing searchable (punctuation only)
+            self._entries.pop(entry_id, None)
+            return
+        self._entries[entry_id] = (kind, title, terms[0], fields)
+        kind_terms = self._terms.setdefault(kind, [])
+        for term in terms:
+            insort(kind_terms, term)
+
+    def remove(self, entry_id: str):
+        self._version += 1
+        old = self._entries.pop(entry_id, None)
+        if old is not None:
+            self._unindex(entry_id, old[0], old[1])
+
+    def _unindex(self, entry_id: str, kind: str, title: str):
+        kind_terms = self._terms.get(kind, [])
+        for term in self._terms_for(entry_id, title):
+            position = bisect_left(kind_terms, term)
+            if position < len(kind_terms) and kind_terms[position] == term:
+                del kind_terms[position]
+
+    def sync(self, prefix: str, entries: Iterable[Tuple[str, str, Optional[str], Dict[str, Any]]]):
+        """Make the entries whose id starts with `prefix` exactly `entries`
+        (id, kind, title, fields); unchanged titles are not re-indexed
+        """
+        self._version += 1
+        current = {entry_id for entry_id in self._entries if entry_id.startswith(prefix)}
+        # kind -> terms to insert, terms to delete
+        changes: Dict[str, Tuple[List[str], List[str]]] = {}
+        for entry_id, kind, title, fields in entries:
+            current.discard(entry_id)
+            fields = fields or {}
+            old = self._entries.get(entry_id)
+            if old is not None and old[:2] == (kind, title):
+                self._entries[entry_id] = (kind, title, old[2], fields)
+                continue
+            if old is not None:
+                del self._entries[entry_id]
+                changes.setdefault(old[0], ([], []))[1].extend(self._terms_for(entry_id, old[1]))
+            terms = self._terms_for(entry_id, title) if title else []
+            if terms:
+                self._entries[entry_id] = (kind, title, terms[0], fields)
+                changes.setdefault(kind, ([], []))[0].extend(terms)
+        for entry_id in current:
+            kind, title, _, _ = self._entries.pop(entry_id)
+            changes.setdefault(kind, ([], []))[1].extend(self._terms_for(entry_id, title))
+        for kind, (added, dropped) in changes.items():
+            self._apply(kind, added, dropped)
+
+    def _apply(self, kind: str, added: List[str], dropped: List[str]):
+        """Insert `added` and delete `dropped` terms of one kind, one by one for
+        a handful, in one pass over the list for more (a sync after a full rescan)
+        """
+        terms = self._terms.setdefault(kind, [])
+        if len(added) + len(dropped) <= BULK_THRESHOLD:
+            for term in dropped:
+                position = bisect_left(terms, term)
+                if position < len(terms) and terms[position] == term:
+                    del terms[position]
+            for term in added:
+                insort(terms, term)
+            return
+        if dropped:
+            dropped_set = set(dropped)
+            terms = [term for term in terms if term not in dropped_set]
+        # Timsort merges the sorted list and the sorted batch as two runs
+        added.sort()
+        terms.extend(added)
+        terms.sort()
+        self._terms[kind] = terms
+
+    async def sync_off_loop(self, prefix: str, entries: Iterable[Tuple[str, str, Optional[str], Dict[str, Any]]]):
+        """`sync` run in a worker thread on a copy of the index, which then
+        replaces it; if the index was updated meanwhile, the copy is dropped
+        and the sync applied in place instead
+        """
+        entries = list(entries)
+        version = self._version
+        copy = PrefixIndex()
+        copy._terms = {kind: terms.copy() for kind, terms in self._terms.items()}
+        copy._entries = self._entries.copy()
+        await asyncio.to_thread(copy.sync, prefix, entries)
+        if self._version == version:
+            self._terms, self._entries = copy._terms, copy._entries
+            self._version += 1
+        else:
+            self.sync(prefix, entries)
+
+    def remove_prefix(self, prefix: str):
+        self.sync(prefix, ())
+
+    def suggest(self, query: str, limit: int = 8, kinds: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Titles with a word (or run of words) starting with `query`; titles
+        starting with it come first, then shorter titles
+        """
+        words = normalize(query)
+        if not words or limit <= 0:
+            return []
+        prefix = " ".join(words)[:MAX_TERM_LENGTH]
+        wanted = set(kinds) if kinds else self._terms.keys()
+
+        ranked: Dict[str, Tuple[int, int, str]] = {}
+        for kind in wanted:
+            terms = self._terms.get(kind, ())
+            position = bisect_left(terms, prefix)
+            for term in terms[position:position + MAX_SCAN]:
+                if not term.startswith(prefix):
+                    break
+                entry_id = term[term.index("\0") + 1:]
+                if entry_id not in ranked:
+                    # An entry matches once per matching word; rank it by the title
+                    _, title, head, _ = self._entries[entry_id]
+                    ranked[entry_id] = (0 if head.startswith(prefix) else 1, len(title), title.casefold())
+
+        results = []
+        for entry_id in sorted(ranked, key=ranked.__getitem__)[:limit]:
+            kind, title, _, fields = self._entries[entry_id]
+            results.append({"type": kind, "title": title, **fields})
+        return results
@@ -0,0 +1,127 @@
+"""Deferred deletion of course directories.
+
+Removing a course with gigabytes of assets takes seconds of file system
+work. ``CourseTrash.bury`` instead renames the course directory into a trash
+directory inside ``courses/`` (a single atomic rename on the same file
+system, so the course disappears from every listing at once) and
+``reclaim`` deletes buried directories afterwards, in a worker thread, while
+recording progress and any paths it failed to remove. Entries that could not
+be fully removed stay in the trash and are retried by the next reclaim.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+MAX_FAILURES = 50
+
+
+class CourseTrash:
+    def __init__(self, root: Path, on_reclaimed: Optional[Callable[[], Any]] = None):
+        self.root = Path(root)
+        # Called after a reclaim pass removed something (e.g. blob store collection)
+        self.on_reclaimed = on_reclaimed
+        self.buried = 0
+        self.reclaimed = 0
+        self.files_removed = 0
+        self.bytes_reclaimed = 0
+        self.failed = 0
+        self.current: Optional[str] = None
+        self.failures: Deque[Dict[str, Any]] = deque(maxlen=MAX_FAILURES)
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def bury(self, path: Path) -> Path:
+        """Atomically move `path` into the trash; returns its tombstone path"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tombstone = self.root / f"{path.name}.{uuid.uuid4().hex[:8]}"
+        os.rename(path, tombstone)
+        self.buried += 1
+        return tombstone
+
+    def entries(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(self.root.iterdir())
+
+    def reclaim(self):
+        """Delete everything in the trash (blocking; run it in a worker thread).
+
+        Only one reclaim runs at a time; a call made meanwhile makes the
+        running one do another pass instead of waiting for it.
+        """
+        self._pending = True
+        while self._pending and self._lock.acquire(blocking=False):
+            removed = False
+            try:
+                self._pending = False
+                for entry in self.entries():
+                    removed = self._remove(entry) or removed
+            finally:
+                self.current = None
+                self._lock.release()
+            if removed and self.on_reclaimed is not None:
+                self.on_reclaimed()
+
+    def _record_failure(self, path: str, error: OSError):
+        self.failed += 1
+        self.failures.append({"path": path, "error": str(error), "time": time.time()})
+        print(f"Failed to reclaim {path}: {error}")
+
+    def _remove(self, entry: Path) -> bool:
+        self.current = entry.name
+        if not entry.is_dir() or entry.is_symlink():
+            try:
+                size = entry.lstat().st_size
+                entry.unlink()
+            except OSError as e:
+                self._record_failure(str(entry), e)
+                return False
+            self.files_removed += 1
+            self.bytes_reclaimed += size
+            return True
+
+        # Bottom-up, so each directory is empty by the time it is removed
+        for dirpath, dirnames, filenames in os.walk(entry, topdown=False, onerror=lambda e: self._record_failure(e.filename, e)):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    size = os.lstat(path).st_size
+                    os.unlink(path)
+                except OSError as e:
+                    self._record_failure(path, e)
+                    continue
+                self.files_removed += 1
+                self.bytes_reclaimed += size
+            for name in dirnames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.path.islink(path):
+                        # Symlinks to directories are listed here but not walked
+                        os.unlink(path)
+                    else:
+                        os.rmdir(path)
+                except OSError as e:
+                    self._record_failure(path, e)
+        try:
+            os.rmdir(entry)
+        except OSError as e:
+            self._record_failure(str(entry), e)
+            return False
+        self.reclaimed += 1
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pending": [entry.name for entry in self.entries()],
+            "reclaiming": self.current,
+            "buried_total": self.buried,
+            "reclaimed_total": self.reclaimed,
+            "files_removed_total": self.files_removed,
+            "bytes_reclaimed_total": self.bytes_reclaimed,
+            "failures_total": self.failed,
+            "recent_failures": list(self.failures),
+        }
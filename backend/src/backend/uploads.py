@@ -0,0 +1,215 @@
+"""Resumable chunked uploads.
+
+A client creates a session for a file of known size, then PUTs fixed-size
+numbered chunks in any order (and again after a dropped connection). Each
+chunk is streamed straight into a preallocated staging file at its offset,
+so nothing is held in memory and a resumed upload only re-sends the chunks
+the session is missing. Session state lives in a JSON file next to the
+staging file, so uploads survive a server restart. Session files are only
+read and written in worker threads, never on the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import aiofiles
+
+_UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Client-side problem with an upload request (mapped to 400 by the API)"""
+
+
+class UploadSessionGone(Exception):
+    """The session was discarded (aborted, expired or its course deleted) while in use"""
+
+
+class UploadSession:
+    def __init__(self, upload_id: str, course_name: str, filename: str, size: int, chunk_size: int,
+                 sha256: Optional[str] = None, received: Optional[List[int]] = None, created: Optional[float] = None):
+        self.upload_id = upload_id
+        self.course_name = course_name
+        self.filename = filename
+        self.size = size
+        self.chunk_size = chunk_size
+        self.sha256 = sha256
+        self.received = set(received or [])
+        self.created = created if created is not None else time.time()
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, -(-self.size // self.chunk_size))
+
+    def chunk_length(self, index: int) -> int:
+        if index == self.total_chunks - 1:
+            return self.size - index * self.chunk_size
+        return self.chunk_size
+
+    def missing(self) -> List[int]:
+        return [index for index in range(self.total_chunks) if index not in self.received]
+
+    def status(self) -> Dict:
+        missing = self.missing()
+        return {
+            "upload_id": self.upload_id,
+            "course_name": self.course_name,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received": sorted(self.received),
+            "missing": missing,
+            "complete": not missing,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "upload_id": self.upload_id,
+            "course_name": self.course_name,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "sha256": self.sha256,
+            "received": sorted(self.received),
+            "created": self.created,
+        })
+
+    @classmethod
+    def from_json(cls, text: str) -> "UploadSession":
+        return cls(**json.loads(text))
+
+
+class UploadSessions:
+    def __init__(self, root: Path, chunk_size: int, max_size: int, ttl: float):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+
+    def staging_path(self, session: UploadSession) -> Path:
+        return self.root / f"{session.upload_id}.part"
+
+    def lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    async def create(self, course_name: str, filename: str, size: int, sha256: Optional[str] = None,
+                     chunk_size: Optional[int] = None) -> UploadSession:
+        if size < 0 or size > self.max_size:
+            raise UploadError(f"size must be between 0 and {self.max_size} bytes")
+        if sha256 is not None and not re.fullmatch(r"[0-9a-fA-F]{64}", sha256):
+            raise UploadError("sha256 must be a hex SHA-256 digest")
+        chunk_size = chunk_size or self.chunk_size
+        if chunk_size <= 0:
+            raise UploadError("chunk_size must be positive")
+        await self.expire()
+
+        session = UploadSession(uuid.uuid4().hex, course_name, filename, size, chunk_size,
+                                sha256.lower() if sha256 else None)
+        await asyncio.to_thread(self._create_files, session)
+        return session
+
+    def _create_files(self, session: UploadSession):
+        # Preallocate (sparsely) so chunks can be written at their offsets in any order
+        with open(self.staging_path(session), "wb") as f:
+            f.truncate(session.size)
+        self._save(session)
+
+    async def get(self, upload_id: str) -> Optional[UploadSession]:
+        if not _UPLOAD_ID.fullmatch(upload_id):
+            return None
+        return await asyncio.to_thread(self._load, upload_id)
+
+    def _load(self, upload_id: str) -> Optional[UploadSession]:
+        try:
+            return UploadSession.from_json(self._meta_path(upload_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    async def save(self, session: UploadSession):
+        await asyncio.to_thread(self._save, session)
+
+    def _save(self, session: UploadSession):
+        meta_path = self._meta_path(session.upload_id)
+        temp_path = meta_path.with_suffix(".json.tmp")
+        temp_path.write_text(session.to_json(), encoding="utf-8")
+        os.replace(temp_path, meta_path)
+
+    async def write_chunk(self, session: UploadSession, index: int, body: AsyncIterator[bytes]):
+        """Stream one chunk into the staging file and record it as received"""
+        if not 0 <= index < session.total_chunks:
+            raise UploadError(f"chunk index must be between 0 and {session.total_chunks - 1}")
+        expected = session.chunk_length(index)
+        written = 0
+        try:
+            async with aiofiles.open(self.staging_path(session), "r+b") as f:
+                await f.seek(index * session.chunk_size)
+                async for piece in body:
+                    written += len(piece)
+                    if written > expected:
+                        raise UploadError(f"chunk {index} must be {expected} bytes")
+                    await f.write(piece)
+        except FileNotFoundError:
+            raise UploadSessionGone(session.upload_id)
+        if written != expected:
+            raise UploadError(f"chunk {index} must be {expected} bytes, got {written}")
+
+        async with self.lock(session.upload_id):
+            # Re-read: other chunks of the session may have been recorded meanwhile,
+            # or the session discarded (saving it would bring it back)
+            current = await self.get(session.upload_id)
+            if current is None:
+                raise UploadSessionGone(session.upload_id)
+            current.received.add(index)
+            await self.save(current)
+            session.received = current.received
+
+    def digest(self, session: UploadSession) -> str:
+        digest = hashlib.sha256()
+        with open(self.staging_path(session), "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    async def discard(self, session: UploadSession):
+        await asyncio.to_thread(self._discard, session)
+        self._locks.pop(session.upload_id, None)
+
+    def _discard(self, session: UploadSession):
+        self.staging_path(session).unlink(missing_ok=True)
+        self._meta_path(session.upload_id).unlink(missing_ok=True)
+
+    async def expire(self):
+        """Drop sessions (and their staging files) older than the TTL"""
+        cutoff = time.time() - self.ttl
+        await self._discard_where(lambda session: session.created < cutoff)
+
+    async def discard_course(self, course_name: str):
+        """Drop every session uploading into a course (when it is deleted)"""
+        await self._discard_where(lambda session: session.course_name == course_name)
+
+    async def _discard_where(self, predicate: Callable[[UploadSession], bool]):
+        for session in await asyncio.to_thread(self._sessions):
+            if predicate(session):
+                await self.discard(session)
+
+    def _sessions(self) -> List[UploadSession]:
+        sessions = []
+        for meta_path in self.root.glob("*.json"):
+            try:
+                sessions.append(UploadSession.from_json(meta_path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError):
+                continue
+        return sessions
@@ -0,0 +1,85 @@
+"""Background warm-up after startup.
+
+Startup work that only makes later requests faster (building the listings,
+loading the markdown stack, pre-rendering decks into the render cache) runs
+as a sequence of named steps in a task started once the app is up, instead
+of delaying the first request. ``status()`` reports each step's progress for
+the readiness endpoint.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# A step gets a callback to report (done, total) progress on long-running work
+Step = Callable[[Callable[[int, int], None]], Awaitable[Any]]
+
+
+class WarmupStep:
+    __slots__ = ("name", "state", "done", "total", "started", "finished", "error")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "pending"
+        self.done = 0
+        self.total: Optional[int] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def progress(self, done: int, total: int):
+        self.done = done
+        self.total = total
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"name": self.name, "state": self.state}
+        if self.total is not None:
+            status["done"] = self.done
+            status["total"] = self.total
+        if self.started is not None:
+            end = self.finished if self.finished is not None else time.perf_counter()
+            status["duration_ms"] = round((end - self.started) * 1000, 1)
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+class Warmup:
+    def __init__(self):
+        self._steps: List[Tuple[WarmupStep, Step]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.started_at = time.time()
+
+    def step(self, name: str, fn: Step):
+        self._steps.append((WarmupStep(name), fn))
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def _run(self):
+        for step, fn in self._steps:
+            step.state = "running"
+            step.started = time.perf_counter()
+            try:
+                await fn(step.progress)
+                step.state = "done"
+            except Exception as e:
+                # A failed step only means colder requests; carry on with the rest
+                step.state = "failed"
+                step.error = str(e)
+            step.finished = time.perf_counter()
+
+    @property
+    def ready(self) -> bool:
+        return all(step.state in ("done", "failed") for step, _ in self._steps)
+
+    def status(self) -> Dict[str, Any]:
+        steps = [step.status() for step, _ in self._steps]
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "steps_done": sum(1 for step in steps if step["state"] in ("done", "failed")),
+            "steps_total": len(steps),
+            "steps": steps,
+        }
@@ -0,0 +1,51 @@
+"""Shared fixtures: the app, run from a scratch working directory.
+
+The app resolves ``courses/``, ``blogs/`` and its other data directories
+against the working directory, so the session imports it from an empty one.
+"""
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def main(tmp_path_factory):
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    from backend import main
+    yield main
+    os.chdir(previous)
+
+
+@pytest.fixture(scope="session")
+def client(main):
+    # One client (one event loop) per session: closing a loop shuts down its
+    # default executor, which is the app's IO_EXECUTOR
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_blog(main):
+    def make(slug: str, title: str, content: str):
+        blog_dir = main.BLOGS_DIR / slug
+        blog_dir.mkdir(parents=True, exist_ok=True)
+        config = {"slug": slug, "title": title, "publishDate": "2024-01-01"}
+        (blog_dir / "config.json").write_text(json.dumps(config), encoding="utf-8")
+        (blog_dir / "content.md").write_text(content, encoding="utf-8")
+        return blog_dir
+    return make
+
+
+@pytest.fixture
+def make_course(main):
+    def make(course_id: str, title: str, slides: str, **config):
+        course_dir = main.COURSES_DIR / course_id
+        (course_dir / "slides").mkdir(parents=True, exist_ok=True)
+        config = {"id": course_id, "title": title, **config}
+        (course_dir / "config.json").write_text(json.dumps(config), encoding="utf-8")
+        (course_dir / "slides" / "slides.md").write_text(slides, encoding="utf-8")
+        return course_dir
+    return make
@@ -0,0 +1,67 @@
+import asyncio
+
+from backend.admission import AdmissionGate
+
+
+def call(app, method: str, path: str, body: bytes = b"", headers=()):
+    """Run one request through the ASGI app; returns (status, headers, body, body_was_read)"""
+    state = {"read": False, "status": None, "headers": [], "body": b""}
+
+    async def receive():
+        state["read"] = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+            state["headers"] = message["headers"]
+        elif message["type"] == "http.response.body":
+            state["body"] += message.get("body", b"")
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"test"), *headers],
+        "client": ("127.0.0.1", 0), "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    return state
+
+
+def test_rejected_upload_is_answered_before_its_body_is_read(main, monkeypatch):
+    # No slots and no queue: every upload is rejected
+    monkeypatch.setitem(main.ADMISSION_GATES, "upload", AdmissionGate("upload", limit=0, max_queue=0, queue_timeout=0))
+    body = b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.md\"\r\n\r\n# A\r\n--b--\r\n"
+
+    state = call(main.app, "POST", "/api/courses/import", body, [(b"content-type", b"multipart/form-data; boundary=b")])
+
+    assert state["status"] == 503
+    assert (b"retry-after", str(main.ADMISSION_RETRY_AFTER).encode()) in state["headers"]
+    assert b"Server busy (queue_full)" in state["body"]
+    assert not state["read"]
+
+
+def test_ungated_routes_are_not_admitted(main):
+    assert main.route_admission_class({"type": "http", "method": "GET", "path": "/metrics", "root_path": ""}) is None
+    assert main.route_admission_class({"type": "http", "method": "GET", "path": "/api/courses", "root_path": ""}) == "listing"
+    assert main.route_admission_class({"type": "http", "method": "POST", "path": "/api/courses/import", "root_path": ""}) == "upload"
+
+
+def test_batch_requests_are_admitted_one_by_one(main, client, make_course, monkeypatch):
+    make_course("batched", "Batched", "# One\n")
+    # One render at a time and no queue: a batch cannot run several at once
+    gate = AdmissionGate("render", limit=1, max_queue=0, queue_timeout=0)
+    monkeypatch.setitem(main.ADMISSION_GATES, "render", gate)
+
+    response = client.post("/api/batch", json={"requests": [
+        {"resource": "course", "course": "batched"},
+        {"resource": "slide_files", "course": "batched"},
+        {"resource": "labs", "course": "batched"},
+        {"resource": "labs", "course": "batched"},
+    ]})
+
+    assert response.status_code == 200
+    statuses = [entry["status"] for entry in response.json()["responses"]]
+    assert statuses[0] == 200
+    assert sorted(statuses[1:]) == [200, 503, 503]
+    assert gate.admitted == 1 and gate.active == 0
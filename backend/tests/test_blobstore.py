@@ -0,0 +1,51 @@
+import errno
+import hashlib
+
+from backend import blobstore
+from backend.blobstore import BlobStore
+
+
+def test_release_drops_the_blob_with_its_last_user_without_rehashing(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "blobs")
+    first = tmp_path / "course-a" / "assets" / "clip.mp4"
+    second = tmp_path / "course-b" / "assets" / "clip.mp4"
+    blob = store.put_bytes(b"video" * 1000, first)
+    assert store.put_bytes(b"video" * 1000, second) == blob
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} was hashed")
+    monkeypatch.setattr(blobstore, "file_digest", no_hashing)
+
+    store.release(first)
+    assert not first.exists() and blob.exists()
+
+    store.release(second)
+    assert not second.exists() and not blob.exists()
+
+
+def test_release_finds_blobs_written_by_another_store(tmp_path):
+    # e.g. another worker process sharing the store directory
+    writer = BlobStore(tmp_path / "blobs")
+    blob = writer.put_bytes(b"image", tmp_path / "course" / "assets" / "a.png")
+
+    reader = BlobStore(tmp_path / "blobs")
+    reader.find_blob((tmp_path / "blobs").stat())  # index built before the next write
+    other = writer.put_bytes(b"other image", tmp_path / "course" / "assets" / "b.png")
+
+    reader.release(tmp_path / "course" / "assets" / "b.png")
+    assert not other.exists() and blob.exists()
+
+
+def test_move_file_copies_across_filesystems(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "blobs")
+    dest = tmp_path / "course" / "assets" / "clip.mp4"
+    store.put_bytes(b"video", tmp_path / "other" / "assets" / "clip.mp4")
+    staged = tmp_path / "upload.part"
+    staged.write_bytes(b"video")
+
+    def cross_device(source, target):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(blobstore.os, "link", cross_device)
+
+    store.move_file(staged, dest, hashlib.sha256(b"video").hexdigest())
+    assert dest.read_bytes() == b"video" and not staged.exists()
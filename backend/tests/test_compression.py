@@ -0,0 +1,37 @@
+def test_json_response_is_compressed(client, make_course):
+    make_course("compressed", "Compressed", "# Slide\n", description="A long description. " * 100)
+
+    response = client.get("/api/courses/compressed", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json()["description"].startswith("A long description.")
+
+
+def test_assets_are_not_compressed(client, make_course):
+    course_dir = make_course("with-assets", "With assets", "# Slide\n")
+    (course_dir / "assets").mkdir()
+    (course_dir / "assets" / "data.json").write_text("[" + ",".join(["1"] * 2000) + "]", encoding="utf-8")
+    (course_dir / "assets" / "clip.mp4").write_bytes(b"\0" * 50_000)
+
+    for name in ("data.json", "clip.mp4"):
+        response = client.get(f"/assets/with-assets/{name}", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+
+    response = client.get("/assets/with-assets/clip.mp4", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert "Content-Encoding" not in response.headers
+    assert len(response.content) == 100
+
+
+def test_precompressed_body_is_not_compressed_twice(client, make_blog):
+    make_blog("precompressed", "Precompressed", "# Precompressed\n\n" + "Paragraph.\n\n" * 300)
+
+    response = client.get("/api/blogs/precompressed", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    # httpx decodes once; a doubly-compressed body would not be JSON here
+    assert response.json()["config"]["slug"] == "precompressed"
+    assert not response.content.startswith(b"\x1f\x8b")
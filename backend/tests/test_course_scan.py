@@ -0,0 +1,66 @@
+import asyncio
+
+from backend import facets, suggest
+
+
+def on_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_course_scan_parses_and_indexes_off_the_loop(main, client, make_course, monkeypatch):
+    make_course("scanned-off-loop", "Scanned off the loop", "# One\n\n---\n\n# Two\n\n---\n\n# Three\n", tags=["threads"])
+    calls = []
+
+    def spy(name, fn):
+        def wrapper(*args, **kwargs):
+            calls.append((name, on_loop()))
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(main, "parse_slides", spy("parse_slides", main.parse_slides))
+    monkeypatch.setattr(facets.FacetIndex, "add", spy("facets", facets.FacetIndex.add))
+    monkeypatch.setattr(suggest, "normalize", spy("suggest", suggest.normalize))
+
+    courses = client.portal.call(main.scan_courses)
+
+    assert {name for name, _ in calls} == {"parse_slides", "facets", "suggest"}
+    assert not any(loop for _, loop in calls)
+    course = next(course for course in courses if course.get("id") == "scanned-off-loop")
+    assert course.get("slides_count") == 3
+    matches, _ = main.COURSE_FACETS.search({"tag": ["threads"]})
+    assert [match.get("id") for match in matches] == ["scanned-off-loop"]
+    assert main.SUGGESTIONS.suggest("scanned off", kinds=["course"])[0]["id"] == "scanned-off-loop"
+
+
+def test_off_loop_sync_yields_to_concurrent_updates():
+    index = suggest.PrefixIndex()
+
+    async def scenario():
+        syncing = asyncio.ensure_future(index.sync_off_loop("course:", [("course:a", "course", "Alpha", {})]))
+        await asyncio.sleep(0)
+        # Lands while the copy is being synced in the worker thread
+        index.set("lab:a/1", "lab", "Alpha lab")
+        await syncing
+
+    asyncio.run(scenario())
+    assert [entry["title"] for entry in index.suggest("alpha")] == ["Alpha", "Alpha lab"]
+
+
+def test_off_loop_facet_rebuild_yields_to_concurrent_writes():
+    index = facets.FacetIndex({"tag": "tags"})
+    index.add({"id": "a", "tags": ["old"]})
+
+    async def scenario():
+        version = index.version
+        # A write lands between the scan's reads and the swap
+        index.add({"id": "a", "tags": ["new"]})
+        assert not await index.rebuild_off_loop([{"id": "a", "tags": ["old"]}], version)
+        assert await index.rebuild_off_loop([{"id": "a", "tags": ["new"]}, {"id": "b", "tags": ["new"]}])
+
+    asyncio.run(scenario())
+    matches, _ = index.search({"tag": ["new"]})
+    assert [match["id"] for match in matches] == ["a", "b"]
@@ -0,0 +1,33 @@
+import asyncio
+import io
+import json
+import shutil
+import zipfile
+
+
+def test_zip_import_copies_off_the_loop(main, client, monkeypatch):
+    copies = []
+
+    def copy_function(target_path):
+        def copy(source, dest):
+            try:
+                asyncio.get_running_loop()
+                copies.append("loop")
+            except RuntimeError:
+                copies.append("thread")
+            return shutil.copy2(source, dest)
+        return copy
+    monkeypatch.setattr(main, "course_copy_function", copy_function)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("zipped/config.json", json.dumps({"id": "zipped", "title": "Zipped"}))
+        zip_file.writestr("zipped/slides/slides.md", "# One\n\n---\n\n# Two\n")
+        zip_file.writestr("zipped/assets/image.png", b"\x89PNG" + b"\0" * 100)
+
+    response = client.post("/api/courses/import", files={"file": ("zipped.zip", archive.getvalue(), "application/zip")})
+
+    assert response.status_code == 200
+    assert response.json()["slides_count"] == 2
+    assert copies and set(copies) == {"thread"}
+    assert (main.COURSES_DIR / "zipped" / "assets" / "image.png").exists()
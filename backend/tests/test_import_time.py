@@ -0,0 +1,21 @@
+import importlib.util
+import statistics
+from pathlib import Path
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "bench_import_time.py"
+
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location("bench_import_time", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_app_import_stays_within_budget():
+    # Fresh interpreters, as a cold start; see benchmarks/bench_import_time.py
+    benchmark = load_benchmark()
+    runs = [benchmark.run_once() for _ in range(3)]
+
+    assert sorted({name for run in runs for name in run["eager"]}) == []
+    assert statistics.median(run["app_ms"] for run in runs) <= benchmark.BUDGET_MS
@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+from backend import catalog
+from backend.catalog import LabCatalog, LabEntry
+from backend.concurrency import FanOut
+
+
+def write_lab(course_dir, chapter: int, title: str, mtime: float):
+    path = course_dir / "labs" / f"lab-{chapter}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {title}\n\nSteps.\n", encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_refresh_rereads_only_changed_lab_files(tmp_path, monkeypatch):
+    course = tmp_path / "course-a"
+    write_lab(course, 1, "One", 1000)
+    write_lab(course, 2, "Two", 1000)
+    lab_catalog = LabCatalog(tmp_path, FanOut(limit=4))
+    reads = []
+    load_lab_entry = catalog.load_lab_entry
+    monkeypatch.setattr(catalog, "load_lab_entry", lambda path: reads.append(path.name) or load_lab_entry(path))
+
+    async def scenario():
+        assert await lab_catalog.refresh_changed()
+        assert sorted(reads) == ["lab-1.md", "lab-2.md"]
+
+        reads.clear()
+        assert not await lab_catalog.refresh_changed()
+        assert reads == []
+
+        # Edited, added and removed outside the API
+        write_lab(course, 2, "Two, edited", 2000)
+        write_lab(course, 3, "Three", 1000)
+        (course / "labs" / "lab-1.md").unlink()
+        assert await lab_catalog.refresh_changed()
+        assert sorted(reads) == ["lab-2.md", "lab-3.md"]
+
+    asyncio.run(scenario())
+    assert [lab.title for lab in lab_catalog.overview()["course-a"]] == ["Two, edited", "Three"]
+
+
+def test_lab_listing_caches_compact_entries(main, client, make_course):
+    course_dir = make_course("listed-labs", "Listed labs", "# One\n")
+    write_lab(course_dir, 1, "First steps", 1000)
+
+    async def rescan():
+        main.LAB_LISTING.invalidate()
+        await main.LAB_LISTING.refresh()
+    client.portal.call(rescan)
+
+    response = client.get("/api/labs/courses")
+
+    assert response.json()["listed-labs"] == [{"chapter": 1, "title": "First steps", "filename": "lab-1.md"}]
+    cached = client.portal.call(main.LAB_LISTING.get)
+    assert all(isinstance(lab, LabEntry) for labs in cached.values() for lab in labs)
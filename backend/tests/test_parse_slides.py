@@ -0,0 +1,103 @@
+"""parse_slides against the regex-split implementation it replaced.
+
+The old splitter (``legacy_parse_slides`` in benchmarks/bench_parse_slides.py)
+is the reference on ordinary decks; on the inputs it got wrong (``---`` on the
+first or last line, CRLF, back-to-back separators) the expected slides are
+spelled out instead. HTML is left out on both sides: only splitting, metadata
+detection and trimming are compared.
+"""
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import frontmatter
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BENCHMARKS_DIR = BACKEND_DIR / "benchmarks"
+
+# Decks on which the old and new implementations must agree exactly
+PARITY_CORPUS = {
+    "empty": "",
+    "blank": "\n\n   \n",
+    "single": "# Only slide\n\nBody",
+    "two_slides": "# One\n\nText\n\n---\n\n# Two\n\nMore",
+    "metadata_block": "# Intro\n\n---\nlayout: two-column\ntheme: tech\n---\n\n# Styled\n\nBody",
+    "metadata_with_comment": "# A\n---\n# comment\nlayout: center\n---\n# B",
+    "metadata_last": "# A\n---\nlayout: center",
+    "metadata_then_empty": "# A\n---\nlayout: x\n---\n\n---\n# C",
+    "heading_with_colon": "# Note: headings are content\n---\n# B",
+    "text_with_colon": "Note: plain text with colon\n---\n# B",
+    "list_with_colon": "- item: one\n- item: two\n---\n# B",
+    "invalid_yaml": "key: [unclosed\n---\n# After invalid yaml",
+    "scalar_yaml": "key:\n---\n# B",
+    "indented_keys": "  layout: center\n  theme: tech\n---\n# B",
+    "leading_blank_lines": "\n\n\n# A\n\n\n---\n\n\n\n# B\n\n\n",
+    "trailing_spaces_separator": "# A\n--- \n# still A",
+    "dashes_in_text": "# A\n----\n# still A\n-- -\n",
+    "unicode_whitespace": "　# 标题　\n---\n\xa0layout: x\n---\n# 内容",
+    "code_block": "# Code\n\n```python\nx: int = 1\n```\n---\n# Next",
+    "many_empty_parts": "\n---\n\n---\n# A\n---\n\n---\n# B",
+}
+
+# Inputs the old splitter mishandled, with the slide contents now expected
+FIXED_CASES = {
+    "separator_at_start": ("---\nlayout: cover\n---\n# Title", ["# Title"]),
+    "separator_at_end": ("# A\n---\n# B\n---", ["# A", "# B"]),
+    "crlf": ("# A\r\n---\r\n# B\r\n", ["# A", "# B"]),
+    "back_to_back_separators": ("# A\n---\n---\n# B", ["# A", "# B"]),
+    # libyaml accepts a tab after "key:" where the pure-Python loader raised
+    # (and the block silently became {}); the slide split itself is unchanged
+    "tab_separated_metadata": ("\tkey:\tvalue\n---\n# B", ["# B"]),
+}
+
+GLOBAL_METADATA = {"theme": "minimal"}
+
+
+def load_benchmark_module(name: str):
+    # Benchmarks import their siblings (corpus.py) by plain name
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+    try:
+        spec = importlib.util.spec_from_file_location(name, BENCHMARKS_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(BENCHMARKS_DIR))
+    return module
+
+
+def synthetic_decks():
+    corpus = load_benchmark_module("corpus")
+    rng = random.Random(7)
+    for slides in (1, 10, 100):
+        deck = corpus.build_deck(rng, slides, corpus.CorpusSpec(code_density=0.5))
+        yield f"synthetic_{slides}", deck.split("---\n\n", 1)[1]  # drop the file frontmatter
+
+
+def course_decks():
+    for path in sorted((BACKEND_DIR / "courses").glob("*/slides/*.md")):
+        # Decks are parsed after their frontmatter is removed, as render_deck does
+        text = frontmatter.loads(path.read_text(encoding="utf-8")).content
+        yield f"course:{path.parent.parent.name}/{path.name}", text
+
+
+PARITY_DECKS = {**PARITY_CORPUS, **dict(synthetic_decks()), **dict(course_decks())}
+
+
+@pytest.fixture(scope="module")
+def legacy_parse_slides():
+    return load_benchmark_module("bench_parse_slides").legacy_parse_slides
+
+
+@pytest.mark.parametrize("name", sorted(PARITY_DECKS))
+def test_matches_the_regex_splitter(main, legacy_parse_slides, name):
+    deck = PARITY_DECKS[name]
+    expected = legacy_parse_slides(deck, GLOBAL_METADATA, render=lambda text: None)
+    assert main.parse_slides(deck, GLOBAL_METADATA, render_html=False) == expected
+
+
+@pytest.mark.parametrize("name", sorted(FIXED_CASES))
+def test_fixes_inputs_the_regex_splitter_got_wrong(main, name):
+    deck, contents = FIXED_CASES[name]
+    assert [slide["content"] for slide in main.parse_slides(deck, render_html=False)] == contents
@@ -0,0 +1,53 @@
+import asyncio
+
+
+def on_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_upload_renders_off_the_loop_and_prerenders_without_its_slot(main, client, make_course, monkeypatch):
+    make_course("uploaded-labs", "Uploaded labs", "# One\n")
+    gate = main.ADMISSION_GATES["upload"]
+    renders, prerenders = [], []
+    render_document = main.render_document
+    monkeypatch.setattr(main, "render_document", lambda *args: renders.append(on_loop()) or render_document(*args))
+    monkeypatch.setattr(main, "prerender", lambda kind, content: prerenders.append((kind, gate.active)))
+
+    response = client.post("/api/courses/uploaded-labs/labs/upload",
+                           files={"file": ("lab-1.md", b"# Lab one\n\nSteps.\n", "text/markdown")})
+
+    assert response.status_code == 200
+    assert "<h1" in response.json()["lab"]["html"]
+    assert renders == [False]
+    # The background job ran after the response, with the upload slot already free
+    assert prerenders == [("lab", 0)]
+
+
+def test_unchanged_writes_skip_invalidation_and_prerender(main, client, make_course, monkeypatch):
+    make_course("rewritten", "Rewritten", "# One\n")
+    prerenders = []
+    monkeypatch.setattr(main, "prerender", lambda kind, content: prerenders.append(kind))
+    skipped = main.PRERENDER_STATS["unchanged_writes"]
+
+    for _ in range(2):
+        response = client.put("/api/courses/rewritten/slides", json={"content": "# Before\n\n---\n\n# After\n"})
+        assert response.status_code == 200
+        assert len(response.json()["slides"]) == 2
+
+    assert prerenders == ["deck"]
+    assert main.PRERENDER_STATS["unchanged_writes"] == skipped + 1
+
+
+def test_prerender_fills_what_viewers_read_first(main):
+    content = "---\ntitle: Prerendered\n---\n# One\n\n---\n\n# Two\n"
+
+    main.prerender("deck", content)
+
+    assert main.RENDER_CACHE.get_local("deck-json", content) is not None
+    for encoding in main.SUPPORTED_ENCODINGS:
+        assert main.RENDER_CACHE.get_local(f"deck-json:{encoding}", content) is not None
+    assert main.RENDER_CACHE.get_local("document:document", content) is not None
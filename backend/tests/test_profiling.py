@@ -0,0 +1,51 @@
+import re
+import threading
+
+from backend.profiling import ProfilingExecutor
+
+
+def test_profiled_blog_render_includes_markdown_frames(main, client, make_blog, monkeypatch):
+    monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+    # Fresh content, so the render is not a cache hit
+    make_blog("profiled", "Profiled", "# Profiled\n\n" + "Some *text* with `code`.\n\n" * 200)
+
+    response = client.get("/api/blogs/profiled", headers={"X-Profile": "inline"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Status"] == "200"
+    # Rendering runs in the thread pool; its frames come from the job profilers
+    assert re.search(r"Thread-pool jobs profiled: [1-9]", response.text)
+    assert re.search(r"markdown[/\\]core\.py:\d+\(convert\)", response.text)
+
+
+def test_profile_needs_an_explicit_value(main, client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(main, "PROFILES_DIR", tmp_path / "profiles")
+
+    for value in ("0", "false", "no"):
+        response = client.get("/api/courses", params={"profile": value})
+        assert "X-Profile-Report" not in response.headers
+    assert not (tmp_path / "profiles").exists()
+
+    response = client.get("/api/courses", params={"profile": "1"})
+    assert response.headers["X-Profile-Report"].endswith("-api-courses.txt")
+
+
+def test_executor_counts_queued_and_running_jobs(main, client):
+    executor = ProfilingExecutor(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    running = executor.submit(lambda: started.set() or release.wait(5))
+    started.wait(5)
+    waiting = executor.submit(lambda: None)
+    cancelled = executor.submit(lambda: None)
+
+    assert (executor.max_workers, executor.active, executor.queued) == (1, 1, 2)
+    assert cancelled.cancel()
+    assert executor.queued == 1
+
+    release.set()
+    running.result(5)
+    waiting.result(5)
+    executor.shutdown()
+    assert (executor.active, executor.queued) == (0, 0)
+    assert re.search(r"^kc_io_executor_active \d+", client.get("/metrics").text, re.M)
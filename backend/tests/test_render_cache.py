@@ -0,0 +1,83 @@
+import sqlite3
+
+from backend.render_cache import RenderCache, SharedRenderStore
+
+
+def stored_bytes(path) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM render_cache").fetchone()[0]
+
+
+def test_shared_store_keeps_a_running_total(tmp_path):
+    path = tmp_path / "cache.db"
+    store = SharedRenderStore(path, max_bytes=10_000)
+    store.set("a", "html", b"x" * 100)
+    store.set("b", "html", b"y" * 300)
+    # Replacing a key swaps its size in the total
+    store.set("a", "html", b"z" * 50)
+    assert store.stats() == {"entries": 2, "bytes": 350, "max_bytes": 10_000}
+    assert stored_bytes(path) == 350
+    assert store.get("a") == b"z" * 50
+
+    # A second process opening the file picks the total up
+    assert SharedRenderStore(path, max_bytes=10_000).stats()["bytes"] == 350
+    store.clear()
+    assert store.stats()["bytes"] == 0
+
+
+def test_shared_store_evicts_least_recently_used(tmp_path, monkeypatch):
+    store = SharedRenderStore(tmp_path / "cache.db", max_bytes=1000)
+    clock = iter(range(1000))
+    monkeypatch.setattr("backend.render_cache.time.time", lambda: next(clock))
+    for name in "abcd":
+        store.set(name, "html", b"x" * 200)
+    store.get("a")
+    # Over budget: evicted down to 90% of it, oldest access first
+    store.set("e", "html", b"x" * 300)
+    assert store.get("b") is None
+    assert all(store.get(name) is not None for name in "acde")
+    assert store.stats()["bytes"] == 900
+    # Larger than the whole budget: not stored at all
+    store.set("huge", "html", b"x" * 2000)
+    assert store.get("huge") is None
+
+
+def test_entries_round_trip_through_the_shared_store(tmp_path):
+    path = tmp_path / "cache.db"
+    writer = RenderCache(shared=SharedRenderStore(path))
+    writer.set("deck", "# One", {"metadata": {}, "slides": [{"id": "slide-1", "html": "<h1>One</h1>"}]})
+    writer.set("deck-json", "# One", b'{"slides":[]}')
+
+    reader = RenderCache(shared=SharedRenderStore(path))
+    assert reader.get("deck", "# One")["slides"][0]["html"] == "<h1>One</h1>"
+    assert reader.get("deck-json", "# One") == b'{"slides":[]}'
+    assert reader.shared_hits == 2
+    assert reader.get_local("deck", "# One") is not None
+
+
+def test_local_cache_is_bounded_by_payload_bytes():
+    cache = RenderCache(max_bytes=1000)
+    cache.set("html", "small", "s" * 100)
+    cache.set("html", "large", "l" * 800)
+    cache.get_local("html", "small")
+    cache.set("html", "other", "o" * 200)
+    assert cache.get_local("html", "large") is None
+    assert cache.get_local("html", "small") is not None
+    assert cache.stats()["bytes"] == 300
+    cache.set("html", "too large", "x" * 1001)
+    assert cache.get_local("html", "too large") is None
+
+
+def test_large_deck_does_not_push_out_cached_decks(main, monkeypatch):
+    monkeypatch.setattr(main, "RENDER_CACHE", RenderCache(max_bytes=2_000_000))
+    small = "\n---\n".join(f"# Small {number}\n\nText." for number in range(50))
+    large = "\n---\n".join(f"# Large {number}\n\n" + "Paragraph text. " * 10 for number in range(600))
+
+    main.render_deck(small)
+    assert main.RENDER_CACHE.stats()["entries"] == 1
+    main.render_deck(large)
+    assert main.RENDER_CACHE.stats()["entries"] == 2
+
+    misses = main.RENDER_CACHE.misses
+    assert len(main.render_deck(small)["slides"]) == 50
+    assert main.RENDER_CACHE.misses == misses
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import threading
+
+
+def test_first_slide_arrives_before_the_deck_is_rendered(main, make_course, monkeypatch):
+    make_course("streamed", "Streamed", "# One\n\n---\n\n# Two\n")
+    client_has_first_slide = threading.Event()
+    outcome = {}
+    iter_slides = main.iter_slides
+
+    def slow_iter_slides(content, **kwargs):
+        slides = iter_slides(content, **kwargs)
+        yield next(slides)
+        # Rendering the rest only goes on once the client has the first slide;
+        # a buffered response would never deliver it
+        outcome["streamed"] = client_has_first_slide.wait(timeout=5)
+        outcome["gate_active"] = main.ADMISSION_GATES["render"].active
+        yield from slides
+
+    monkeypatch.setattr(main, "iter_slides", slow_iter_slides)
+    body = b""
+    headers = {}
+
+    async def receive():
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.start":
+            headers.update((key.decode(), value.decode()) for key, value in message["headers"])
+        elif message["type"] == "http.response.body":
+            body += message.get("body", b"")
+            if body.count(b"\n") >= 2:
+                client_has_first_slide.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/courses/streamed/slides",
+        "raw_path": b"/api/courses/streamed/slides", "root_path": "", "query_string": b"stream=1",
+        "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip, br")],
+        "client": ("127.0.0.1", 0), "server": ("test", 80),
+    }
+    asyncio.run(main.app(scope, receive, send))
+
+    assert outcome["streamed"]
+    # The admission slot is held while the body streams, and released after
+    assert outcome["gate_active"] == 1
+    assert main.ADMISSION_GATES["render"].active == 0
+    assert headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in headers
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert [line["type"] for line in lines] == ["deck", "slide", "slide"]
@@ -0,0 +1,36 @@
+from backend.suggest import MAX_SCAN, PrefixIndex
+
+
+def lab(number: int, title: str):
+    return f"lab:c/{number}", "lab", title, {"course_id": "c"}
+
+
+def test_bulk_sync_matches_single_updates():
+    entries = [lab(number, f"Networking basics part {number}") for number in range(200)]
+    synced, single = PrefixIndex(), PrefixIndex()
+    synced.sync("lab:c/", entries)
+    for entry in entries:
+        single.set(*entry)
+    assert synced._terms == single._terms
+
+    # Rename half, drop a quarter: enough changes for the one-pass merge
+    renamed = [lab(number, f"Routing deep dive {number}") if number % 2 else entry for number, entry in enumerate(entries)][:150]
+    synced.sync("lab:c/", renamed)
+    single = PrefixIndex()
+    for entry in renamed:
+        single.set(*entry)
+    assert synced._terms == single._terms
+    assert len(synced) == 150
+    assert synced.suggest("routing deep dive 7")[0]["title"] == "Routing deep dive 7"
+
+
+def test_kind_filter_finds_matches_past_other_kinds():
+    index = PrefixIndex()
+    index.sync("lab:c/", [lab(number, f"Alpha {number:05d}") for number in range(MAX_SCAN * 4)])
+    index.set("course:zeta", "course", "Alpha zeta", {"id": "zeta"})
+
+    # The course sorts after every lab term, yet a course lookup goes straight to it
+    assert index.suggest("alpha", kinds=["course"]) == [{"type": "course", "title": "Alpha zeta", "id": "zeta"}]
+    # Unfiltered lookups still scan a bounded number of terms per kind
+    assert [entry["type"] for entry in index.suggest("alpha", limit=300)].count("lab") == MAX_SCAN
+    assert "zeta" in [entry.get("id") for entry in index.suggest("alpha", limit=300)]
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from backend.uploads import UploadSessions
+
+CONTENT = b"0123456789"
+
+
+@pytest.fixture
+def course(main, make_course):
+    make_course("uploads", "Uploads", "# One\n")
+    return "uploads"
+
+
+def start(client, course: str, **fields):
+    response = client.post(f"/api/courses/{course}/assets/uploads",
+                           json={"filename": "data.bin", "size": len(CONTENT), "chunk_size": 4, **fields})
+    assert response.status_code == 200
+    return response.json()
+
+
+def put_chunk(client, course: str, upload_id: str, index: int, data: bytes, **params):
+    return client.put(f"/api/courses/{course}/assets/uploads/{upload_id}/chunks/{index}", content=data, params=params)
+
+
+def test_chunks_in_any_order_resume_and_finalize(main, client, course):
+    session = start(client, course)
+    upload_id = session["upload_id"]
+    assert session["total_chunks"] == 3 and session["missing"] == [0, 1, 2]
+
+    assert put_chunk(client, course, upload_id, 2, CONTENT[8:]).status_code == 200
+    assert put_chunk(client, course, upload_id, 0, CONTENT[:4], offset=0).status_code == 200
+    # Wrong offset, wrong length, out of range
+    assert put_chunk(client, course, upload_id, 1, CONTENT[4:8], offset=5).status_code == 400
+    assert put_chunk(client, course, upload_id, 1, CONTENT[4:7]).status_code == 400
+    assert put_chunk(client, course, upload_id, 3, b"").status_code == 400
+
+    # Resume: the client asks what is missing
+    status = client.get(f"/api/courses/{course}/assets/uploads/{upload_id}").json()
+    assert status["missing"] == [1] and not status["complete"]
+    finalize = f"/api/courses/{course}/assets/uploads/{upload_id}/finalize"
+    assert client.post(finalize, json={"sha256": hashlib.sha256(CONTENT).hexdigest()}).status_code == 409
+
+    assert put_chunk(client, course, upload_id, 1, CONTENT[4:8]).status_code == 200
+    assert client.post(finalize, json={}).status_code == 400
+    assert client.post(finalize, json={"sha256": "0" * 64}).status_code == 422
+
+    response = client.post(finalize, json={"sha256": hashlib.sha256(CONTENT).hexdigest()})
+    assert response.status_code == 200
+    assert (main.COURSES_DIR / course / "assets" / response.json()["asset"]["name"]).read_bytes() == CONTENT
+    assert client.get(f"/api/courses/{course}/assets/uploads/{upload_id}").status_code == 404
+
+
+def test_sessions_are_discarded_with_their_course(main, client, course):
+    upload_id = start(client, course, sha256=hashlib.sha256(CONTENT).hexdigest())["upload_id"]
+    assert put_chunk(client, course, upload_id, 0, CONTENT[:4]).status_code == 200
+
+    assert client.delete(f"/api/courses/{course}").status_code == 200
+
+    assert put_chunk(client, course, upload_id, 1, CONTENT[4:8]).status_code == 404
+    assert client.post(f"/api/courses/{course}/assets/uploads/{upload_id}/finalize", json={}).status_code == 404
+    assert not list(main.UPLOAD_SESSIONS.root.glob(f"{upload_id}.*"))
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    async def scenario():
+        sessions = UploadSessions(tmp_path, chunk_size=4, max_size=100, ttl=3600)
+        session = await sessions.create("course", "data.bin", len(CONTENT))
+
+        async def body():
+            yield CONTENT[:4]
+        await sessions.write_chunk(session, 0, body())
+
+        restarted = UploadSessions(tmp_path, chunk_size=4, max_size=100, ttl=3600)
+        resumed = await restarted.get(session.upload_id)
+        assert resumed.missing() == [1, 2]
+
+        expired = UploadSessions(tmp_path, chunk_size=4, max_size=100, ttl=-1)
+        await expired.expire()
+        assert await expired.get(session.upload_id) is None
+
+    asyncio.run(scenario())
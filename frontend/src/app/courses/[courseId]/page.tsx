@@ -44,18 +44,23 @@ export default function CourseDetailPage({ params }: { params: Promise<{ courseI
         setLoading(true)
         setError(null)
 
-        // Fetch all course data in parallel
-        const [courseData, slideFilesData, labsData, assetsData] = await Promise.all([
-          api.getCourse(courseId),
-          api.getCourseSlideFiles(courseId).catch(() => ({ slides: [] })),
-          api.getCourseLabs(courseId).catch(() => ({ labs: [] })),
-          api.getCourseAssets(courseId).catch(() => ({ assets: [] }))
+        // Fetch all course data in one round trip; the cards only show a text
+        // preview, so the slide files and labs are fetched without rendered HTML
+        const { responses } = await api.batch([
+          { resource: 'course', course: courseId },
+          { resource: 'slide_files', course: courseId, options: { fields: ['filename', 'title', 'content'] } },
+          { resource: 'labs', course: courseId, options: { fields: ['chapter', 'title', 'content'] } },
+          { resource: 'assets', course: courseId }
         ])
+        const [courseResult, slideFilesResult, labsResult, assetsResult] = responses
 
-        setCourse(courseData)
-        setSlideFiles(slideFilesData.slides || [])
-        setLabs(labsData.labs || [])
-        setAssets(assetsData.assets || [])
+        if (courseResult.status !== 200) {
+          throw new ApiError(courseResult.status, courseResult.detail || `HTTP error! status: ${courseResult.status}`)
+        }
+        setCourse(courseResult.body)
+        setSlideFiles(slideFilesResult.body?.slides || [])
+        setLabs(labsResult.body?.labs || [])
+        setAssets(assetsResult.body?.assets || [])
       } catch (err) {
         if (err instanceof ApiError) {
           setError(err.status === 404 ? 'Course not found' : err.message)
@@ -272,12 +277,7 @@ export default function CourseDetailPage({ params }: { params: Promise<{ courseI
                       </div>
                       <h3 className="text-sm font-medium text-gray-900 mb-2 overflow-hidden" style={{display: '-webkit-box', WebkitLineClamp: 2, WebkitBoxOrient: 'vertical'}}>{slideFile.title}</h3>
                       <div className="text-xs text-gray-600 mb-3 h-12 overflow-hidden">
-                        <div 
-                          className="prose prose-sm max-w-none"
-                          dangerouslySetInnerHTML={{ 
-                            __html: slideFile.html.length > 100 ? slideFile.html.substring(0, 100) + '...' : slideFile.html 
-                          }}
-                        />
+                        {slideFile.content.length > 100 ? slideFile.content.substring(0, 100) + '...' : slideFile.content}
                       </div>
                     </div>
                     <div className="ml-2">
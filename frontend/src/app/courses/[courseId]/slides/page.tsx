@@ -24,10 +24,11 @@ export default function CourseSlidesPage({ params }: { params: Promise<{ courseI
         setLoading(true)
         setError(null)
 
-        // Fetch course info and slide files in parallel
+        // Fetch course info and slide files in parallel; the list shows a text
+        // preview, so the slide files are fetched without rendered HTML
         const [courseData, slideFilesData] = await Promise.all([
           api.getCourse(courseId),
-          api.getCourseSlideFiles(courseId).catch(() => ({ slides: [] }))
+          api.getCourseSlideFiles(courseId, { fields: ['filename', 'title', 'content'] }).catch(() => ({ slides: [] }))
         ])
 
         setCourse(courseData)
@@ -139,12 +140,7 @@ export default function CourseSlidesPage({ params }: { params: Promise<{ courseI
                     </div>
                     <h3 className="text-lg font-medium text-gray-900 mb-3">{slideFile.title}</h3>
                     <div className="text-sm text-gray-600 mb-4 h-16 overflow-hidden">
-                      <div 
-                        className="prose prose-sm max-w-none"
-                        dangerouslySetInnerHTML={{ 
-                          __html: slideFile.html.length > 150 ? slideFile.html.substring(0, 150) + '...' : slideFile.html 
-                        }}
-                      />
+                      {slideFile.content.length > 150 ? slideFile.content.substring(0, 150) + '...' : slideFile.content}
                     </div>
                   </div>
                   <div className="text-2xl ml-4">📄</div>
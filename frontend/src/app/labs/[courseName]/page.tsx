@@ -21,7 +21,8 @@ export default function CourseLabsPage({ params }: PageProps) {
     const fetchCourseLabs = async () => {
       try {
         setLoading(true)
-        const data = await api.getCourseLabs(courseName)
+        // The cards only use the markdown source: skip the rendered HTML
+        const data = await api.getCourseLabs(courseName, { fields: ['chapter', 'title', 'content'] })
         setLabsData(data)
         setError(null)
       } catch (err) {
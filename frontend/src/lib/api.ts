@@ -18,12 +18,41 @@ export interface Slide {
   metadata?: Record<string, any>
 }
 
+export interface CourseFilters {
+  tag?: string[]
+  level?: string[]
+  author?: string[]
+}
+
+export interface Suggestion {
+  type: 'course' | 'lab' | 'blog'
+  title: string
+  id?: string
+  course?: string
+  chapter?: number
+  slug?: string
+}
+
+export interface FilteredCoursesResponse {
+  courses: Course[]
+  total: number
+  facets: {
+    tag: Record<string, number>
+    level: Record<string, number>
+    author: Record<string, number>
+  }
+}
+
 export interface CourseSlides {
   metadata: Record<string, any>
   slides: Slide[]
   html: string
 }
 
+export type SlideStreamLine =
+  | { type: 'deck', metadata: Record<string, any> }
+  | { type: 'slide', slide: Slide }
+
 export interface CourseCreate {
   title: string
   description: string
@@ -55,6 +84,21 @@ export interface Lab {
   filename?: string
 }
 
+// Field selection for list endpoints: `fields` wins over `view`
+export interface ListProjection {
+  fields?: string[]
+  view?: 'summary' | 'full'
+}
+
+const projectionQuery = (projection?: ListProjection): string => {
+  if (!projection) return ''
+  const params = new URLSearchParams()
+  if (projection.fields?.length) params.set('fields', projection.fields.join(','))
+  else if (projection.view) params.set('view', projection.view)
+  const query = params.toString()
+  return query ? `?${query}` : ''
+}
+
 export interface CourseLabsResponse {
   course_name: string
   labs: Lab[]
@@ -84,6 +128,18 @@ export interface CourseAssetsResponse {
   assets: Asset[]
 }
 
+export interface AssetUploadSession {
+  upload_id: string
+  course_name: string
+  filename: string
+  size: number
+  chunk_size: number
+  total_chunks: number
+  received: number[]
+  missing: number[]
+  complete: boolean
+}
+
 export interface BlogConfig {
   slug: string
   title: string
@@ -163,6 +219,24 @@ export interface CourseSlidesFilesResponse {
   slides: SlideFile[]
 }
 
+export type BatchResource = 'course' | 'slide_files' | 'labs' | 'assets'
+
+export interface BatchItem {
+  resource: BatchResource
+  course: string
+  options?: { fields?: string[], view?: 'summary' | 'full' }
+}
+
+export interface BatchResult<T = any> {
+  status: number
+  body?: T
+  detail?: string
+}
+
+export interface BatchResponse {
+  responses: BatchResult[]
+}
+
 class ApiError extends Error {
   constructor(public status: number, message: string) {
     super(message)
@@ -202,6 +276,23 @@ export const api = {
     return fetchApi('/api/courses')
   },
 
+  // Get the courses matching the filters, with per-facet value counts
+  filterCourses: async (filters: CourseFilters = {}): Promise<FilteredCoursesResponse> => {
+    const params = new URLSearchParams({ facets: 'true' })
+    for (const [facet, values] of Object.entries(filters)) {
+      for (const value of values ?? []) params.append(facet, value)
+    }
+    return fetchApi(`/api/courses?${params}`)
+  },
+
+  // Course, lab and blog titles matching what was typed so far
+  suggest: async (q: string, types: Suggestion['type'][] = [], limit = 8): Promise<Suggestion[]> => {
+    const params = new URLSearchParams({ q, limit: String(limit) })
+    for (const type of types) params.append('type', type)
+    const response = await fetchApi(`/api/suggest?${params}`)
+    return response.suggestions
+  },
+
   // Get specific course info
   getCourse: async (courseId: string): Promise<Course> => {
     return fetchApi(`/api/courses/${courseId}`)
@@ -212,6 +303,37 @@ export const api = {
     return fetchApi(`/api/courses/${courseId}/slides`)
   },
 
+  // Stream course slides as NDJSON, calling onSlide as each slide arrives
+  // (the full-deck html is not included); resolves with the deck metadata
+  streamCourseSlides: async (courseId: string, onSlide: (slide: Slide) => void, filename?: string): Promise<Record<string, any>> => {
+    const path = filename ? `/api/courses/${courseId}/slides/${filename}` : `/api/courses/${courseId}/slides`
+    const response = await fetch(`${API_BASE_URL}${path}?stream=1`)
+    if (!response.ok || !response.body) {
+      throw new ApiError(response.status, `HTTP error! status: ${response.status}`)
+    }
+
+    let metadata: Record<string, any> = {}
+    const handle = (text: string) => {
+      if (!text.trim()) return
+      const line: SlideStreamLine = JSON.parse(text)
+      if (line.type === 'deck') metadata = line.metadata
+      else onSlide(line.slide)
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += value
+      const lines = buffer.split('\n')
+      buffer = lines.pop() ?? ''
+      lines.forEach(handle)
+    }
+    handle(buffer)
+    return metadata
+  },
+
   // Get specific slide file as presentation
   getSpecificSlideFilePresentation: async (courseId: string, filename: string): Promise<CourseSlides> => {
     return fetchApi(`/api/courses/${courseId}/slides/${filename}`)
@@ -262,6 +384,14 @@ export const api = {
     })
   },
 
+  // Fetch several course resources in one round trip; results keep request order
+  batch: async (requests: BatchItem[]): Promise<BatchResponse> => {
+    return fetchApi('/api/batch', {
+      method: 'POST',
+      body: JSON.stringify({ requests }),
+    })
+  },
+
   // Health check
   healthCheck: async (): Promise<{ message: string }> => {
     return fetchApi('/')
@@ -269,8 +399,8 @@ export const api = {
 
   // Labs API methods
   // Get all labs for a specific course
-  getCourseLabs: async (courseName: string): Promise<CourseLabsResponse> => {
-    return fetchApi(`/api/labs/courses/${courseName}`)
+  getCourseLabs: async (courseName: string, projection?: ListProjection): Promise<CourseLabsResponse> => {
+    return fetchApi(`/api/labs/courses/${courseName}${projectionQuery(projection)}`)
   },
 
   // Get specific lab content by course name and chapter number
@@ -306,6 +436,45 @@ export const api = {
     return await response.json()
   },
 
+  // Resumable asset upload: create a session, PUT each missing chunk, then finalize
+  createAssetUpload: async (courseName: string, filename: string, size: number, sha256?: string): Promise<AssetUploadSession> => {
+    return fetchApi(`/api/courses/${courseName}/assets/uploads`, {
+      method: 'POST',
+      body: JSON.stringify({ filename, size, sha256 }),
+    })
+  },
+
+  getAssetUpload: async (courseName: string, uploadId: string): Promise<AssetUploadSession> => {
+    return fetchApi(`/api/courses/${courseName}/assets/uploads/${uploadId}`)
+  },
+
+  uploadAssetChunk: async (courseName: string, session: AssetUploadSession, index: number, file: Blob): Promise<{received: number, total_chunks: number}> => {
+    const offset = index * session.chunk_size
+    const response = await fetch(`${API_BASE_URL}/api/courses/${courseName}/assets/uploads/${session.upload_id}/chunks/${index}?offset=${offset}`, {
+      method: 'PUT',
+      body: file.slice(offset, offset + session.chunk_size),
+    })
+
+    if (!response.ok) {
+      throw new ApiError(response.status, `HTTP error! status: ${response.status}`)
+    }
+
+    return await response.json()
+  },
+
+  finalizeAssetUpload: async (courseName: string, uploadId: string, sha256?: string): Promise<{message: string, asset: Asset}> => {
+    return fetchApi(`/api/courses/${courseName}/assets/uploads/${uploadId}/finalize`, {
+      method: 'POST',
+      body: JSON.stringify({ sha256 }),
+    })
+  },
+
+  abortAssetUpload: async (courseName: string, uploadId: string): Promise<{message: string}> => {
+    return fetchApi(`/api/courses/${courseName}/assets/uploads/${uploadId}`, {
+      method: 'DELETE',
+    })
+  },
+
   // Delete asset from a course
   deleteCourseAsset: async (courseName: string, assetPath: string): Promise<{message: string}> => {
     return fetchApi(`/api/courses/${courseName}/assets/${assetPath}`, {
@@ -315,8 +484,8 @@ export const api = {
 
   // Slides API methods
   // Get all slide files for a specific course
-  getCourseSlideFiles: async (courseName: string): Promise<CourseSlidesFilesResponse> => {
-    return fetchApi(`/api/slides/courses/${courseName}`)
+  getCourseSlideFiles: async (courseName: string, projection?: ListProjection): Promise<CourseSlidesFilesResponse> => {
+    return fetchApi(`/api/slides/courses/${courseName}${projectionQuery(projection)}`)
   },
 
   // Get specific slide file content